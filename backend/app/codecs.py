@@ -0,0 +1,109 @@
+"""Content negotiation for ``/solve``: JSON, MessagePack and packed cube states.
+
+Requests may arrive as JSON (the default), as MessagePack carrying the same
+object, or as the 9-byte :class:`~app.services.cube_state.CubeState`
+encoding of the state alone. Responses are JSON unless ``Accept`` prefers
+MessagePack. Both encoders work on plain dictionaries, so the hot path skips
+pydantic response-model validation.
+
+``orjson`` and ``msgpack`` are optional (``pip install krubik[fast]``):
+without ``orjson`` the standard library encodes JSON, and without
+``msgpack`` that media type is neither accepted nor offered.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Mapping, Sequence
+from typing import Any, Final, cast
+
+from .services.cube_state import CubeState
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+JSON_MEDIA_TYPE: Final[str] = "application/json"
+MSGPACK_MEDIA_TYPE: Final[str] = "application/msgpack"
+CUBE_STATE_MEDIA_TYPE: Final[str] = "application/x-krubik-state"
+
+ORJSON_AVAILABLE: Final[bool] = orjson is not None
+MSGPACK_AVAILABLE: Final[bool] = msgpack is not None
+RESPONSE_MEDIA_TYPES: Final[tuple[str, ...]] = (
+    (JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE) if MSGPACK_AVAILABLE else (JSON_MEDIA_TYPE,)
+)
+
+
+class UnsupportedMediaTypeError(ValueError):
+    """Raised for request bodies in a media type :func:`decode_body` does not read."""
+
+    def __init__(self, media_type: str) -> None:
+        super().__init__(media_type)
+        self.media_type = media_type
+
+
+def media_type_of(content_type: str | None) -> str:
+    """Return the bare, lower-cased media type of a ``Content-Type`` header."""
+
+    if not content_type:
+        return JSON_MEDIA_TYPE
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def decode_body(body: bytes, media_type: str) -> Any:
+    """Decode a request body; packed cube states become ``{"state": ...}``.
+
+    Raises :class:`UnsupportedMediaTypeError` for unknown media types and
+    :class:`ValueError` for bodies that do not decode.
+    """
+
+    if media_type == JSON_MEDIA_TYPE or media_type.endswith("+json"):
+        return orjson.loads(body) if orjson is not None else json.loads(body)
+    if media_type == MSGPACK_MEDIA_TYPE and msgpack is not None:
+        return msgpack.unpackb(body)
+    if media_type == CUBE_STATE_MEDIA_TYPE:
+        return {"state": CubeState.from_bytes(body).to_facelets()}
+    raise UnsupportedMediaTypeError(media_type)
+
+
+def negotiate(accept: str | None, offered: Sequence[str] = RESPONSE_MEDIA_TYPES) -> str:
+    """Pick the offered media type with the highest ``q`` in ``Accept``.
+
+    Ties go to the earlier offer, and ``offered[0]`` is also the answer when
+    nothing matches, so clients with unusual ``Accept`` headers still get JSON.
+    """
+
+    best, best_quality = offered[0], 0.0
+    for part in (accept or "").split(","):
+        media_type, *params = (item.strip() for item in part.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.lower()
+        for candidate in offered:
+            wildcard = candidate.split("/", 1)[0] + "/*"
+            if media_type in (candidate, wildcard, "*/*") and quality > best_quality:
+                best, best_quality = candidate, quality
+                break
+    return best
+
+
+def encode(content: Mapping[str, object], media_type: str) -> bytes:
+    """Serialize ``content`` as ``media_type`` (one of :data:`RESPONSE_MEDIA_TYPES`)."""
+
+    if media_type == MSGPACK_MEDIA_TYPE and msgpack is not None:
+        return cast(bytes, msgpack.packb(content))
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
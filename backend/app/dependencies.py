@@ -3,28 +3,60 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import AsyncIterator
+import os
+import time
+from collections.abc import AsyncIterator, Awaitable, Iterable
 from contextlib import asynccontextmanager
-from functools import lru_cache
-from typing import Annotated
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Annotated, Any, Literal
 
 import httpx
 import structlog
-from fastapi import Depends, Request
-from pydantic import Field
+from fastapi import Depends
+from fastapi.requests import HTTPConnection
+from pydantic import Field, IPvAnyNetwork
 from pydantic_settings import BaseSettings
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 
+from .services.admission import AdmissionController, OverloadedError
 from .services.cube_validator import CubeValidator
+from .services.deadline import Deadline, DeadlineExceededError
+from .services.latency import LatencyTracker, SolverLatency
+from .services.metrics import METRICS, Sample
+from .services.micro_batch import MicroBatcher
+from .services.near_solved import NearSolvedTable
+from .services.rate_limiter import MemoryBucketStore, RateLimiter, SqliteBucketStore
+from .services.single_flight import SingleFlight
+from .services.solution_cache import MemorySolutionCache, SolutionCache, SqliteSolutionCache
 from .services.solver_client import (
+    BreakerPolicy,
     CircuitBreaker,
     CircuitBreakerOpenError,
+    CircuitBreakerRegistry,
+    EndpointPool,
     ExternalSolverClient,
     ExternalSolverError,
 )
-from .services.solver_local import LocalSolver
-from .services.types import NormalizedCubeState
+from .services.solver_engine import SolverEngine
+from .services.solver_local import DEFAULT_MAX_DEPTH, LocalSolver
+from .services.symmetry import canonicalize
+from .services.types import MoveSequence, NormalizedCubeState
+
+_LOGGER = structlog.get_logger(__name__)
+
+SOLVES = METRICS.histogram(
+    "krubik_solve_seconds",
+    "End-to-end solve time in the facade by the source that answered.",
+    ("source",),
+)
+EXTERNAL_FALLBACKS = METRICS.counter(
+    "krubik_external_fallbacks_total",
+    "External solver failures that fell back to the local solver.",
+)
+DEADLINES_EXCEEDED = METRICS.counter(
+    "krubik_deadline_exceeded_total",
+    "Solves abandoned because their request deadline passed.",
+)
 
 
 class Settings(BaseSettings):
@@ -33,12 +65,45 @@ class Settings(BaseSettings):
     environment: str = Field(default="development")
     cors_origins: list[str] = Field(default_factory=lambda: ["http://localhost:5173"])
     solver_api_url: str | None = Field(default=None)
+    solver_api_urls: list[str] = Field(default_factory=list)
+    solver_api_balancing: Literal["least_latency", "p2c"] = Field(default="least_latency")
+    solver_api_batch_enabled: bool = Field(default=False)
+    solver_api_batch_window_ms: float = Field(default=5.0, ge=0.0, le=1000.0)
+    solver_api_batch_max_size: int = Field(default=32, ge=1, le=1000)
     solver_api_timeout_seconds: float = Field(default=5.0, ge=0.1, le=30.0)
     solver_api_retries: int = Field(default=2, ge=0, le=5)
     solver_api_circuit_threshold: int = Field(default=3, ge=1, le=10)
     solver_api_circuit_reset_seconds: float = Field(default=30.0, ge=1.0, le=120.0)
-    solver_cache_size: int = Field(default=256, ge=32, le=1024)
+    solver_api_circuit_window_seconds: float = Field(default=60.0, ge=1.0, le=600.0)
+    solver_api_circuit_error_rate: float = Field(default=0.5, gt=0.0, le=1.0)
+    solver_api_circuit_slow_call_seconds: float | None = Field(default=None, gt=0.0, le=60.0)
+    solver_api_circuit_half_open_probes: int = Field(default=1, ge=1, le=10)
+    solver_cache_size: int = Field(default=4096, ge=32, le=10_000_000)
+    solver_cache_backend: Literal["memory", "sqlite"] = Field(default="memory")
+    solver_cache_path: str = Field(default="var/solutions.sqlite3")
+    solver_cache_symmetry: bool = Field(default=True)
+    solver_near_solved_path: str | None = Field(default=None)
+    solver_engine_enabled: bool = Field(default=True)
+    solver_workers: int | None = Field(default=None, ge=1, le=64)
+    solver_warmup_enabled: bool = Field(default=True)
+    solver_warmup_samples: int = Field(default=8, ge=0, le=1000)
+    solver_hedge_enabled: bool = Field(default=False)
+    solver_hedge_delay_ms: float = Field(default=250.0, ge=0.0, le=10_000.0)
+    solver_batch_max_size: int = Field(default=1000, ge=1, le=10_000)
+    solver_batch_concurrency: int = Field(default=8, ge=1, le=256)
+    solver_degrade_in_flight: int | None = Field(default=8, ge=1, le=1024)
+    solver_tight_budget_ms: float = Field(default=1000.0, gt=0.0, le=60_000.0)
+    solver_max_in_flight: int | None = Field(default=None, ge=1, le=1024)
+    solver_max_queued: int = Field(default=32, ge=0, le=10_000)
+    solver_session_speculative: bool = Field(default=True)
     rate_limit: str = Field(default="10/minute")
+    rate_limit_batch: str = Field(default="1000/minute")
+    rate_limit_enabled: bool = Field(default=True)
+    rate_limit_backend: Literal["memory", "sqlite"] = Field(default="memory")
+    rate_limit_path: str = Field(default="var/rate_limits.sqlite3")
+    trusted_proxies: list[IPvAnyNetwork] = Field(default_factory=list)
+    solve_cache_max_age: int = Field(default=31_536_000, ge=0)
+    solve_deadline_ms: float | None = Field(default=None, gt=0.0, le=300_000.0)
     csrf_cookie_name: str = Field(default="csrf_token")
     csrf_header_name: str = Field(default="X-CSRF-Token")
     log_level: str = Field(default="INFO")
@@ -57,29 +122,193 @@ def get_settings() -> Settings:
 
 
 @lru_cache(maxsize=1)
-def get_limiter() -> Limiter:
-    return Limiter(key_func=get_remote_address)
+def get_limiter() -> RateLimiter:
+    cfg = get_settings()
+    if cfg.rate_limit_backend == "sqlite":
+        return RateLimiter(SqliteBucketStore(cfg.rate_limit_path), enabled=cfg.rate_limit_enabled)
+    return RateLimiter(MemoryBucketStore(), enabled=cfg.rate_limit_enabled)
 
 
 @lru_cache(maxsize=1)
 def get_local_solver(settings: Settings | None = None) -> LocalSolver:
     cfg = settings or get_settings()
-    return LocalSolver(cache_size=cfg.solver_cache_size)
+    cache: SolutionCache
+    if cfg.solver_cache_backend == "sqlite":
+        cache = SqliteSolutionCache(cfg.solver_cache_path, max_entries=cfg.solver_cache_size)
+    else:
+        cache = MemorySolutionCache(cfg.solver_cache_size)
+    return LocalSolver(
+        cache=cache,
+        canonical_keys=cfg.solver_cache_symmetry,
+        near_solved=_open_near_solved(cfg.solver_near_solved_path),
+    )
+
+
+def _open_near_solved(path: str | None) -> NearSolvedTable | None:
+    if not path:
+        return None
+    try:
+        return NearSolvedTable(path)
+    except (OSError, ValueError):
+        _LOGGER.warning("near_solved_table_unavailable", path=path)
+        return None
 
 
 @lru_cache(maxsize=1)
-def get_cube_validator(local_solver: LocalSolver | None = None) -> CubeValidator:
-    solver = local_solver or get_local_solver()
-    return CubeValidator(local_solver=solver)
+def get_solver_engine() -> SolverEngine | None:
+    # Parameterless so that the lifespan and the request dependency share one pool.
+    cfg = get_settings()
+    if not cfg.solver_engine_enabled:
+        return None
+    return SolverEngine(workers=cfg.solver_workers)
 
 
 @lru_cache(maxsize=1)
-def get_circuit_breaker(settings: Settings | None = None) -> CircuitBreaker:
-    cfg = settings or get_settings()
-    return CircuitBreaker(
-        threshold=cfg.solver_api_circuit_threshold,
-        reset_timeout=cfg.solver_api_circuit_reset_seconds,
+def get_solve_coalescer() -> SingleFlight[tuple[list[str], str]]:
+    return SingleFlight()
+
+
+@lru_cache(maxsize=1)
+def get_external_batcher() -> MicroBatcher[NormalizedCubeState, MoveSequence] | None:
+    cfg = get_settings()
+    if not cfg.solver_api_batch_enabled:
+        return None
+    return MicroBatcher(
+        max_size=cfg.solver_api_batch_max_size,
+        max_delay=cfg.solver_api_batch_window_ms / 1000,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_admission_controller() -> AdmissionController:
+    cfg = get_settings()
+    # Without an explicit limit, admit as many local solves as there are solver workers.
+    limit = cfg.solver_max_in_flight or cfg.solver_workers or os.cpu_count() or 1
+    return AdmissionController(limit, cfg.solver_max_queued)
+
+
+@dataclass(slots=True)
+class SolverRuntime:
+    """Process-wide solver resources shared by every per-request facade."""
+
+    engine: SolverEngine | None = None
+    coalescer: SingleFlight[tuple[list[str], str]] | None = None
+    latency: SolverLatency = field(default_factory=SolverLatency)
+    hedge_delay: float | None = None
+    batcher: MicroBatcher[NormalizedCubeState, MoveSequence] | None = None
+    degrade_in_flight: int | None = None
+    admission: AdmissionController | None = None
+    tight_budget: float | None = None
+
+
+@lru_cache(maxsize=1)
+def get_solver_runtime() -> SolverRuntime:
+    cfg = get_settings()
+    return SolverRuntime(
+        engine=get_solver_engine(),
+        coalescer=get_solve_coalescer(),
+        hedge_delay=cfg.solver_hedge_delay_ms / 1000 if cfg.solver_hedge_enabled else None,
+        batcher=get_external_batcher(),
+        degrade_in_flight=cfg.solver_degrade_in_flight,
+        admission=get_admission_controller(),
+        tight_budget=cfg.solver_tight_budget_ms / 1000,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_cube_validator() -> CubeValidator:
+    return CubeValidator()
+
+
+@lru_cache(maxsize=1)
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    cfg = get_settings()
+    policy = BreakerPolicy(
+        window_seconds=cfg.solver_api_circuit_window_seconds,
+        error_rate=cfg.solver_api_circuit_error_rate,
+        slow_call_seconds=cfg.solver_api_circuit_slow_call_seconds,
+        half_open_max_calls=cfg.solver_api_circuit_half_open_probes,
     )
+    return CircuitBreakerRegistry(
+        lambda: CircuitBreaker(
+            threshold=cfg.solver_api_circuit_threshold,
+            reset_timeout=cfg.solver_api_circuit_reset_seconds,
+            policy=policy,
+        )
+    )
+
+
+@lru_cache(maxsize=1)
+def get_endpoint_pool() -> EndpointPool:
+    # Shared so that latency averages survive across requests.
+    cfg = get_settings()
+    urls = [cfg.solver_api_url] if cfg.solver_api_url else []
+    return EndpointPool(
+        [*urls, *cfg.solver_api_urls],
+        get_circuit_breakers(),
+        strategy=cfg.solver_api_balancing,
+    )
+
+
+def _breaker_samples() -> list[Sample]:
+    states = ("closed", "half_open", "open")
+    return [
+        ({"endpoint": endpoint, "state": state}, float(snapshot.state == state))
+        for endpoint, snapshot in get_circuit_breakers().snapshot().items()
+        for state in states
+    ]
+
+
+def _flight_samples() -> list[Sample]:
+    coalescer = get_solve_coalescer()
+    return [
+        ({"result": "started"}, coalescer.started),
+        ({"result": "coalesced"}, coalescer.coalesced),
+    ]
+
+
+def _cache_samples() -> list[Sample]:
+    cache = get_local_solver().cache
+    # Counting a blocking cache would scan it on the event loop at every scrape.
+    return [] if cache.blocking else [({}, len(cache))]
+
+
+def _admission_samples() -> list[Sample]:
+    admission = get_admission_controller()
+    return [({"state": "running"}, admission.in_flight), ({"state": "queued"}, admission.queued)]
+
+
+def _shed_samples() -> list[Sample]:
+    return [({}, get_admission_controller().shed)]
+
+
+METRICS.register_callback(
+    "krubik_circuit_breaker_state",
+    "Current circuit breaker state per external endpoint (1 for the active state).",
+    _breaker_samples,
+)
+METRICS.register_callback(
+    "krubik_solve_flights_total",
+    "Solves that started a flight or joined an identical in-flight solve.",
+    _flight_samples,
+    kind="counter",
+)
+METRICS.register_callback(
+    "krubik_solution_cache_entries",
+    "Solutions currently held by the in-memory solution cache.",
+    _cache_samples,
+)
+METRICS.register_callback(
+    "krubik_solver_queue_depth",
+    "Local solves holding an admission slot or queued for one.",
+    _admission_samples,
+)
+METRICS.register_callback(
+    "krubik_solver_shed_total",
+    "Local solves rejected because the admission queue was full.",
+    _shed_samples,
+    kind="counter",
+)
 
 
 @asynccontextmanager
@@ -89,49 +318,424 @@ async def http_client_lifespan(settings: Settings) -> AsyncIterator[httpx.AsyncC
         yield client
 
 
+@dataclass(frozen=True, slots=True)
+class SolveOptions:
+    """Quality requested for one solve."""
+
+    max_depth: int = DEFAULT_MAX_DEPTH
+    time_budget: float | None = None
+    deadline: Deadline | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class SolveReport:
+    """A solution together with the bound it was searched with and how long it took."""
+
+    moves: list[str]
+    source: str
+    max_depth: int
+    degraded: bool
+    seconds: float
+
+
+# One result of :meth:`SolverFacade.solve_many`: ``(moves, source)`` or the error.
+BatchOutcome = tuple[list[str], str] | Exception
+
+
+def _consume_result(task: asyncio.Future[Any]) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+def _log_store_failure(write: asyncio.Future[None]) -> None:
+    error = None if write.cancelled() else write.exception()
+    if error is not None:
+        _LOGGER.error("solution_cache_store_failed", exc_info=error)
+
+
+async def _before(awaitable: Awaitable[MoveSequence], deadline: Deadline) -> MoveSequence:
+    try:
+        async with asyncio.timeout_at(deadline.expires_at):
+            return await awaitable
+    except TimeoutError:
+        raise ExternalSolverError("deadline_exceeded", None) from None
+
+
 class SolverFacade:
-    """Combine the external client and the local solver with async API."""
+    """Combine the external client and the local solver with async API.
+
+    Local solves go to the runtime's :class:`SolverEngine` process pool when one
+    is configured; otherwise they run in the default thread pool. With a
+    coalescer, concurrent requests whose states share a canonical
+    representative wait on one solve of that representative. A hedge delay
+    races a local solve against slow external calls, and a batcher groups
+    concurrent external calls into batched requests.
+    """
 
     def __init__(
         self,
         *,
         external_client: ExternalSolverClient | None,
         local_solver: LocalSolver,
+        runtime: SolverRuntime | None = None,
     ) -> None:
+        runtime = runtime if runtime is not None else SolverRuntime()
         self._external_client = external_client
         self._local_solver = local_solver
-        self._lock = asyncio.Lock()
+        self._engine = runtime.engine
+        self._coalescer = runtime.coalescer
+        self._latency = runtime.latency
+        self._hedge_delay = runtime.hedge_delay
+        self._batcher = runtime.batcher
+        self._degrade_in_flight = runtime.degrade_in_flight
+        self._admission = runtime.admission
+        self._tight_budget = runtime.tight_budget
         self._logger = structlog.get_logger(__name__)
 
-    async def solve(self, state: NormalizedCubeState) -> tuple[list[str], str]:
+    async def solve(
+        self, state: NormalizedCubeState, options: SolveOptions | None = None
+    ) -> tuple[list[str], str]:
+        report = await self.solve_report(state, options)
+        return report.moves, report.source
+
+    async def solve_report(
+        self, state: NormalizedCubeState, options: SolveOptions | None = None
+    ) -> SolveReport:
+        """Solve ``state`` within the requested depth bound and time budget.
+
+        Bounds tighter than the default are searched locally. They are relaxed
+        to the default bound, and the report marked ``degraded``, while at least
+        ``degrade_in_flight`` local searches are running, or when the search
+        outlives ``time_budget`` (the runtime's ``tight_budget`` when the caller
+        sets none); a search that ran out of budget keeps going in the
+        background so that a retry finds it in the cache.
+
+        With a ``deadline``, the external solver is only given the time that
+        leaves room for a local fallback, and the solve is abandoned with
+        :class:`DeadlineExceededError` once the deadline passes.
+        """
+
+        options = options or SolveOptions()
+        if options.deadline is None:
+            return await self._report(state, options)
         try:
-            if self._external_client is not None:
-                moves = await self._external_client.solve(state)
+            async with asyncio.timeout_at(options.deadline.expires_at) as timeout:
+                return await self._report(state, options)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+            DEADLINES_EXCEEDED.inc()
+            raise DeadlineExceededError("Solve deadline exceeded") from None
+
+    async def _report(self, state: NormalizedCubeState, options: SolveOptions) -> SolveReport:
+        started = time.perf_counter()
+        max_depth = options.max_depth
+        degraded = False
+        result: tuple[list[str], str] | None = None
+        budget = options.time_budget if options.time_budget is not None else self._tight_budget
+        if max_depth < DEFAULT_MAX_DEPTH and self._overloaded():
+            max_depth, degraded = DEFAULT_MAX_DEPTH, True
+        elif max_depth < DEFAULT_MAX_DEPTH and budget is not None:
+            result = await self._solve_within(state, max_depth, budget, options.deadline)
+            if result is None:
+                max_depth, degraded = DEFAULT_MAX_DEPTH, True
+        moves, source = result or await self._solve(state, max_depth, options.deadline)
+        elapsed = time.perf_counter() - started
+        SOLVES.labels(source).observe(elapsed)
+        return SolveReport(moves, source, max_depth, degraded, elapsed)
+
+    def _overloaded(self) -> bool:
+        limit = self._degrade_in_flight
+        return limit is not None and self._latency.local.in_flight >= limit
+
+    async def _solve_within(
+        self,
+        state: NormalizedCubeState,
+        max_depth: int,
+        budget: float,
+        deadline: Deadline | None = None,
+    ) -> tuple[list[str], str] | None:
+        task = asyncio.ensure_future(self._solve(state, max_depth, deadline))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), budget)
+        except TimeoutError:
+            return None
+        finally:
+            # The shielded solve outlives a timeout or a cancelled caller alike.
+            task.add_done_callback(_consume_result)
+
+    async def _solve(
+        self,
+        state: NormalizedCubeState,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        deadline: Deadline | None = None,
+    ) -> tuple[list[str], str]:
+        if self._coalescer is None:
+            return await self._solve_uncoalesced(state, max_depth, deadline)
+        canonical, symmetry = canonicalize(state)
+        # The caller that starts the flight sets its deadline; later callers
+        # still stop waiting at their own.
+        moves, source = await self._coalescer.run(
+            (canonical, max_depth),
+            lambda: self._solve_uncoalesced(canonical, max_depth, deadline),
+        )
+        return list(symmetry.unmap_moves(tuple(moves))), source
+
+    async def _solve_uncoalesced(
+        self,
+        state: NormalizedCubeState,
+        max_depth: int,
+        deadline: Deadline | None = None,
+    ) -> tuple[list[str], str]:
+        # Optimal and cheaper than any round trip, so it goes before the external solver.
+        near_solved = self._local_solver.lookup_near_solved(state)
+        if near_solved is not None:
+            return list(near_solved), "local"
+        if max_depth < DEFAULT_MAX_DEPTH:
+            # The external solver has no depth bound, so tight tiers are searched locally.
+            moves = await self._timed(self._solve_local(state, max_depth), self._latency.local)
+            return list(moves), "local"
+        external_client = self._external_client
+        # Whatever the external solver does, the local fallback keeps its share of the deadline.
+        external_deadline = (
+            deadline.earlier_by(self._latency.local_reserve()) if deadline is not None else None
+        )
+        if external_deadline is not None and external_deadline.expired:
+            external_client = None
+        if external_client is not None and self._hedge_delay is not None:
+            return await self._solve_hedged(
+                external_client, state, self._hedge_delay, external_deadline
+            )
+        if external_client is not None:
+            try:
+                moves = await self._timed(
+                    self._solve_external(external_client, state, external_deadline),
+                    self._latency.external,
+                )
                 return list(moves), "external"
-        except (CircuitBreakerOpenError, ExternalSolverError, httpx.HTTPError) as exc:
+            except Exception as exc:  # noqa: BLE001 - every external failure falls back
+                self._note_external_failure(exc)
+
+        moves = await self._timed(self._solve_local(state), self._latency.local)
+        return list(moves), "local"
+
+    async def _solve_hedged(
+        self,
+        external_client: ExternalSolverClient,
+        state: NormalizedCubeState,
+        hedge_delay: float,
+        deadline: Deadline | None = None,
+    ) -> tuple[list[str], str]:
+        """Race the external solver against a delayed local solve.
+
+        The local solve starts after ``hedge_delay`` seconds, immediately when the
+        external path is currently slower at p95, or as soon as the external call
+        fails, but never later than the external ``deadline``. The first
+        successful result wins and the other task is cancelled.
+        """
+
+        external_task = asyncio.create_task(
+            self._timed(
+                self._solve_external(external_client, state, deadline), self._latency.external
+            )
+        )
+        sources: dict[asyncio.Task[MoveSequence], str] = {external_task: "external"}
+        delay = 0.0 if self._latency.local_is_faster() else hedge_delay
+        if deadline is not None:
+            delay = min(delay, deadline.remaining())
+        try:
+            done, pending = await asyncio.wait(sources, timeout=delay)
+            if done and external_task.exception() is None:
+                return list(external_task.result()), "external"
+            local_task = asyncio.create_task(
+                self._timed(self._solve_local(state), self._latency.local)
+            )
+            sources[local_task] = "local"
+            pending.add(local_task)
+            while True:
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return list(task.result()), sources[task]
+                    if task is external_task:
+                        self._note_external_failure(error)
+                if not pending:
+                    # Both paths failed: ``result()`` re-raises the local error.
+                    return list(local_task.result()), "local"
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in sources:
+                if not task.done():
+                    task.cancel()
+
+    def _solve_external(
+        self,
+        external_client: ExternalSolverClient,
+        state: NormalizedCubeState,
+        deadline: Deadline | None = None,
+    ) -> Awaitable[MoveSequence]:
+        if self._batcher is None:
+            call = external_client.solve(state, deadline=deadline)
+        else:
+            call = self._batcher.submit(state, external_client.solve_batch)
+        return call if deadline is None else _before(call, deadline)
+
+    def _note_external_failure(self, exc: BaseException) -> None:
+        self._external_client = None
+        EXTERNAL_FALLBACKS.inc()
+        if isinstance(exc, CircuitBreakerOpenError | ExternalSolverError | httpx.HTTPError):
             # The external solver failed; log the sanitized error and fallback to the local solver.
             self._logger.warning("external_solver_fallback", error=str(exc))
-            self._external_client = None
+        else:
+            self._logger.error("external_solver_fallback", exc_info=exc)
 
-        async with self._lock:
-            moves = await asyncio.to_thread(self._local_solver.solve, state)
-            return list(moves), "local"
+    @staticmethod
+    async def _timed(
+        awaitable: Awaitable[MoveSequence],
+        tracker: LatencyTracker,
+    ) -> MoveSequence:
+        # Cancelled solves (hedging losers) say nothing about latency and are skipped.
+        started = time.perf_counter()
+        tracker.in_flight += 1
+        try:
+            result = await awaitable
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            tracker.record(time.perf_counter() - started)
+            raise
+        finally:
+            tracker.in_flight -= 1
+        tracker.record(time.perf_counter() - started)
+        return result
+
+    async def solve_many(
+        self,
+        states: Iterable[NormalizedCubeState],
+        *,
+        concurrency: int,
+        deadline: Deadline | None = None,
+    ) -> dict[NormalizedCubeState, BatchOutcome]:
+        """Solve distinct states, serving cache hits first and bounding fan-out.
+
+        Each result is either ``(moves, source)``, the ``ValueError`` raised
+        by the local solver for that state, the ``OverloadedError`` of a
+        state that was shed, the ``DeadlineExceededError`` of a state still
+        unsolved when ``deadline`` passed, or any other exception its solve
+        raised, which is logged; one failed state never fails the batch.
+        """
+
+        results: dict[NormalizedCubeState, BatchOutcome] = {}
+        pending: list[NormalizedCubeState] = []
+        unique = list(dict.fromkeys(states))
+        for state, cached in zip(unique, await self._lookup_many(unique), strict=True):
+            if cached is not None:
+                results[state] = (list(cached), "local")
+            else:
+                pending.append(state)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def solve_one(state: NormalizedCubeState) -> None:
+            async with semaphore:
+                try:
+                    report = await self.solve_report(state, SolveOptions(deadline=deadline))
+                except (ValueError, OverloadedError, DeadlineExceededError) as exc:
+                    results[state] = exc
+                except Exception as exc:  # noqa: BLE001 - reported as a per-state error
+                    self._logger.error("batch_item_failed", exc_info=exc)
+                    results[state] = exc
+                else:
+                    results[state] = (report.moves, report.source)
+
+        await asyncio.gather(*(solve_one(state) for state in pending))
+        return results
+
+    async def _solve_local(
+        self, state: NormalizedCubeState, max_depth: int = DEFAULT_MAX_DEPTH
+    ) -> MoveSequence:
+        if self._admission is None:
+            return await self._search(state, max_depth)
+        # Cache hits skip admission, so they are answered even while solves are shed.
+        moves = await self._lookup(state, max_depth)
+        if moves is not None:
+            return moves
+        admission = self._admission
+        started = await admission.acquire()
+        # Looked up again: an earlier solve may have filled the cache while this one queued.
+        search = asyncio.ensure_future(self._search(state, max_depth))
+        # A cancelled caller leaves the worker busy, so the slot is freed with the search.
+        search.add_done_callback(lambda _: admission.release(started))
+        search.add_done_callback(_consume_result)
+        return await asyncio.shield(search)
+
+    async def _search(self, state: NormalizedCubeState, max_depth: int) -> MoveSequence:
+        if self._engine is None:
+            return await asyncio.to_thread(self._local_solver.solve, state, max_depth)
+        moves = await self._lookup(state, max_depth)
+        if moves is not None:
+            return moves
+        search = asyncio.ensure_future(self._engine.solve(state, max_depth))
+        # Stored from the callback, so a search whose caller gave up (deadline,
+        # cancelled flight or hedge) still fills the cache for the next request.
+        search.add_done_callback(partial(self._store_search, state, max_depth))
+        return await asyncio.shield(search)
+
+    def _store_search(
+        self, state: NormalizedCubeState, max_depth: int, search: asyncio.Future[MoveSequence]
+    ) -> None:
+        if not search.cancelled() and search.exception() is None:
+            self._store(state, search.result(), max_depth)
+
+    async def _lookup(
+        self, state: NormalizedCubeState, max_depth: int = DEFAULT_MAX_DEPTH
+    ) -> MoveSequence | None:
+        (moves,) = await self._lookup_many([state], max_depth)
+        return moves
+
+    async def _lookup_many(
+        self, states: list[NormalizedCubeState], max_depth: int = DEFAULT_MAX_DEPTH
+    ) -> list[MoveSequence | None]:
+        """Look ``states`` up together, in one worker thread if the cache blocks."""
+
+        local_solver = self._local_solver
+
+        def lookup_all() -> list[MoveSequence | None]:
+            return [local_solver.lookup(state, max_depth) for state in states]
+
+        if not local_solver.cache.blocking:
+            return lookup_all()
+        return await asyncio.to_thread(lookup_all)
+
+    def _store(self, state: NormalizedCubeState, moves: MoveSequence, max_depth: int) -> None:
+        """Cache ``moves``; a blocking cache is written from a thread without waiting for it."""
+
+        if not self._local_solver.cache.blocking:
+            self._local_solver.store(state, moves, max_depth)
+            return
+        loop = asyncio.get_running_loop()
+        write = loop.run_in_executor(None, self._local_solver.store, state, moves, max_depth)
+        write.add_done_callback(_log_store_failure)
 
 
 async def get_solver_facade(
-    request: Request,
+    request: HTTPConnection,
     settings: Annotated[Settings, Depends(get_settings)],
     local_solver: Annotated[LocalSolver, Depends(get_local_solver)],
-    circuit_breaker: Annotated[CircuitBreaker, Depends(get_circuit_breaker)],
+    endpoint_pool: Annotated[EndpointPool, Depends(get_endpoint_pool)],
+    runtime: Annotated[SolverRuntime, Depends(get_solver_runtime)],
 ) -> SolverFacade:
     http_client: httpx.AsyncClient | None = getattr(request.app.state, "http_client", None)
     external_client: ExternalSolverClient | None = None
-    if settings.external_solver_enabled and settings.solver_api_url and http_client is not None:
+    if settings.external_solver_enabled and endpoint_pool.endpoints and http_client is not None:
         external_client = ExternalSolverClient(
             client=http_client,
-            endpoint=settings.solver_api_url,
+            endpoints=endpoint_pool,
             timeout_seconds=settings.solver_api_timeout_seconds,
             max_retries=settings.solver_api_retries,
-            circuit_breaker=circuit_breaker,
         )
-    return SolverFacade(external_client=external_client, local_solver=local_solver)
+    return SolverFacade(
+        external_client=external_client,
+        local_solver=local_solver,
+        runtime=runtime,
+    )
@@ -41,10 +41,50 @@ _MESSAGES: dict[str, Mapping[str, str]] = {
         "en": "External solver returned malformed payload.",
         "ru": "Внешний сервис вернул некорректный ответ.",
     },
+    "invalid_solution": {
+        "en": "External solver returned a sequence that does not solve the cube.",
+        "ru": "Внешний сервис вернул последовательность, которая не собирает куб.",
+    },
+    "invalid_payload": {
+        "en": "Malformed item: expected a cube state string.",
+        "ru": "Некорректный элемент: ожидалась строка состояния куба.",
+    },
+    "invalid_body": {
+        "en": "Request body is not valid {media_type}.",
+        "ru": "Тело запроса не является корректным {media_type}.",
+    },
+    "deadline_exceeded": {
+        "en": "The cube could not be solved before the request deadline.",
+        "ru": "Не удалось собрать куб до истечения срока запроса.",
+    },
+    "overloaded": {
+        "en": "The solver is at capacity; please retry shortly.",
+        "ru": "Решатель перегружен, повторите запрос чуть позже.",
+    },
+    "solver_failed": {
+        "en": "The cube could not be solved because of a solver error.",
+        "ru": "Не удалось собрать куб из-за ошибки решателя.",
+    },
+    "unsupported_media_type": {
+        "en": "Unsupported request content type: {media_type}.",
+        "ru": "Неподдерживаемый тип содержимого запроса: {media_type}.",
+    },
+    "invalid_facelet": {
+        "en": "Facelet index must be between 0 and {limit}; received {index}.",
+        "ru": "Номер стикера должен быть от 0 до {limit}, получено {index}.",
+    },
+    "invalid_message": {
+        "en": "Unsupported session message.",
+        "ru": "Неподдерживаемое сообщение сессии.",
+    },
     "invalid_csrf": {
         "en": "CSRF token mismatch.",
         "ru": "CSRF токен не совпадает.",
     },
+    "batch_too_large": {
+        "en": "Batch must contain at most {limit} states; received {received}.",
+        "ru": "Пакет должен содержать не более {limit} состояний, получено {received}.",
+    },
     "rate_limited": {
         "en": "Rate limit exceeded. Try again later.",
         "ru": "Превышен лимит запросов. Повторите позже.",
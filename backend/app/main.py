@@ -2,34 +2,79 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import json
 import logging
+import math
+from collections.abc import AsyncIterator, Mapping
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from ipaddress import ip_address
 from typing import Annotated
 
 import structlog
-from fastapi import Depends, FastAPI, Header, HTTPException, Request, Response, status
+from fastapi import (
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-
+from fastapi.requests import HTTPConnection
+from pydantic import BaseModel, Field, ValidationError
+
+from .codecs import (
+    CUBE_STATE_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    UnsupportedMediaTypeError,
+    decode_body,
+    encode,
+    media_type_of,
+    negotiate,
+)
 from .dependencies import (
     Settings,
+    SolveOptions,
+    SolveReport,
     SolverFacade,
     get_cube_validator,
     get_limiter,
     get_settings,
+    get_solver_engine,
     get_solver_facade,
     http_client_lifespan,
 )
 from .localization import resolve_language, translate
+from .services.admission import OverloadedError
+from .services.cube_session import CubeSession
 from .services.cube_validator import CubeValidationError, CubeValidator
+from .services.deadline import Deadline, DeadlineExceededError
+from .services.metrics import CONTENT_TYPE, METRICS
+from .services.rate_limiter import RateLimitDecision
+from .services.solver_engine import SolverEngine
+from .services.solver_local import DEFAULT_MAX_DEPTH, MIN_MAX_DEPTH
 from .services.types import NormalizedCubeState
+from .services.warmup import warm_up
+from .streaming import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    DuplexStreamingResponse,
+    iter_states,
+    ndjson_line,
+    sse_event,
+)
 
 LOGGER = structlog.get_logger(__name__)
+WARM_UP_ATTEMPTS = 3
 
 
 def configure_logging(level: str) -> None:
@@ -60,12 +105,27 @@ class SolveContext:
     settings: Settings
     validator: CubeValidator
     solver: SolverFacade
+    deadline: Deadline | None = None
+    timeout_ms: float | None = None
+
+    def solve_deadline(self) -> Deadline | None:
+        """A fresh deadline of the request's length, for each solve of a stream or session."""
+
+        return request_deadline(self.settings, self.timeout_ms)
+
+
+def request_deadline(settings: Settings, timeout_ms: float | None) -> Deadline | None:
+    """The earlier of the client's ``X-Request-Timeout-Ms`` and the configured deadline."""
+
+    limits = [ms for ms in (timeout_ms, settings.solve_deadline_ms) if ms is not None]
+    return Deadline.after(min(limits) / 1000) if limits else None
 
 
 def get_solve_context(
     settings_dependency: Annotated[Settings, Depends(get_settings)],
     validator: Annotated[CubeValidator, Depends(get_cube_validator)],
     solver_facade: Annotated[SolverFacade, Depends(get_solver_facade)],
+    request_timeout_ms: Annotated[float | None, Header(alias="X-Request-Timeout-Ms", gt=0)] = None,
 ) -> SolveContext:
     """Bundle dependencies to satisfy ruff complexity constraints."""
 
@@ -73,23 +133,76 @@ def get_solve_context(
         settings=settings_dependency,
         validator=validator,
         solver=solver_facade,
+        deadline=request_deadline(settings_dependency, request_timeout_ms),
+        timeout_ms=request_timeout_ms,
     )
 
 
+async def run_warm_up(
+    app: FastAPI,
+    engine: SolverEngine | None,
+    *,
+    attempts: int = WARM_UP_ATTEMPTS,
+    retry_delay: float = 1.0,
+) -> None:
+    """Warm the solver in the background and flip readiness once it is done.
+
+    Failed warm-ups are retried with a doubling delay; after ``attempts``
+    failures ``/ready`` reports ``failed`` so the orchestrator replaces the
+    process instead of waiting on it forever.
+    """
+
+    if settings.solver_warmup_enabled:
+        for attempt in range(1, attempts + 1):
+            try:
+                await warm_up(engine, samples=settings.solver_warmup_samples)
+                break
+            except Exception:
+                LOGGER.exception("warmup_failed", attempt=attempt, attempts=attempts)
+                if attempt == attempts:
+                    app.state.warm_up_failed = True
+                    return
+                await asyncio.sleep(retry_delay * 2 ** (attempt - 1))
+    app.state.ready = True
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     configure_logging(settings.log_level)
-    app.state.limiter = limiter
-    app.state.rate_limit = settings.rate_limit
-    async with http_client_lifespan(settings) as client:
-        app.state.http_client = client
-        yield
+    app.state.ready = False
+    app.state.warm_up_failed = False
+    engine = get_solver_engine()
+    if engine is not None:
+        engine.start()
+    try:
+        async with http_client_lifespan(settings) as client:
+            app.state.http_client = client
+            warm_up_task = asyncio.create_task(run_warm_up(app, engine))
+            try:
+                yield
+            finally:
+                warm_up_task.cancel()
+    finally:
+        if engine is not None:
+            engine.shutdown()
 
 
 class SolveRequest(BaseModel):
     """Schema representing a request to solve a cube state."""
 
     state: str = Field(..., min_length=1, description="Serialized cube state")
+    max_depth: int | None = Field(
+        default=None,
+        ge=MIN_MAX_DEPTH,
+        le=DEFAULT_MAX_DEPTH,
+        description="Longest acceptable solution; tighter bounds search longer",
+    )
+    time_budget_ms: int | None = Field(
+        default=None,
+        ge=1,
+        le=60_000,
+        description="Search time after which a tight max_depth is relaxed to the default",
+    )
 
     model_config = {
         "json_schema_extra": {
@@ -105,25 +218,52 @@ class SolveResponse(BaseModel):
 
     moves: list[str]
     source: str
+    length: int
+    max_depth: int
+    degraded: bool = Field(description="Whether max_depth was relaxed under load or budget")
+    search_ms: float
 
 
-def rate_limit_handler(request: Request, exc: RateLimitExceeded):
-    language = resolve_language(request.headers.get("Accept-Language"))
-    message = translate("rate_limited", language)
-    return JSONResponse(
-        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-        content={"code": "rate_limited", "message": message},
-    )
+class SolveBatchRequest(BaseModel):
+    """Schema representing a request to solve many cube states at once."""
+
+    states: list[str] = Field(..., min_length=1, description="Serialized cube states")
+
+
+class SolveError(BaseModel):
+    """Localized error attached to a single batch item."""
+
+    code: str
+    message: str
+
+
+class SolveBatchItem(BaseModel):
+    """Result for one state of a batch, in request order."""
+
+    index: int
+    moves: list[str] | None = None
+    source: str | None = None
+    error: SolveError | None = None
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness probe payload."""
+
+    status: str
+
+
+class SolveBatchResponse(BaseModel):
+    """Schema representing the batch solver response."""
+
+    results: list[SolveBatchItem]
 
 
 app = FastAPI(title="Krubik Solver", version="0.2.0", lifespan=lifespan)
-app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
-app.add_middleware(SlowAPIMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["POST", "OPTIONS"],
+    allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
 )
 
@@ -132,21 +272,10 @@ def mask_state(state: NormalizedCubeState) -> str:
     digest = hashlib.sha256(state.encode("utf-8")).hexdigest()
     return digest[:12]
 
-@app.post("/solve", response_model=SolveResponse)
-async def solve_cube(
-    request: Request,
-    response: Response,
-    payload: SolveRequest,
-    context: Annotated[SolveContext, Depends(get_solve_context)],
-    accept_language: Annotated[str | None, Header(alias="Accept-Language")] = None,
-) -> SolveResponse:
-    """Validate cube state, solve it and return the move sequence."""
 
-    language = resolve_language(accept_language)
-    if limiter.enabled:
-        limiter._check_request_limit(request, solve_cube, False)
-    csrf_cookie = request.cookies.get(context.settings.csrf_cookie_name)
-    csrf_header = request.headers.get(context.settings.csrf_header_name)
+def verify_csrf(request: Request, settings_dependency: Settings, language: str) -> None:
+    csrf_cookie = request.cookies.get(settings_dependency.csrf_cookie_name)
+    csrf_header = request.headers.get(settings_dependency.csrf_header_name)
     if not csrf_cookie or csrf_cookie != csrf_header:
         message = translate("invalid_csrf", language)
         raise HTTPException(
@@ -154,24 +283,599 @@ async def solve_cube(
             detail={"code": "invalid_csrf", "message": message},
         )
 
+
+def is_trusted_proxy(address: str) -> bool:
+    try:
+        parsed = ip_address(address)
+    except ValueError:
+        return False
+    return any(parsed in network for network in settings.trusted_proxies)
+
+
+def client_key(connection: HTTPConnection) -> str:
+    """Address of the client, looking through the reverse proxies in ``trusted_proxies``.
+
+    ``X-Forwarded-For`` is read right to left and the first untrusted hop wins,
+    so a client cannot pick its own key by sending the header itself.
+    """
+
+    host = connection.client.host if connection.client else "unknown"
+    if not is_trusted_proxy(host):
+        return host
+    forwarded = connection.headers.get("x-forwarded-for", "").split(",")
+    for hop in reversed([hop.strip() for hop in forwarded if hop.strip()]):
+        if not is_trusted_proxy(hop):
+            return hop
+    return connection.headers.get("x-real-ip", host)
+
+
+async def rate_limit_exceeded(connection: HTTPConnection, rate: str, scope: str, cost: int) -> bool:
+    """Charge ``cost`` hits against ``rate``; ``True`` when the limit is exhausted."""
+
+    decision = await limiter.acquire(f"{scope}:{client_key(connection)}", rate, cost=cost)
+    return not decision.allowed
+
+
+async def consume_rate_limit(
+    request: Request, rate: str, scope: str, cost: int, language: str
+) -> RateLimitDecision:
+    """Charge ``cost`` hits against ``rate`` in a single check, raising 429 when exhausted."""
+
+    decision = await limiter.acquire(f"{scope}:{client_key(request)}", rate, cost=cost)
+    if not decision.allowed:
+        message = translate("rate_limited", language)
+        # An infinite wait means the cost can never fit, so there is nothing to retry.
+        headers = None
+        if math.isfinite(decision.retry_after):
+            headers = {"Retry-After": str(math.ceil(decision.retry_after))}
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={"code": "rate_limited", "message": message},
+            headers=headers,
+        )
+    return decision
+
+
+def validation_failed(exc: CubeValidationError, state: str, language: str) -> HTTPException:
+    """Log a rejected state and build the localized 422 for it."""
+
+    error_context = exc.context or {}
+    message = translate(exc.message_key, language, **error_context)
+    detail: dict[str, object] = {"code": exc.message_key, "message": message}
+    if "invariant" in error_context:
+        detail["invariant"] = error_context["invariant"]
+    LOGGER.info(
+        "validation_error",
+        code=exc.message_key,
+        invariant=error_context.get("invariant"),
+        state_hash=mask_state(state),
+    )
+    return HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+
+
+async def solve_for_request(
+    solver: SolverFacade, state: NormalizedCubeState, options: SolveOptions, language: str
+) -> SolveReport:
+    """Run ``solve_report``; exceeded deadlines become 504 and shed solves 503."""
+
+    try:
+        return await solver.solve_report(state, options)
+    except DeadlineExceededError as exc:
+        code = "deadline_exceeded"
+        detail = {"code": code, "message": translate(code, language)}
+        raise HTTPException(status.HTTP_504_GATEWAY_TIMEOUT, detail=detail) from exc
+    except OverloadedError as exc:
+        code = "overloaded"
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"code": code, "message": translate(code, language)},
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        ) from exc
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of ``If-None-Match`` against ``etag``, as RFC 9110 requires."""
+
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def solve_response(report: SolveReport, media_type: str, headers: dict[str, str]) -> Response:
+    """Encode a solve report directly, skipping ``SolveResponse`` validation."""
+
+    content = {
+        "moves": report.moves,
+        "source": report.source,
+        "length": len(report.moves),
+        "max_depth": report.max_depth,
+        "degraded": report.degraded,
+        "search_ms": round(report.seconds * 1000, 3),
+    }
+    return Response(encode(content, media_type), media_type=media_type, headers=headers)
+
+
+def rate_limit_headers(decision: RateLimitDecision) -> dict[str, str]:
+    return {
+        "X-RateLimit-Limit": str(decision.limit),
+        "X-RateLimit-Remaining": str(decision.remaining),
+        "X-RateLimit-Reset": str(math.ceil(decision.reset_after)),
+    }
+
+
+async def read_solve_request(
+    request: Request,
+    accept_language: Annotated[str | None, Header(alias="Accept-Language")] = None,
+) -> SolveRequest:
+    """Decode a ``/solve`` body sent as JSON, MessagePack or a packed cube state."""
+
+    media_type = media_type_of(request.headers.get("Content-Type"))
+    try:
+        payload = decode_body(await request.body(), media_type)
+    except UnsupportedMediaTypeError as exc:
+        code, status_code = "unsupported_media_type", status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        message = translate(code, resolve_language(accept_language), media_type=exc.media_type)
+        raise HTTPException(status_code, detail={"code": code, "message": message}) from exc
+    except ValueError as exc:
+        code, status_code = "invalid_body", status.HTTP_422_UNPROCESSABLE_ENTITY
+        message = translate(code, resolve_language(accept_language), media_type=media_type)
+        raise HTTPException(status_code, detail={"code": code, "message": message}) from exc
+    try:
+        return SolveRequest.model_validate(payload)
+    except ValidationError as exc:
+        errors = [
+            {**error, "loc": ("body", *error["loc"])} for error in exc.errors(include_url=False)
+        ]
+        raise RequestValidationError(errors, body=payload) from exc
+
+
+_SOLVE_REQUEST_BODY: dict[str, object] = {
+    "required": True,
+    "content": {
+        JSON_MEDIA_TYPE: {"schema": SolveRequest.model_json_schema()},
+        MSGPACK_MEDIA_TYPE: {"schema": SolveRequest.model_json_schema()},
+        CUBE_STATE_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+    },
+}
+
+
+@app.post(
+    "/solve",
+    response_model=SolveResponse,
+    responses={status.HTTP_200_OK: {"content": {MSGPACK_MEDIA_TYPE: {}}}},
+    openapi_extra={"requestBody": _SOLVE_REQUEST_BODY},
+)
+async def solve_cube(
+    request: Request,
+    payload: Annotated[SolveRequest, Depends(read_solve_request)],
+    context: Annotated[SolveContext, Depends(get_solve_context)],
+    accept_language: Annotated[str | None, Header(alias="Accept-Language")] = None,
+) -> Response:
+    """Validate cube state, solve it and return the move sequence.
+
+    The body may be JSON, MessagePack or the 9-byte packed state; the reply is
+    JSON or MessagePack according to ``Accept``. It is encoded straight from a
+    dictionary, without re-validating it against ``SolveResponse``. A solve
+    that outlives ``X-Request-Timeout-Ms`` or the configured deadline gets 504.
+    """
+
+    language = resolve_language(accept_language)
+    decision = await consume_rate_limit(request, context.settings.rate_limit, "solve", 1, language)
+    verify_csrf(request, context.settings, language)
+
     try:
         normalized = context.validator.validate(payload.state)
     except CubeValidationError as exc:
-        message = translate(exc.message_key, language, **(exc.context or {}))
-        LOGGER.info(
-            "validation_error",
-            code=exc.message_key,
-            state_hash=mask_state(payload.state),
-        )
+        raise validation_failed(exc, payload.state, language) from exc
+
+    options = SolveOptions(
+        max_depth=payload.max_depth or DEFAULT_MAX_DEPTH,
+        time_budget=payload.time_budget_ms / 1000 if payload.time_budget_ms else None,
+        deadline=context.deadline,
+    )
+    report = await solve_for_request(context.solver, normalized, options, language)
+    media_type = negotiate(request.headers.get("Accept"))
+    return solve_response(report, media_type, {**rate_limit_headers(decision), "Vary": "Accept"})
+
+
+@app.get(
+    "/solve/{state}",
+    response_model=SolveResponse,
+    responses={
+        status.HTTP_200_OK: {"content": {MSGPACK_MEDIA_TYPE: {}}},
+        status.HTTP_304_NOT_MODIFIED: {"description": "The cached solution is still valid"},
+    },
+)
+async def solve_cube_cacheable(
+    request: Request,
+    state: str,
+    context: Annotated[SolveContext, Depends(get_solve_context)],
+    max_depth: Annotated[int | None, Query(ge=MIN_MAX_DEPTH, le=DEFAULT_MAX_DEPTH)] = None,
+    accept_language: Annotated[str | None, Header(alias="Accept-Language")] = None,
+) -> Response:
+    """Idempotent, CSRF-free variant of ``POST /solve`` that caches and proxies can store.
+
+    The ETag names the packed state, the depth bound and the media type, so a
+    matching ``If-None-Match`` gets ``304`` without solving or charging the
+    rate limit. It is weak: ``source`` and ``search_ms`` differ between equally
+    good answers. Degraded answers are marked ``no-store``.
+    """
+
+    language = resolve_language(accept_language)
+    try:
+        packed = context.validator.validate_packed(state)
+    except CubeValidationError as exc:
+        raise validation_failed(exc, state, language) from exc
+
+    depth = max_depth or DEFAULT_MAX_DEPTH
+    media_type = negotiate(request.headers.get("Accept"))
+    etag = f'W/"{packed.digest}-{depth}-{media_type.rsplit("/", 1)[-1]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={context.settings.solve_cache_max_age}, immutable",
+        "Vary": "Accept",
+    }
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Rate limit headers are left out: shared caches would replay stale counts.
+    await consume_rate_limit(request, context.settings.rate_limit, "solve", 1, language)
+    options = SolveOptions(max_depth=depth, deadline=context.deadline)
+    report = await solve_for_request(context.solver, packed.to_facelets(), options, language)
+    if report.degraded:
+        headers = {"Cache-Control": "no-store", "Vary": "Accept"}
+    return solve_response(report, media_type, headers)
+
+
+@app.post("/solve/batch", response_model=SolveBatchResponse)
+async def solve_cube_batch(
+    request: Request,
+    response: Response,
+    payload: SolveBatchRequest,
+    context: Annotated[SolveContext, Depends(get_solve_context)],
+    accept_language: Annotated[str | None, Header(alias="Accept-Language")] = None,
+) -> SolveBatchResponse:
+    """Validate and solve many states, reporting per-item results or errors."""
+
+    language = resolve_language(accept_language)
+    verify_csrf(request, context.settings, language)
+    limit = context.settings.solver_batch_max_size
+    if len(payload.states) > limit:
+        message = translate("batch_too_large", language, limit=limit, received=len(payload.states))
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail={"code": exc.message_key, "message": message},
-        ) from exc
+            detail={"code": "batch_too_large", "message": message},
+        )
+    # Batches have their own bucket and cost one token per state; a batch larger
+    # than the bucket drains it instead of being refused forever.
+    rate = context.settings.rate_limit_batch
+    cost = len(payload.states)
+    capacity = limiter.capacity(rate)
+    if capacity is not None:
+        cost = min(cost, capacity)
+    decision = await consume_rate_limit(request, rate, "solve_batch", cost, language)
+    response.headers.update(rate_limit_headers(decision))
+
+    items: list[SolveBatchItem] = []
+    normalized_states: dict[int, NormalizedCubeState] = {}
+    checked = context.validator.validate_many(payload.states)
+    for index, state in enumerate(payload.states):
+        # Only rejected rows go through the scalar validator, for the error context.
+        error = None if checked.is_valid(index) else context.validator.error_for(state)
+        if error is None:
+            normalized_states[index] = checked.states[index]
+            continue
+        items.append(error_item(index, error.message_key, language, dict(error.context or {})))
+
+    solved = await context.solver.solve_many(
+        normalized_states.values(),
+        concurrency=context.settings.solver_batch_concurrency,
+        deadline=context.deadline,
+    )
+    for index, normalized in normalized_states.items():
+        outcome = solved[normalized]
+        if isinstance(outcome, DeadlineExceededError):
+            items.append(error_item(index, "deadline_exceeded", language))
+        elif isinstance(outcome, OverloadedError):
+            items.append(error_item(index, "overloaded", language))
+        elif isinstance(outcome, ValueError):
+            items.append(error_item(index, "unsolvable", language))
+        elif isinstance(outcome, Exception):
+            items.append(error_item(index, "solver_failed", language))
+        else:
+            moves, source = outcome
+            items.append(SolveBatchItem(index=index, moves=moves, source=source))
+
+    LOGGER.info(
+        "batch_solved",
+        size=len(payload.states),
+        unique=len(solved),
+        invalid=len(payload.states) - len(normalized_states),
+    )
+    items.sort(key=lambda item: item.index)
+    return SolveBatchResponse(results=items)
+
 
-    moves, source = await context.solver.solve(normalized)
-    result = SolveResponse(moves=moves, source=source)
+def error_item(
+    index: int, code: str, language: str, context: dict[str, object] | None = None
+) -> SolveBatchItem:
+    message = translate(code, language, **(context or {}))
+    return SolveBatchItem(index=index, error=SolveError(code=code, message=message))
 
-    if limiter.enabled and hasattr(request.state, "view_rate_limit"):
-        limiter._inject_headers(response, request.state.view_rate_limit)
 
-    return result
+async def solve_item(
+    context: SolveContext, index: int, state: str | None, language: str
+) -> SolveBatchItem:
+    """Validate and solve one streamed state, turning domain errors into items."""
+
+    if state is None:
+        return error_item(index, "invalid_payload", language)
+    try:
+        normalized = context.validator.validate(state)
+    except CubeValidationError as exc:
+        return error_item(index, exc.message_key, language, dict(exc.context or {}))
+    options = SolveOptions(deadline=context.solve_deadline())
+    try:
+        moves, source = await context.solver.solve(normalized, options)
+    except ValueError:
+        return error_item(index, "unsolvable", language)
+    except OverloadedError:
+        return error_item(index, "overloaded", language)
+    except DeadlineExceededError:
+        return error_item(index, "deadline_exceeded", language)
+    return SolveBatchItem(index=index, moves=moves, source=source)
+
+
+async def stream_solutions(
+    request: Request,
+    context: SolveContext,
+    states: AsyncIterator[str | None],
+    language: str,
+) -> AsyncIterator[SolveBatchItem]:
+    """Solve ``states`` concurrently and yield each item as soon as it is done.
+
+    At most ``solver_batch_concurrency`` items are solving or waiting to be
+    sent, so the next state is only read once the client has taken an earlier
+    result. Every state is charged against the rate limit as it arrives.
+    """
+
+    slots = asyncio.Semaphore(context.settings.solver_batch_concurrency)
+    finished: asyncio.Queue[SolveBatchItem | None] = asyncio.Queue()
+
+    async def solve_one(index: int, state: str | None) -> None:
+        try:
+            item = await solve_item(context, index, state, language)
+        except Exception:
+            # One failed item must not end the stream for every other item.
+            LOGGER.exception("stream_item_failed", index=index)
+            item = error_item(index, "solver_failed", language)
+        finished.put_nowait(item)
+
+    async def feed() -> None:
+        try:
+            async with asyncio.TaskGroup() as group:
+                index = 0
+                async for state in states:
+                    await slots.acquire()
+                    rate = context.settings.rate_limit
+                    if await rate_limit_exceeded(request, rate, "solve_stream", 1):
+                        finished.put_nowait(error_item(index, "rate_limited", language))
+                        break
+                    group.create_task(solve_one(index, state))
+                    index += 1
+        finally:
+            finished.put_nowait(None)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while (item := await finished.get()) is not None:
+            yield item
+            slots.release()
+        await feeder
+    finally:
+        feeder.cancel()
+
+
+@app.post("/solve/stream", response_class=DuplexStreamingResponse)
+async def solve_cube_stream(
+    request: Request,
+    context: Annotated[SolveContext, Depends(get_solve_context)],
+    accept: Annotated[str | None, Header()] = None,
+    accept_language: Annotated[str | None, Header(alias="Accept-Language")] = None,
+) -> DuplexStreamingResponse:
+    """Stream results of many states in completion order.
+
+    The body is either NDJSON (``application/x-ndjson``, one state per line,
+    solved while the upload is still arriving) or ``{"states": [...]}``. Each
+    result is sent as an NDJSON line, or as an SSE ``result`` event when the
+    client accepts ``text/event-stream``, and carries the input index.
+    """
+
+    language = resolve_language(accept_language)
+    verify_csrf(request, context.settings, language)
+    ndjson = NDJSON_MEDIA_TYPE in request.headers.get("content-type", "")
+    sse = SSE_MEDIA_TYPE in (accept or "")
+
+    async def produce(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        states = iter_states(chunks, ndjson=ndjson)
+        async for item in stream_solutions(request, context, states, language):
+            yield sse_event("result", item) if sse else ndjson_line(item)
+        if sse:
+            yield "event: end\ndata: {}\n\n"
+
+    return DuplexStreamingResponse(produce, media_type=SSE_MEDIA_TYPE if sse else NDJSON_MEDIA_TYPE)
+
+
+SolveTask = asyncio.Task[tuple[list[str], str]]
+
+
+class SolveSession:
+    """Server side of one ``/solve/session`` connection.
+
+    Holds the wizard's cube, answers every edit with the incremental
+    validation result and keeps at most one speculative solve running for the
+    latest solvable state. Each solve that is started is charged against the
+    rate limit; once the limit is exhausted speculation stops and explicit
+    ``solve`` requests get a ``rate_limited`` error.
+    """
+
+    def __init__(self, connection: HTTPConnection, context: SolveContext, language: str) -> None:
+        self._connection = connection
+        self._context = context
+        self._language = language
+        self._cube = CubeSession()
+        self._solving: tuple[NormalizedCubeState, SolveTask] | None = None
+
+    async def handle(self, raw: str) -> dict[str, object]:
+        try:
+            message = json.loads(raw)
+            kind = message["type"]
+        except (KeyError, TypeError, ValueError):
+            return self._error("invalid_message")
+        if kind == "solve":
+            return await self._solve()
+        try:
+            if kind == "load":
+                self._cube.load(str(message["state"]))
+            elif kind == "set":
+                self._cube.set_facelet(int(message["index"]), str(message["color"]))
+            else:
+                return self._error("invalid_message")
+        except CubeValidationError as exc:
+            return self._error(exc.message_key, exc.context)
+        except (KeyError, TypeError, ValueError):
+            return self._error("invalid_message")
+        return await self._validation()
+
+    def close(self) -> None:
+        if self._solving is not None:
+            self._solving[1].cancel()
+            self._solving = None
+
+    async def _validation(self) -> dict[str, object]:
+        issues = self._cube.issues()
+        if not issues and self._context.settings.solver_session_speculative:
+            await self._start_solve(self._cube.state)
+        return {
+            "type": "validation",
+            "valid": not issues,
+            "issues": [self._describe(issue) for issue in issues],
+        }
+
+    async def _solve(self) -> dict[str, object]:
+        issues = self._cube.issues()
+        if issues:
+            return {"type": "error", **self._describe(issues[0])}
+        task = await self._start_solve(self._cube.state)
+        if task is None:
+            return self._error("rate_limited")
+        precomputed = task.done()
+        try:
+            moves, source = await task
+        except ValueError:
+            return self._error("unsolvable")
+        except Exception as exc:  # noqa: BLE001 - reported to the client, unknown ones logged
+            # Keep the socket open; a later ``solve`` starts a fresh attempt.
+            if self._solving is not None and self._solving[1] is task:
+                self._solving = None
+            return self._error(self._failure_code(exc))
+        return {"type": "solution", "moves": moves, "source": source, "precomputed": precomputed}
+
+    @staticmethod
+    def _failure_code(exc: Exception) -> str:
+        if isinstance(exc, OverloadedError):
+            return "overloaded"
+        if isinstance(exc, DeadlineExceededError):
+            return "deadline_exceeded"
+        LOGGER.error("session_solve_failed", exc_info=exc)
+        return "solver_failed"
+
+    async def _start_solve(self, state: NormalizedCubeState) -> SolveTask | None:
+        """Return the solve task for ``state``, starting one unless rate limited."""
+
+        if self._solving is not None and self._solving[0] == state:
+            return self._solving[1]
+        rate = self._context.settings.rate_limit
+        if await rate_limit_exceeded(self._connection, rate, "solve_session", 1):
+            return None
+        self.close()
+        options = SolveOptions(deadline=self._context.solve_deadline())
+        task = asyncio.create_task(self._context.solver.solve(state, options))
+        # Failures are reported by ``_solve``; a dropped speculation must not log them.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._solving = (state, task)
+        return task
+
+    def _describe(self, error: CubeValidationError) -> dict[str, object]:
+        context = dict(error.context or {})
+        detail: dict[str, object] = {
+            "code": error.message_key,
+            "message": translate(error.message_key, self._language, **context),
+        }
+        for key in ("invariant", "facelets"):
+            if key in context:
+                detail[key] = context[key]
+        return detail
+
+    def _error(self, code: str, context: Mapping[str, object] | None = None) -> dict[str, object]:
+        message = translate(code, self._language, **(context or {}))
+        return {"type": "error", "code": code, "message": message}
+
+
+@app.websocket("/solve/session")
+async def solve_session(
+    websocket: WebSocket,
+    context: Annotated[SolveContext, Depends(get_solve_context)],
+    csrf_token: str | None = None,
+) -> None:
+    """Interactive session for the cube input wizard.
+
+    Browsers cannot set headers on a WebSocket handshake, so the CSRF token is
+    passed as the ``csrf_token`` query parameter and checked against the cookie
+    once per connection. Client messages:
+
+    * ``{"type": "load", "state": "..."}`` replaces the whole state;
+    * ``{"type": "set", "index": 0, "color": "U"}`` paints one facelet;
+    * ``{"type": "solve"}`` asks for the solution of the current state.
+
+    Edits are answered with ``{"type": "validation", "valid": ..., "issues": [...]}``;
+    ``solve`` with ``{"type": "solution", "moves": [...], "source": ..., "precomputed": ...}``.
+    Problems are reported as ``{"type": "error", "code": ..., "message": ...}``.
+    """
+
+    language = resolve_language(websocket.headers.get("accept-language"))
+    cookie = websocket.cookies.get(context.settings.csrf_cookie_name)
+    if not cookie or cookie != csrf_token:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="invalid_csrf")
+        return
+    await websocket.accept()
+    session = SolveSession(websocket, context, language)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            # Binary frames carry no ``text``; "" is answered like malformed JSON.
+            await websocket.send_json(await session.handle(message.get("text") or ""))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.close()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return Response(METRICS.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/ready", response_model=ReadinessResponse)
+async def readiness(response: Response) -> ReadinessResponse:
+    """Report ready once warm-up has loaded the solver tables, ``failed`` if it gave up."""
+
+    if not getattr(app.state, "ready", False):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        if getattr(app.state, "warm_up_failed", False):
+            return ReadinessResponse(status="failed")
+        return ReadinessResponse(status="warming_up")
+    return ReadinessResponse(status="ready")
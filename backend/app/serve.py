@@ -0,0 +1,108 @@
+"""Prefork server: warm up once, then fork workers that share the solver tables.
+
+``python -m app.serve --workers 4`` imports the application, loads the
+Kociemba pruning tables and runs the warm-up samples in the parent process,
+binds the listening socket and only then forks the workers. Every worker
+inherits the loaded tables copy-on-write instead of loading its own copy, and
+starts serving already warm. Crashed workers are replaced; SIGINT/SIGTERM
+stops all of them.
+
+Forked workers already give process-level parallelism, so the solver engine
+process pool is disabled by default in this mode
+(``KRUBIK_SOLVER_ENGINE_ENABLED`` still overrides it).
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import gc
+import os
+import signal
+import socket
+import sys
+from types import FrameType
+
+import structlog
+
+_LOGGER = structlog.get_logger(__name__)
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.serve", description=__doc__)
+    parser.add_argument("--host", default="0.0.0.0")  # noqa: S104 - container entry point
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backlog", type=int, default=2048)
+    return parser.parse_args(argv)
+
+
+def _serve_worker(sock: socket.socket) -> None:
+    import uvicorn
+
+    from .main import app, settings
+
+    config = uvicorn.Config(app, log_level=settings.log_level.lower(), lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _fork_worker(sock: socket.socket) -> int:
+    pid = os.fork()
+    if pid == 0:
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        status = 0
+        try:
+            _serve_worker(sock)
+        except BaseException:  # the child must never return into the parent loop
+            _LOGGER.exception("worker_crashed")
+            status = 1
+        os._exit(status)
+    return pid
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    os.environ.setdefault("KRUBIK_SOLVER_ENGINE_ENABLED", "false")
+
+    from .main import settings
+    from .services.warmup import warm_up_process
+
+    if settings.solver_warmup_enabled:
+        warm_up_process(settings.solver_warmup_samples)
+    # Keep the warmed objects out of the collector so that GC passes in the
+    # workers do not write to (and un-share) the inherited pages.
+    gc.freeze()
+
+    sock = socket.create_server((args.host, args.port), backlog=args.backlog)
+    sock.set_inheritable(True)
+    workers = {_fork_worker(sock) for _ in range(args.workers)}
+    _LOGGER.info("prefork_started", workers=len(workers), port=args.port)
+
+    stopping = False
+
+    def stop(signum: int, _frame: FrameType | None) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signum)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        workers.discard(pid)
+        if not stopping:
+            _LOGGER.warning("worker_exited", pid=pid, status=status)
+            workers.add(_fork_worker(sock))
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
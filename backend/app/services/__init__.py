@@ -1,13 +1,30 @@
 """Service exports for convenience."""
 
+from .admission import AdmissionController, OverloadedError
+from .cube_session import CubeSession
+from .cube_state import CubeState
 from .cube_validator import CubeValidationError, CubeValidator
-from .solver_client import CircuitBreaker, ExternalSolverClient
+from .deadline import Deadline, DeadlineExceededError
+from .solver_client import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    EndpointPool,
+    ExternalSolverClient,
+)
 from .solver_local import LocalSolver
 
 __all__ = [
+    "AdmissionController",
     "CircuitBreaker",
+    "CircuitBreakerRegistry",
+    "CubeSession",
+    "CubeState",
     "CubeValidationError",
     "CubeValidator",
+    "Deadline",
+    "DeadlineExceededError",
+    "EndpointPool",
     "ExternalSolverClient",
     "LocalSolver",
+    "OverloadedError",
 ]
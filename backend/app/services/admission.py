@@ -0,0 +1,118 @@
+"""Admission control for local solves: a bounded number running, a bounded queue."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Final
+
+# Assumed solve time until the first slot has been released.
+DEFAULT_SERVICE_TIME: Final[float] = 1.0
+_SMOOTHING: Final[float] = 0.2
+
+
+class OverloadedError(RuntimeError):
+    """Raised when a solve is shed because every slot and queue place is taken."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Solver overloaded")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Let ``limit`` solves run at once and up to ``queue_limit`` wait for a slot.
+
+    Anything beyond that is rejected at once with :class:`OverloadedError`
+    instead of joining an unbounded queue, which would slow every request
+    down. Waiters are admitted in arrival order. The hint in ``retry_after``
+    is the time the current queue needs to drain, estimated from a moving
+    average of how long slots are held.
+    """
+
+    def __init__(self, limit: int, queue_limit: int) -> None:
+        if limit < 1 or queue_limit < 0:
+            raise ValueError("limit must be positive and queue_limit non-negative")
+        self.limit = limit
+        self.queue_limit = queue_limit
+        self._running = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._service_time = DEFAULT_SERVICE_TIME
+        self._shed = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def shed(self) -> int:
+        """Number of solves rejected so far."""
+
+        return self._shed
+
+    def retry_after(self) -> float:
+        return max(1.0, math.ceil(self._service_time * (self.queued + 1) / self.limit))
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot for the body, waiting in the queue if needed."""
+
+        started = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(started)
+
+    async def acquire(self) -> float:
+        """Take a slot, waiting in the queue if needed.
+
+        Returns the time the slot was taken, to be passed to :meth:`release`.
+        For work that outlives its caller, where :meth:`admit` would free the
+        slot too early.
+        """
+
+        if self._running < self.limit and not self._waiters:
+            self._running += 1
+        else:
+            await self._wait()
+        return time.monotonic()
+
+    def release(self, started: float) -> None:
+        """Give back a slot taken by :meth:`acquire` at ``started``."""
+
+        held = time.monotonic() - started
+        self._service_time += _SMOOTHING * (held - self._service_time)
+        self._release()
+
+    async def _wait(self) -> None:
+        if len(self._waiters) >= self.queue_limit:
+            self._shed += 1
+            raise OverloadedError(self.retry_after())
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            else:
+                # The slot was handed over just before the cancellation; pass it on.
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        # A released slot goes straight to the oldest waiter, so ``_running`` stays put.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._running -= 1
@@ -0,0 +1,152 @@
+"""Vectorized validation of many cube states at once.
+
+States are loaded into an ``(N, 54)`` array of colour indices and every check
+of :class:`~app.services.cube_validator.CubeValidator` (length, colours,
+colour distribution, centres and the cubie invariants) runs as whole-array
+operations. The result is one error code per row; :data:`ERROR_KEYS` maps the
+codes onto the usual ``CubeValidationError`` message keys.
+
+NumPy is optional (``pip install krubik[fast]``); check :data:`NUMPY_AVAILABLE`
+before calling :func:`validation_codes`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Final
+
+from .cubie import (
+    CENTER_FACELETS,
+    CORNER_FACELETS,
+    CORNER_LOOKUP,
+    EDGE_FACELETS,
+    EDGE_LOOKUP,
+    FACE_ORDER,
+)
+from .types import NormalizedCubeState
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+NUMPY_AVAILABLE: Final[bool] = np is not None
+
+VALID: Final[int] = 0
+INVALID_LENGTH: Final[int] = 1
+INVALID_COLORS: Final[int] = 2
+INVALID_DISTRIBUTION: Final[int] = 3
+UNSOLVABLE: Final[int] = 4
+ERROR_KEYS: Final[tuple[str | None, ...]] = (
+    None,
+    "invalid_length",
+    "invalid_colors",
+    "invalid_distribution",
+    "unsolvable",
+)
+
+_FACELETS: Final[int] = 54
+_PER_COLOR: Final[int] = 9
+_COLORS: Final[int] = len(FACE_ORDER)
+_NO_MATCH: Final[int] = 255
+# Code points at or above this value are folded onto the "invalid" slot.
+_ASCII: Final[int] = 128
+
+
+def _tables() -> tuple[npt.NDArray[np.uint8], npt.NDArray[np.uint8], npt.NDArray[np.uint8]]:
+    colors = np.full(_ASCII + 1, _NO_MATCH, dtype=np.uint8)
+    for index, face in enumerate(FACE_ORDER):
+        colors[ord(face)] = index
+    # Corner and edge colour tuples are packed into base-6 integers and mapped
+    # to ``piece * 3 + orientation`` (corners) or ``piece * 2 + flip`` (edges).
+    corners = np.full(_COLORS**3, _NO_MATCH, dtype=np.uint8)
+    for key, (piece, twist) in CORNER_LOOKUP.items():
+        corners[_pack(key)] = piece * 3 + twist
+    edges = np.full(_COLORS**2, _NO_MATCH, dtype=np.uint8)
+    for key, (piece, flip) in EDGE_LOOKUP.items():
+        edges[_pack(key)] = piece * 2 + flip
+    return colors, corners, edges
+
+
+def _pack(colors: str) -> int:
+    value = 0
+    for face in colors:
+        value = value * _COLORS + FACE_ORDER.index(face)
+    return value
+
+
+if NUMPY_AVAILABLE:
+    _COLOR_TABLE, _CORNER_TABLE, _EDGE_TABLE = _tables()
+    _CENTERS = np.array(CENTER_FACELETS)
+    _CORNERS = np.array(CORNER_FACELETS)
+    _EDGES = np.array(EDGE_FACELETS)
+
+
+def validation_codes(states: Sequence[NormalizedCubeState]) -> npt.NDArray[np.uint8]:
+    """Return a ``uint8`` error code per state, :data:`VALID` for valid ones.
+
+    The first failing check wins, in the same order as ``CubeValidator``.
+    States must already be normalized.
+    """
+
+    count = len(states)
+    codes = np.zeros(count, dtype=np.uint8)
+    lengths = np.fromiter(map(len, states), dtype=np.int64, count=count)
+    codes[lengths != _FACELETS] = INVALID_LENGTH
+    rows = np.flatnonzero(lengths == _FACELETS)
+    if rows.size == 0:
+        return codes
+
+    text = np.array([states[row] for row in rows.tolist()], dtype=f"<U{_FACELETS}")
+    points = text.view(np.uint32).reshape(-1, _FACELETS)
+    facelets = _COLOR_TABLE[np.minimum(points, _ASCII)]
+
+    bad_colors = (facelets == _NO_MATCH).any(axis=1)
+    counts = np.stack([(facelets == color).sum(axis=1) for color in range(_COLORS)], axis=1)
+    bad_distribution = ~bad_colors & (counts != _PER_COLOR).any(axis=1)
+    candidates = ~bad_colors & ~bad_distribution
+    unsolvable = candidates.copy()
+    unsolvable[candidates] = ~_reachable(facelets[candidates])
+
+    codes[rows[bad_colors]] = INVALID_COLORS
+    codes[rows[bad_distribution]] = INVALID_DISTRIBUTION
+    codes[rows[unsolvable]] = UNSOLVABLE
+    return codes
+
+
+def _reachable(facelets: npt.NDArray[np.uint8]) -> npt.NDArray[np.bool_]:
+    """Vectorized ``facelets_to_cubies(state).verify()`` for rows of colour indices."""
+
+    colors = facelets.astype(np.intp)
+    centers = (colors[:, _CENTERS] == np.arange(_COLORS)).all(axis=1)
+
+    corner_colors = colors[:, _CORNERS]
+    corner_keys = (corner_colors[..., 0] * _COLORS + corner_colors[..., 1]) * _COLORS
+    corners = _CORNER_TABLE[corner_keys + corner_colors[..., 2]]
+    edge_colors = colors[:, _EDGES]
+    edges = _EDGE_TABLE[edge_colors[..., 0] * _COLORS + edge_colors[..., 1]]
+    pieces = (corners != _NO_MATCH).all(axis=1) & (edges != _NO_MATCH).all(axis=1)
+
+    cp, co = np.divmod(corners.astype(np.intp), 3)
+    ep, eo = np.divmod(edges.astype(np.intp), 2)
+    permutations = (np.sort(cp, axis=1) == np.arange(len(CORNER_FACELETS))).all(axis=1) & (
+        np.sort(ep, axis=1) == np.arange(len(EDGE_FACELETS))
+    ).all(axis=1)
+    twist = co.sum(axis=1) % 3 == 0
+    flip = eo.sum(axis=1) % 2 == 0
+    parity = _parity(cp) == _parity(ep)
+    reachable: npt.NDArray[np.bool_] = centers & pieces & permutations & twist & flip & parity
+    return reachable
+
+
+def _parity(permutations: npt.NDArray[np.intp]) -> npt.NDArray[np.intp]:
+    """Permutation parity per row, computed from the inversion count."""
+
+    size = permutations.shape[1]
+    later = np.triu(np.ones((size, size), dtype=bool), k=1)
+    inversions = (permutations[:, :, None] > permutations[:, None, :]) & later
+    parity: npt.NDArray[np.intp] = inversions.sum(axis=(1, 2)) % 2
+    return parity
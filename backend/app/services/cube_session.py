@@ -0,0 +1,146 @@
+"""Cube state edited one facelet at a time, with incremental validation.
+
+A session keeps the colour counts and the set of broken pieces up to date as
+facelets change, so an edit only re-checks the colour it touched and the one
+centre, edge or corner the facelet belongs to. The global cubie invariants
+(permutation, twist, flip, parity) are only evaluated once every piece is
+well-formed and every colour appears nine times.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Final
+
+from .cube_validator import (
+    ALLOWED_COLORS,
+    COLOR_ORDER,
+    EXPECTED_COUNT_PER_COLOR,
+    EXPECTED_FACELETS,
+    CubeValidationError,
+)
+from .cubie import (
+    CENTER_FACELETS,
+    CORNER_FACELETS,
+    CORNER_LOOKUP,
+    EDGE_FACELETS,
+    EDGE_LOOKUP,
+    FACE_ORDER,
+    InvalidCubieError,
+    facelets_to_cubies,
+)
+from .facelets import SOLVED_STATE
+from .types import NormalizedCubeState
+
+# Pieces are numbered centres first, then corners, then edges.
+_PIECES: Final[tuple[tuple[int, ...], ...]] = (
+    *((index,) for index in CENTER_FACELETS),
+    *CORNER_FACELETS,
+    *EDGE_FACELETS,
+)
+_PIECE_OF: Final[dict[int, int]] = {
+    facelet: piece for piece, facelets in enumerate(_PIECES) for facelet in facelets
+}
+_CORNERS_START: Final[int] = len(CENTER_FACELETS)
+_EDGES_START: Final[int] = _CORNERS_START + len(CORNER_FACELETS)
+
+
+class CubeSession:
+    """Mutable cube state that tracks what is wrong with it after every edit."""
+
+    __slots__ = ("_broken", "_counts", "_facelets")
+
+    def __init__(self, state: NormalizedCubeState = SOLVED_STATE) -> None:
+        self._facelets: list[str] = []
+        self._counts: Counter[str] = Counter()
+        self._broken: set[int] = set()
+        self.load(state)
+
+    @property
+    def state(self) -> NormalizedCubeState:
+        return "".join(self._facelets)
+
+    def load(self, state: str) -> None:
+        """Replace the whole state; only length and colours must already be right."""
+
+        normalized = state.strip().upper()
+        if len(normalized) != EXPECTED_FACELETS:
+            raise CubeValidationError(
+                "invalid_length",
+                {"expected": EXPECTED_FACELETS, "received": len(normalized)},
+            )
+        unexpected = set(normalized) - ALLOWED_COLORS
+        if unexpected:
+            raise CubeValidationError("invalid_colors", {"colors": sorted(unexpected)})
+        self._facelets = list(normalized)
+        self._counts = Counter(normalized)
+        self._broken = {piece for piece in range(len(_PIECES)) if not self._piece_ok(piece)}
+
+    def set_facelet(self, index: int, color: str) -> bool:
+        """Paint one facelet; returns whether the state changed."""
+
+        if not 0 <= index < EXPECTED_FACELETS:
+            raise CubeValidationError(
+                "invalid_facelet", {"index": index, "limit": EXPECTED_FACELETS - 1}
+            )
+        color = color.strip().upper()
+        if color not in ALLOWED_COLORS:
+            raise CubeValidationError("invalid_colors", {"colors": [color]})
+        previous = self._facelets[index]
+        if previous == color:
+            return False
+        self._facelets[index] = color
+        self._counts[previous] -= 1
+        self._counts[color] += 1
+        piece = _PIECE_OF[index]
+        if self._piece_ok(piece):
+            self._broken.discard(piece)
+        else:
+            self._broken.add(piece)
+        return True
+
+    def issues(self) -> list[CubeValidationError]:
+        """Everything currently wrong with the state; empty when it is solvable.
+
+        Piece errors carry the offending ``facelets`` in their context so a
+        client can highlight them.
+        """
+
+        problems = [
+            CubeValidationError(
+                "invalid_distribution",
+                {"color": color, "expected": EXPECTED_COUNT_PER_COLOR, "received": count},
+            )
+            for color in COLOR_ORDER
+            if (count := self._counts[color]) != EXPECTED_COUNT_PER_COLOR
+        ]
+        problems.extend(
+            CubeValidationError(
+                "unsolvable",
+                {"invariant": _piece_invariant(piece), "facelets": list(_PIECES[piece])},
+            )
+            for piece in sorted(self._broken)
+        )
+        if problems:
+            return problems
+        try:
+            facelets_to_cubies(self.state).verify()
+        except InvalidCubieError as exc:
+            return [CubeValidationError("unsolvable", {"invariant": exc.invariant})]
+        return []
+
+    def _piece_ok(self, piece: int) -> bool:
+        colors = "".join(self._facelets[index] for index in _PIECES[piece])
+        if piece < _CORNERS_START:
+            return colors == FACE_ORDER[piece]
+        if piece < _EDGES_START:
+            return colors in CORNER_LOOKUP
+        return colors in EDGE_LOOKUP
+
+
+def _piece_invariant(piece: int) -> str:
+    if piece < _CORNERS_START:
+        return "centers"
+    if piece < _EDGES_START:
+        return "corner_cubies"
+    return "edge_cubies"
@@ -0,0 +1,174 @@
+"""Compact, hashable cube states packed into a single integer.
+
+A :class:`CubeState` stores the cubie coordinates of a state (corner
+permutation and twist, edge permutation and flip) as one mixed-radix number
+below ``8! * 3**7 * 12! * 2**11``, so it fits in nine bytes. The last corner's
+twist and the last edge's flip follow from the others and are not stored,
+which is why only solvable states can be packed. The one invariant a code can
+still break, equal corner and edge permutation parity, is checked whenever a
+state is built from a code.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from math import factorial
+from typing import Final, NoReturn
+
+from .cubie import CORNER_FACELETS, EDGE_FACELETS, CubieCube, cubies_to_facelets, facelets_to_cubies
+from .types import NormalizedCubeState
+
+BYTE_SIZE: Final[int] = 9
+
+_FACELETS: Final[int] = 54
+_CORNERS: Final[int] = len(CORNER_FACELETS)
+_EDGES: Final[int] = len(EDGE_FACELETS)
+_CORNER_TWISTS: Final[int] = 3 ** (_CORNERS - 1)
+_EDGE_PERMUTATIONS: Final[int] = factorial(_EDGES)
+_EDGE_FLIPS: Final[int] = 2 ** (_EDGES - 1)
+_STATES: Final[int] = factorial(_CORNERS) * _CORNER_TWISTS * _EDGE_PERMUTATIONS * _EDGE_FLIPS
+
+
+def _permutation_rank(permutation: tuple[int, ...]) -> int:
+    # Lehmer code: later pieces smaller than ``value`` are the smaller ones not seen yet.
+    rank = 0
+    seen = 0
+    size = len(permutation)
+    for index, value in enumerate(permutation):
+        smaller = value - (seen & ((1 << value) - 1)).bit_count()
+        seen |= 1 << value
+        rank = rank * (size - index) + smaller
+    return rank
+
+
+def _permutation_unrank(rank: int, size: int) -> tuple[int, ...]:
+    digits = []
+    for base in range(1, size + 1):
+        rank, digit = divmod(rank, base)
+        digits.append(digit)
+    remaining = list(range(size))
+    return tuple(remaining.pop(digit) for digit in reversed(digits))
+
+
+def _rank_parity(rank: int, size: int) -> int:
+    # The Lehmer digits sum to the inversion count, whose parity is the permutation's.
+    parity = 0
+    for base in range(1, size + 1):
+        rank, digit = divmod(rank, base)
+        parity ^= digit & 1
+    return parity
+
+
+def _orientation_rank(orientation: tuple[int, ...], base: int) -> int:
+    # The last piece's orientation follows from the others.
+    rank = 0
+    for value in orientation[:-1]:
+        rank = rank * base + value
+    return rank
+
+
+def _orientation_unrank(rank: int, base: int, size: int) -> tuple[int, ...]:
+    values = []
+    for _ in range(size - 1):
+        rank, value = divmod(rank, base)
+        values.append(value)
+    values.reverse()
+    values.append(-sum(values) % base)
+    return tuple(values)
+
+
+class CubeState:
+    """Immutable solvable cube state packed into one integer.
+
+    Equality and hashing go through the integer, so instances are cheap
+    dictionary keys. ``CubeState.from_facelets(state).to_facelets() == state``
+    holds for every solvable ``state``.
+    """
+
+    __slots__ = ("_code",)
+
+    _code: int
+
+    def __init__(self, code: int) -> None:
+        if not 0 <= code < _STATES:
+            raise ValueError(f"cube state code out of range: {code}")
+        rest = code // _EDGE_FLIPS
+        rest, ep = divmod(rest, _EDGE_PERMUTATIONS)
+        cp = rest // _CORNER_TWISTS
+        if _rank_parity(cp, _CORNERS) != _rank_parity(ep, _EDGES):
+            raise ValueError(f"cube state code has mismatched permutation parity: {code}")
+        object.__setattr__(self, "_code", code)
+
+    @classmethod
+    def from_cubies(cls, cubies: CubieCube) -> CubeState:
+        """Pack ``cubies``; raises :class:`~app.services.cubie.InvalidCubieError` if unsolvable."""
+
+        cubies.verify()
+        code = _permutation_rank(cubies.cp)
+        code = code * _CORNER_TWISTS + _orientation_rank(cubies.co, 3)
+        code = code * _EDGE_PERMUTATIONS + _permutation_rank(cubies.ep)
+        code = code * _EDGE_FLIPS + _orientation_rank(cubies.eo, 2)
+        return cls(code)
+
+    @classmethod
+    def from_facelets(cls, state: NormalizedCubeState) -> CubeState:
+        """Pack a facelet string; raises :class:`ValueError` if it is not a solvable cube."""
+
+        if len(state) != _FACELETS:
+            raise ValueError(f"cube state must have {_FACELETS} facelets, got {len(state)}")
+        return cls.from_cubies(facelets_to_cubies(state))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CubeState:
+        if len(data) != BYTE_SIZE:
+            raise ValueError(f"cube state must be {BYTE_SIZE} bytes, got {len(data)}")
+        return cls(int.from_bytes(data, "big"))
+
+    @property
+    def code(self) -> int:
+        return self._code
+
+    def cubies(self) -> CubieCube:
+        rest, eo = divmod(self._code, _EDGE_FLIPS)
+        rest, ep = divmod(rest, _EDGE_PERMUTATIONS)
+        cp, co = divmod(rest, _CORNER_TWISTS)
+        return CubieCube(
+            cp=_permutation_unrank(cp, _CORNERS),
+            co=_orientation_unrank(co, 3, _CORNERS),
+            ep=_permutation_unrank(ep, _EDGES),
+            eo=_orientation_unrank(eo, 2, _EDGES),
+        )
+
+    def to_facelets(self) -> NormalizedCubeState:
+        return cubies_to_facelets(self.cubies())
+
+    def to_bytes(self) -> bytes:
+        """Big-endian encoding; byte order matches the order of :attr:`code`."""
+
+        return self._code.to_bytes(BYTE_SIZE, "big")
+
+    @property
+    def digest(self) -> str:
+        """Short stable hash for logs, identical across processes and restarts."""
+
+        return hashlib.blake2b(self.to_bytes(), digest_size=6).hexdigest()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CubeState):
+            return NotImplemented
+        return self._code == other._code
+
+    def __hash__(self) -> int:
+        return hash(self._code)
+
+    def __repr__(self) -> str:
+        return f"CubeState({self._code})"
+
+    def __reduce__(self) -> tuple[type[CubeState], tuple[int]]:
+        return CubeState, (self._code,)
+
+    def __setattr__(self, name: str, value: object) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
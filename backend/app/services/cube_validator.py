@@ -2,17 +2,16 @@
 
 from __future__ import annotations
 
+import time
 from collections import Counter
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
 from typing import Final
 
-try:
-    from kociemba import solve as kociemba_solve
-except ImportError:  # pragma: no cover - optional dependency
-    kociemba_solve = None  # type: ignore[assignment]
-
-from .solver_local import LocalSolver
+from .bulk_validator import ERROR_KEYS, NUMPY_AVAILABLE, VALID, validation_codes
+from .cube_state import CubeState
+from .cubie import InvalidCubieError
+from .metrics import METRICS
 from .types import NormalizedCubeState
 
 COLOR_ORDER: Final[tuple[str, ...]] = ("U", "D", "F", "B", "L", "R")
@@ -20,6 +19,17 @@ EXPECTED_FACELETS: Final[int] = 54
 EXPECTED_COUNT_PER_COLOR: Final[int] = 9
 ALLOWED_COLORS: Final[frozenset[str]] = frozenset(COLOR_ORDER)
 
+VALIDATION_SECONDS = METRICS.histogram(
+    "krubik_validation_seconds",
+    "Cube state validation time by outcome (ok or the error key).",
+    ("outcome",),
+)
+BULK_VALIDATION_SECONDS = METRICS.histogram(
+    "krubik_bulk_validation_seconds",
+    "Time to validate a whole batch of cube states by implementation (numpy or python).",
+    ("implementation",),
+)
+
 
 @dataclass(slots=True)
 class CubeValidationError(ValueError):
@@ -32,24 +42,83 @@ class CubeValidationError(ValueError):
         return self.message_key
 
 
+@dataclass(frozen=True, slots=True)
+class BulkValidationResult:
+    """Normalized states and one error code per state (see ``ERROR_KEYS``)."""
+
+    states: list[NormalizedCubeState]
+    codes: Sequence[int]
+
+    def is_valid(self, index: int) -> bool:
+        return int(self.codes[index]) == VALID
+
+    def error_key(self, index: int) -> str | None:
+        return ERROR_KEYS[int(self.codes[index])]
+
+
 class CubeValidator:
     """Validate cube facelet strings before solving."""
 
-    def __init__(self, *, local_solver: LocalSolver | None = None) -> None:
-        self._local_solver = local_solver
-
     @staticmethod
     def normalize(state: str) -> NormalizedCubeState:
         return state.strip().upper()
 
     def validate(self, state: str) -> NormalizedCubeState:
-        normalized = self.normalize(state)
-        self._validate_length(normalized)
-        self._validate_colors(normalized)
-        self._validate_distribution(normalized)
-        self._validate_reachable(normalized)
+        normalized, _ = self._validate(state)
         return normalized
 
+    def validate_packed(self, state: str) -> CubeState:
+        """Validate ``state`` and return it as a packed :class:`CubeState`."""
+
+        _, packed = self._validate(state)
+        return packed
+
+    def _validate(self, state: str) -> tuple[NormalizedCubeState, CubeState]:
+        started = time.perf_counter()
+        try:
+            normalized = self.normalize(state)
+            self._validate_length(normalized)
+            self._validate_colors(normalized)
+            self._validate_distribution(normalized)
+            packed = self._validate_reachable(normalized)
+        except CubeValidationError as exc:
+            VALIDATION_SECONDS.labels(exc.message_key).observe(time.perf_counter() - started)
+            raise
+        VALIDATION_SECONDS.labels("ok").observe(time.perf_counter() - started)
+        return normalized, packed
+
+    def validate_many(self, states: Sequence[str]) -> BulkValidationResult:
+        """Check many states at once; vectorized when NumPy is installed.
+
+        Only error codes are produced. Use :meth:`error_for` on the failing
+        states to get the full :class:`CubeValidationError` with its context.
+        """
+
+        normalized = [self.normalize(state) for state in states]
+        started = time.perf_counter()
+        codes: list[int]
+        if NUMPY_AVAILABLE:
+            codes = validation_codes(normalized).tolist()
+            implementation = "numpy"
+        else:
+            codes = [self._error_code(state) for state in normalized]
+            implementation = "python"
+        BULK_VALIDATION_SECONDS.labels(implementation).observe(time.perf_counter() - started)
+        return BulkValidationResult(states=normalized, codes=codes)
+
+    def error_for(self, state: str) -> CubeValidationError | None:
+        """Return the error :meth:`validate` raises for ``state``, if any."""
+
+        try:
+            self.validate(state)
+        except CubeValidationError as exc:
+            return exc
+        return None
+
+    def _error_code(self, state: NormalizedCubeState) -> int:
+        error = self.error_for(state)
+        return VALID if error is None else ERROR_KEYS.index(error.message_key)
+
     def _validate_length(self, state: NormalizedCubeState) -> None:
         if len(state) != EXPECTED_FACELETS:
             raise CubeValidationError(
@@ -72,17 +141,11 @@ class CubeValidator:
                     {"color": color, "expected": EXPECTED_COUNT_PER_COLOR, "received": count},
                 )
 
-    def _validate_reachable(self, state: NormalizedCubeState) -> None:
-        solver = self._local_solver
+    def _validate_reachable(self, state: NormalizedCubeState) -> CubeState:
+        # Reachability follows from the cubie invariants (piece identity, twist,
+        # flip and permutation parity), so no search is needed here. Packing
+        # checks exactly those.
         try:
-            if solver is not None:
-                solver.solve(state)
-            else:  # pragma: no cover - fallback path
-                if kociemba_solve is None:
-                    raise CubeValidationError(
-                        "unsolvable",
-                        {"reason": "local solver unavailable"},
-                    )
-                kociemba_solve(state)
-        except ValueError as exc:  # pragma: no cover - depends on invalid input
-            raise CubeValidationError("unsolvable", {"reason": str(exc)}) from exc
+            return CubeState.from_facelets(state)
+        except InvalidCubieError as exc:
+            raise CubeValidationError("unsolvable", {"invariant": exc.invariant}) from exc
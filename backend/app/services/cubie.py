@@ -0,0 +1,164 @@
+"""Cubie-level model of the cube used for structural state checks.
+
+Facelets follow the Kociemba layout: faces are stored in ``URFDLB`` order and
+each face is read row by row, so ``state[4]`` is the centre of the U face.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Final
+
+from .types import NormalizedCubeState
+
+FACE_ORDER: Final[str] = "URFDLB"
+
+CORNER_FACELETS: Final[tuple[tuple[int, int, int], ...]] = (
+    (8, 9, 20),  # URF
+    (6, 18, 38),  # UFL
+    (0, 36, 47),  # ULB
+    (2, 45, 11),  # UBR
+    (29, 26, 15),  # DFR
+    (27, 44, 24),  # DLF
+    (33, 53, 42),  # DBL
+    (35, 17, 51),  # DRB
+)
+CORNER_COLORS: Final[tuple[str, ...]] = ("URF", "UFL", "ULB", "UBR", "DFR", "DLF", "DBL", "DRB")
+
+EDGE_FACELETS: Final[tuple[tuple[int, int], ...]] = (
+    (5, 10),  # UR
+    (7, 19),  # UF
+    (3, 37),  # UL
+    (1, 46),  # UB
+    (32, 16),  # DR
+    (28, 25),  # DF
+    (30, 43),  # DL
+    (34, 52),  # DB
+    (23, 12),  # FR
+    (21, 41),  # FL
+    (50, 39),  # BL
+    (48, 14),  # BR
+)
+EDGE_COLORS: Final[tuple[str, ...]] = (
+    "UR",
+    "UF",
+    "UL",
+    "UB",
+    "DR",
+    "DF",
+    "DL",
+    "DB",
+    "FR",
+    "FL",
+    "BL",
+    "BR",
+)
+CENTER_FACELETS: Final[tuple[int, ...]] = (4, 13, 22, 31, 40, 49)
+
+CORNER_LOOKUP: Final[dict[str, tuple[int, int]]] = {
+    colors[3 - ori :] + colors[: 3 - ori]: (index, ori)
+    for index, colors in enumerate(CORNER_COLORS)
+    for ori in range(3)
+}
+EDGE_LOOKUP: Final[dict[str, tuple[int, int]]] = {
+    **{colors: (index, 0) for index, colors in enumerate(EDGE_COLORS)},
+    **{colors[::-1]: (index, 1) for index, colors in enumerate(EDGE_COLORS)},
+}
+
+
+class InvalidCubieError(ValueError):
+    """Raised when a facelet string violates a structural cube invariant."""
+
+    def __init__(self, invariant: str) -> None:
+        super().__init__(invariant)
+        self.invariant = invariant
+
+
+@dataclass(frozen=True, slots=True)
+class CubieCube:
+    """Corner and edge permutation/orientation of a cube state."""
+
+    cp: tuple[int, ...]
+    co: tuple[int, ...]
+    ep: tuple[int, ...]
+    eo: tuple[int, ...]
+
+    def verify(self) -> None:
+        """Raise :class:`InvalidCubieError` naming the first broken invariant."""
+
+        if len(set(self.cp)) != len(CORNER_FACELETS):
+            raise InvalidCubieError("corner_permutation")
+        if len(set(self.ep)) != len(EDGE_FACELETS):
+            raise InvalidCubieError("edge_permutation")
+        if sum(self.co) % 3:
+            raise InvalidCubieError("corner_twist")
+        if sum(self.eo) % 2:
+            raise InvalidCubieError("edge_flip")
+        if permutation_parity(self.cp) != permutation_parity(self.ep):
+            raise InvalidCubieError("permutation_parity")
+
+
+def permutation_parity(permutation: tuple[int, ...]) -> int:
+    """Return ``0`` for even and ``1`` for odd permutations."""
+
+    seen = [False] * len(permutation)
+    parity = 0
+    for start in range(len(permutation)):
+        if seen[start]:
+            continue
+        length = 0
+        position = start
+        while not seen[position]:
+            seen[position] = True
+            position = permutation[position]
+            length += 1
+        parity ^= (length - 1) & 1
+    return parity
+
+
+def facelets_to_cubies(state: NormalizedCubeState) -> CubieCube:
+    """Convert a 54-facelet string into cubies.
+
+    Corner orientation counts clockwise twists of the U/D sticker away from the
+    U/D face; edge orientation is ``1`` when the reference sticker is flipped.
+    """
+
+    if tuple(state[index] for index in CENTER_FACELETS) != tuple(FACE_ORDER):
+        raise InvalidCubieError("centers")
+
+    cp: list[int] = []
+    co: list[int] = []
+    for positions in CORNER_FACELETS:
+        colors = "".join(state[index] for index in positions)
+        match = CORNER_LOOKUP.get(colors)
+        if match is None:
+            raise InvalidCubieError("corner_cubies")
+        cp.append(match[0])
+        co.append(match[1])
+
+    ep: list[int] = []
+    eo: list[int] = []
+    for first, second in EDGE_FACELETS:
+        match = EDGE_LOOKUP.get(state[first] + state[second])
+        if match is None:
+            raise InvalidCubieError("edge_cubies")
+        ep.append(match[0])
+        eo.append(match[1])
+
+    return CubieCube(cp=tuple(cp), co=tuple(co), ep=tuple(ep), eo=tuple(eo))
+
+
+def cubies_to_facelets(cubies: CubieCube) -> NormalizedCubeState:
+    """Inverse of :func:`facelets_to_cubies`."""
+
+    # Centres never move, so each face starts out in its own colour.
+    facelets = [face for face in FACE_ORDER for _ in range(9)]
+    for corner, piece, twist in zip(CORNER_FACELETS, cubies.cp, cubies.co, strict=True):
+        colors = CORNER_COLORS[piece]
+        for offset, index in enumerate(corner):
+            facelets[index] = colors[(offset - twist) % 3]
+    for edge, piece, flip in zip(EDGE_FACELETS, cubies.ep, cubies.eo, strict=True):
+        colors = EDGE_COLORS[piece]
+        for offset, index in enumerate(edge):
+            facelets[index] = colors[(offset + flip) % 2]
+    return "".join(facelets)
@@ -0,0 +1,38 @@
+"""Per-request deadlines shared by every layer a solve passes through."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+
+class DeadlineExceededError(RuntimeError):
+    """Raised when a solve is abandoned because its deadline has passed."""
+
+
+@dataclass(frozen=True, slots=True)
+class Deadline:
+    """Point on the monotonic clock (the event loop's clock) by which to answer."""
+
+    expires_at: float
+
+    @classmethod
+    def after(cls, seconds: float) -> Deadline:
+        return cls(time.monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at <= time.monotonic()
+
+    def covers(self, seconds: float) -> bool:
+        """Whether ``seconds`` of work can still finish before the deadline."""
+
+        return self.expires_at - time.monotonic() >= seconds
+
+    def earlier_by(self, seconds: float) -> Deadline:
+        """The deadline for a step that must leave ``seconds`` for what follows."""
+
+        return Deadline(self.expires_at - seconds)
@@ -0,0 +1,147 @@
+"""Geometric facelet model: sticker coordinates and face-turn permutations.
+
+Every facelet is described by the integer position of its cubie in
+``{-1, 0, 1}^3`` and the outward normal of its face, with ``x`` pointing to R,
+``y`` to U and ``z`` to F. Whole-cube transformations and face turns are then
+plain 3x3 integer matrices, and their effect on a facelet string is a
+precomputed index permutation.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from operator import itemgetter
+from typing import Final
+
+from .cubie import FACE_ORDER
+from .types import NormalizedCubeState
+
+Vector = tuple[int, int, int]
+Matrix = tuple[Vector, Vector, Vector]
+
+SOLVED_STATE: Final[str] = "".join(face * 9 for face in FACE_ORDER)
+
+FACE_NORMALS: Final[dict[str, Vector]] = {
+    "U": (0, 1, 0),
+    "R": (1, 0, 0),
+    "F": (0, 0, 1),
+    "D": (0, -1, 0),
+    "L": (-1, 0, 0),
+    "B": (0, 0, -1),
+}
+_NORMAL_FACES: Final[dict[Vector, str]] = {normal: face for face, normal in FACE_NORMALS.items()}
+
+
+def _facelet_position(face: str, row: int, col: int) -> Vector:
+    # Faces are read as seen from outside, top row first, matching the
+    # Kociemba net (U with B on top, D with F on top, B with R on the left).
+    layouts: dict[str, Vector] = {
+        "U": (col - 1, 1, row - 1),
+        "R": (1, 1 - row, 1 - col),
+        "F": (col - 1, 1 - row, 1),
+        "D": (col - 1, -1, 1 - row),
+        "L": (-1, 1 - row, col - 1),
+        "B": (1 - col, 1 - row, -1),
+    }
+    return layouts[face]
+
+
+FACELETS: Final[tuple[tuple[Vector, Vector], ...]] = tuple(
+    (_facelet_position(face, index // 3, index % 3), FACE_NORMALS[face])
+    for face in FACE_ORDER
+    for index in range(9)
+)
+_FACELET_INDEX: Final[dict[tuple[Vector, Vector], int]] = {
+    facelet: index for index, facelet in enumerate(FACELETS)
+}
+
+
+def transform(matrix: Matrix, vector: Vector) -> Vector:
+    x, y, z = vector
+    return (
+        matrix[0][0] * x + matrix[0][1] * y + matrix[0][2] * z,
+        matrix[1][0] * x + matrix[1][1] * y + matrix[1][2] * z,
+        matrix[2][0] * x + matrix[2][1] * y + matrix[2][2] * z,
+    )
+
+
+def determinant(matrix: Matrix) -> int:
+    (a, b, c), (d, e, f), (g, h, i) = matrix
+    return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+
+def face_after(matrix: Matrix, face: str) -> str:
+    """Return the face that ``face`` is carried to by ``matrix``."""
+
+    return _NORMAL_FACES[transform(matrix, FACE_NORMALS[face])]
+
+
+def facelet_permutation(matrix: Matrix, *, layer: Vector | None = None) -> tuple[int, ...]:
+    """Return ``source`` indices such that ``new[i] = old[source[i]]``.
+
+    When ``layer`` is given only cubies with ``position . layer == 1`` move,
+    which describes turning the face with that normal.
+    """
+
+    source = list(range(len(FACELETS)))
+    for index, (position, normal) in enumerate(FACELETS):
+        if layer is not None and sum(p * n for p, n in zip(position, layer, strict=True)) != 1:
+            continue
+        target = _FACELET_INDEX[(transform(matrix, position), transform(matrix, normal))]
+        source[target] = index
+    return tuple(source)
+
+
+def _quarter_turn(normal: Vector) -> Matrix:
+    # Clockwise when looking at the face from outside: -90 degrees about ``normal``.
+    nx, ny, nz = normal
+    return (
+        (nx * nx, nz, -ny),
+        (-nz, ny * ny, nx),
+        (ny, -nx, nz * nz),
+    )
+
+
+def _compose(first: tuple[int, ...], second: tuple[int, ...]) -> tuple[int, ...]:
+    """Permutation that applies ``first`` then ``second``."""
+
+    return tuple(first[index] for index in second)
+
+
+def _build_move_table() -> dict[str, tuple[int, ...]]:
+    table: dict[str, tuple[int, ...]] = {}
+    for face in FACE_ORDER:
+        normal = FACE_NORMALS[face]
+        quarter = facelet_permutation(_quarter_turn(normal), layer=normal)
+        half = _compose(quarter, quarter)
+        table[face] = quarter
+        table[f"{face}2"] = half
+        table[f"{face}'"] = _compose(half, quarter)
+    return table
+
+
+Gather = Callable[[str], tuple[str, ...]]
+
+MOVE_PERMUTATIONS: Final[dict[str, tuple[int, ...]]] = _build_move_table()
+
+
+def gatherer(source: tuple[int, ...]) -> Gather:
+    """Return a fast callable picking ``source`` indices out of a string."""
+
+    return itemgetter(*source)
+
+
+_MOVE_GATHERERS: Final[dict[str, Gather]] = {
+    move: gatherer(source) for move, source in MOVE_PERMUTATIONS.items()
+}
+
+
+def apply_moves(state: NormalizedCubeState, moves: Iterable[str]) -> NormalizedCubeState:
+    """Return the facelet string obtained by turning ``moves`` on ``state``.
+
+    Raises :class:`KeyError` for moves outside the 18 face turns.
+    """
+
+    for move in moves:
+        state = "".join(_MOVE_GATHERERS[move](state))
+    return state
@@ -0,0 +1,68 @@
+"""Rolling latency statistics used for routing decisions."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Final
+
+DEFAULT_WINDOW: Final[int] = 512
+MIN_SAMPLES: Final[int] = 20
+# Time kept free for a local fallback until the local path has enough samples.
+DEFAULT_LOCAL_RESERVE: Final[float] = 0.25
+
+
+class LatencyTracker:
+    """Keep the most recent ``window`` durations (in seconds) and report quantiles."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        # Calls currently being timed; only touched from the event loop.
+        self.in_flight = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, quantile: float) -> float | None:
+        """Return the nearest-rank ``quantile`` or ``None`` without samples."""
+
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        rank = max(math.ceil(quantile * len(ordered)) - 1, 0)
+        return ordered[rank]
+
+
+@dataclass(slots=True)
+class SolverLatency:
+    """Latency of the external and local solve paths, shared across requests."""
+
+    external: LatencyTracker = field(default_factory=LatencyTracker)
+    local: LatencyTracker = field(default_factory=LatencyTracker)
+
+    def local_is_faster(self, quantile: float = 0.95) -> bool:
+        """Whether the local path has a lower tail latency than the external one.
+
+        Both paths need :data:`MIN_SAMPLES` observations before they are compared.
+        """
+
+        if len(self.external) < MIN_SAMPLES or len(self.local) < MIN_SAMPLES:
+            return False
+        external = self.external.percentile(quantile)
+        local = self.local.percentile(quantile)
+        return external is not None and local is not None and external > local
+
+    def local_reserve(self, quantile: float = 0.95) -> float:
+        """Time a local fallback needs: the local tail latency once it is known."""
+
+        if len(self.local) < MIN_SAMPLES:
+            return DEFAULT_LOCAL_RESERVE
+        return self.local.percentile(quantile) or DEFAULT_LOCAL_RESERVE
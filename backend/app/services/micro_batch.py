@@ -0,0 +1,84 @@
+"""Collect concurrent calls into batches that are flushed together."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Generic, TypeVar
+
+K = TypeVar("K")
+R = TypeVar("R")
+
+Flush = Callable[[list[K]], Awaitable[Sequence[R | BaseException]]]
+
+
+class MicroBatcher(Generic[K, R]):
+    """Group items submitted within ``max_delay`` seconds into one flush.
+
+    A batch is sent when it reaches ``max_size`` items or when the first item
+    has waited ``max_delay`` seconds, whichever comes first. The flush callable
+    returns one result per item, in order; exception instances are raised to
+    the matching caller only, while an exception raised by the flush itself,
+    or a result count that does not match, fails every caller of that batch.
+    The flush passed by the caller that opens a batch is used for the whole
+    batch.
+    """
+
+    def __init__(self, *, max_size: int, max_delay: float) -> None:
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._pending: list[tuple[K, asyncio.Future[R]]] = []
+        self._flush: Flush[K, R] | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._batches = 0
+
+    @property
+    def batches(self) -> int:
+        """Number of batches flushed so far."""
+
+        return self._batches
+
+    async def submit(self, item: K, flush: Flush[K, R]) -> R:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) == 1:
+            self._flush = flush
+            self._timer = loop.call_later(self._max_delay, self._dispatch)
+        if len(self._pending) >= self._max_size:
+            self._dispatch()
+        return await future
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        flush, self._flush = self._flush, None
+        if not batch or flush is None:
+            return
+        self._batches += 1
+        task = asyncio.create_task(self._run(flush, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _run(flush: Flush[K, R], batch: list[tuple[K, asyncio.Future[R]]]) -> None:
+        try:
+            results = await flush([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Flush returned {len(results)} results for {len(batch)} items")
+        except Exception as exc:  # noqa: BLE001 - delivered to every caller of the batch
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results, strict=True):
+            # Callers that gave up (hedging, disconnects) have cancelled futures.
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,59 @@
+"""Verification and simplification of face-turn sequences."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Final
+
+from .facelets import MOVE_PERMUTATIONS, SOLVED_STATE, apply_moves
+from .types import MoveSequence, NormalizedCubeState
+
+OPPOSITE_FACES: Final[dict[str, str]] = {
+    "U": "D",
+    "D": "U",
+    "R": "L",
+    "L": "R",
+    "F": "B",
+    "B": "F",
+}
+_QUARTER_TURNS: Final[dict[str, int]] = {"": 1, "2": 2, "'": 3}
+_SUFFIXES: Final[tuple[str, ...]] = ("", "", "2", "'")
+
+
+def solves(state: NormalizedCubeState, moves: Iterable[str]) -> bool:
+    """Whether turning ``moves`` on ``state`` yields the solved cube.
+
+    Unknown move notation counts as not solving the state.
+    """
+
+    try:
+        return apply_moves(state, moves) == SOLVED_STATE
+    except KeyError:
+        return False
+
+
+def simplify_moves(moves: Iterable[str]) -> MoveSequence:
+    """Merge and cancel redundant turns without changing the resulting state.
+
+    Consecutive turns of one face are added up (``U U`` -> ``U2``, ``R R'`` ->
+    nothing), also across a turn of the opposite face, which commutes with
+    them (``R L R`` -> ``R2 L``). Raises :class:`KeyError` for unknown moves.
+    """
+
+    turns: list[tuple[str, int]] = []
+    for move in moves:
+        if move not in MOVE_PERMUTATIONS:
+            raise KeyError(move)
+        face, quarter = move[0], _QUARTER_TURNS[move[1:]]
+        index = len(turns) - 1
+        if index >= 0 and turns[index][0] == OPPOSITE_FACES[face]:
+            index -= 1
+        if index >= 0 and turns[index][0] == face:
+            total = (turns[index][1] + quarter) % 4
+            if total:
+                turns[index] = (face, total)
+            else:
+                del turns[index]
+        else:
+            turns.append((face, quarter))
+    return tuple(face + _SUFFIXES[quarter] for face, quarter in turns)
@@ -0,0 +1,192 @@
+"""Lookup table of optimal solutions for every state near the solved cube.
+
+The table is built offline by a breadth-first search from the solved state
+and holds every state within ``depth`` face turns. Each state is stored under
+its 9-byte :class:`~app.services.cube_state.CubeState` encoding; the keys are
+sorted, so a lookup is a binary search over a memory-mapped file. Next to
+every key sits its solution, five bits per move. Because the search is
+breadth-first, every stored solution is optimal in the half-turn metric.
+
+Build a table with ``python -m app.services.near_solved --depth 5 --output
+var/near_solved.bin``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Final
+
+import structlog
+
+from .cube_state import BYTE_SIZE, CubeState
+from .facelets import MOVE_PERMUTATIONS, SOLVED_STATE, gatherer
+from .types import MoveSequence, NormalizedCubeState
+
+_LOGGER = structlog.get_logger(__name__)
+
+MAGIC: Final[bytes] = b"KRNS"
+VERSION: Final[int] = 1
+KEY_SIZE: Final[int] = BYTE_SIZE
+MAX_DEPTH: Final[int] = 6
+MOVE_NAMES: Final[tuple[str, ...]] = tuple(MOVE_PERMUTATIONS)
+
+# magic, version, depth, key size, solution size, entry count
+_HEADER: Final[struct.Struct] = struct.Struct("<4sBBBBI")
+_MOVE_BITS: Final[int] = 5
+_MOVE_MASK: Final[int] = (1 << _MOVE_BITS) - 1
+_SOLUTION: Final[struct.Struct] = struct.Struct("<I")
+_INVERSE_SUFFIX: Final[dict[str, str]] = {"": "'", "'": "", "2": "2"}
+
+
+def pack_state(state: NormalizedCubeState) -> bytes | None:
+    """Return the packed :class:`CubeState` bytes of ``state``, ``None`` if it is unsolvable."""
+
+    try:
+        return CubeState.from_facelets(state).to_bytes()
+    except ValueError:
+        return None
+
+
+def _inverse(move: str) -> str:
+    return move[0] + _INVERSE_SUFFIX[move[1:]]
+
+
+def build_entries(depth: int) -> list[tuple[bytes, int]]:
+    """Breadth-first search of every state within ``depth`` turns of solved.
+
+    Returns ``(key, solution)`` pairs sorted by key, where ``solution`` packs
+    the move indices (plus one) five bits each, first move lowest.
+    """
+
+    if not 0 <= depth <= MAX_DEPTH:
+        raise ValueError(f"depth must be between 0 and {MAX_DEPTH}")
+    gathers = [gatherer(MOVE_PERMUTATIONS[name]) for name in MOVE_NAMES]
+    # Scrambling with move ``m`` is undone by prepending its inverse.
+    undo = [MOVE_NAMES.index(_inverse(name)) + 1 for name in MOVE_NAMES]
+    faces = [name[0] for name in MOVE_NAMES]
+
+    seen = {SOLVED_STATE}
+    frontier: list[tuple[NormalizedCubeState, int]] = [(SOLVED_STATE, 0)]
+    entries = [(SOLVED_STATE, 0)]
+    for _ in range(depth):
+        next_frontier: list[tuple[NormalizedCubeState, int]] = []
+        for state, solution in frontier:
+            last_face = faces[(solution & _MOVE_MASK) - 1] if solution else None
+            for index, gather in enumerate(gathers):
+                if faces[index] == last_face:
+                    continue
+                child = "".join(gather(state))
+                if child in seen:
+                    continue
+                seen.add(child)
+                next_frontier.append((child, (solution << _MOVE_BITS) | undo[index]))
+        entries.extend(next_frontier)
+        frontier = next_frontier
+    packed = [(pack_state(state), solution) for state, solution in entries]
+    return sorted((key, solution) for key, solution in packed if key is not None)
+
+
+def write_table(path: str | os.PathLike[str], depth: int) -> int:
+    """Build the table for ``depth`` and write it to ``path``; returns the entry count."""
+
+    entries = build_entries(depth)
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_suffix(target.suffix + ".partial")
+    with partial.open("wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, VERSION, depth, KEY_SIZE, _SOLUTION.size, len(entries)))
+        handle.write(b"".join(key for key, _ in entries))
+        handle.write(b"".join(_SOLUTION.pack(solution) for _, solution in entries))
+    partial.replace(target)
+    return len(entries)
+
+
+class _Keys:
+    """Sequence view of the sorted keys, so :mod:`bisect` can search the mapping."""
+
+    __slots__ = ("_buffer", "_count")
+
+    def __init__(self, buffer: mmap.mmap, count: int) -> None:
+        self._buffer = buffer
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> bytes:
+        offset = _HEADER.size + index * KEY_SIZE
+        return self._buffer[offset : offset + KEY_SIZE]
+
+
+class NearSolvedTable:
+    """Memory-mapped table built by :func:`write_table`."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        with Path(path).open("rb") as handle:
+            self._buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, depth, key_size, solution_size, count = _HEADER.unpack_from(self._buffer)
+        expected = _HEADER.size + count * (KEY_SIZE + _SOLUTION.size)
+        if (magic, version, key_size, solution_size) != (
+            MAGIC,
+            VERSION,
+            KEY_SIZE,
+            _SOLUTION.size,
+        ) or len(self._buffer) != expected:
+            self._buffer.close()
+            raise ValueError(f"{path} is not a near-solved table")
+        self.depth: int = depth
+        self._keys = _Keys(self._buffer, count)
+        self._solutions = _HEADER.size + count * KEY_SIZE
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def lookup(self, state: NormalizedCubeState) -> MoveSequence | None:
+        """Return the optimal solution of ``state`` if it is within the table's depth."""
+
+        key = pack_state(state)
+        if key is None:
+            return None
+        index = bisect.bisect_left(self._keys, key)
+        if index == len(self._keys) or self._keys[index] != key:
+            return None
+        (solution,) = _SOLUTION.unpack_from(self._buffer, self._solutions + index * _SOLUTION.size)
+        moves: list[str] = []
+        while solution:
+            moves.append(MOVE_NAMES[(solution & _MOVE_MASK) - 1])
+            solution >>= _MOVE_BITS
+        return tuple(moves)
+
+    def close(self) -> None:
+        self._buffer.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.near_solved",
+        description="Build the near-solved lookup table.",
+    )
+    parser.add_argument("--depth", type=int, default=5, help=f"at most {MAX_DEPTH}")
+    parser.add_argument("--output", default="var/near_solved.bin")
+    args = parser.parse_args(argv)
+    started = time.perf_counter()
+    count = write_table(args.output, args.depth)
+    _LOGGER.info(
+        "near_solved_table_built",
+        path=args.output,
+        depth=args.depth,
+        entries=count,
+        seconds=round(time.perf_counter() - started, 2),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
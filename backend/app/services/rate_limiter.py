@@ -0,0 +1,300 @@
+"""Token-bucket rate limiting with per-process or host-wide state.
+
+A rate string such as ``"10/minute"`` or ``"10/minute; 100 per hour"`` turns
+into one token bucket per rule: the bucket holds up to ``amount`` tokens and
+refills continuously at ``amount / period``. A request of weight ``cost``
+passes only if every bucket holds at least ``cost`` tokens, in which case all
+of them are charged at once, so each request costs a single store round trip.
+A cost larger than a bucket can ever hold is refused with an infinite
+``retry_after``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Final, Protocol
+
+_PERIODS: Final[dict[str, float]] = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+_RULE = re.compile(
+    r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$",
+    re.IGNORECASE,
+)
+_CLEANUP_INTERVAL: Final[int] = 1024
+
+# (tokens, updated) of one bucket; ``None`` for a bucket that was never used.
+Bucket = tuple[float, float]
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitRule:
+    """``amount`` requests per ``period`` seconds."""
+
+    amount: int
+    period: float
+
+    @property
+    def refill(self) -> float:
+        return self.amount / self.period
+
+    @property
+    def key(self) -> str:
+        return f"{self.amount}/{self.period:g}s"
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitDecision:
+    """Outcome of one charge, with what the rate limit headers need."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float
+
+
+@lru_cache(maxsize=64)
+def parse_rate(value: str) -> tuple[RateLimitRule, ...]:
+    """Parse ``"10/minute"``, ``"5 per 10 seconds"`` and ``;``/``,`` separated lists."""
+
+    rules = []
+    for part in re.split(r"[;,]", value):
+        if not part.strip():
+            continue
+        match = _RULE.match(part)
+        if match is None:
+            raise ValueError(f"Invalid rate limit: {part.strip()!r}")
+        amount, multiplier, unit = match.groups()
+        period = _PERIODS[unit.lower()] * int(multiplier or 1)
+        rules.append(RateLimitRule(amount=int(amount), period=period))
+    if not rules:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    return tuple(rules)
+
+
+def settle(
+    buckets: Sequence[Bucket | None],
+    rules: Sequence[RateLimitRule],
+    cost: float,
+    now: float,
+) -> tuple[RateLimitDecision, list[Bucket]]:
+    """Refill ``buckets`` up to ``now`` and charge ``cost`` if every one allows it.
+
+    Returns the decision and the new bucket states to store.
+    """
+
+    levels = [_refilled(bucket, rule, now) for bucket, rule in zip(buckets, rules, strict=True)]
+    allowed = all(level >= cost for level in levels)
+    if allowed:
+        levels = [level - cost for level in levels]
+    retry_after = 0.0
+    if any(cost > rule.amount for rule in rules):
+        retry_after = math.inf
+    elif not allowed:
+        retry_after = max(
+            (cost - level) / rule.refill for level, rule in zip(levels, rules, strict=True)
+        )
+    tightest = min(range(len(rules)), key=lambda index: levels[index] / rules[index].amount)
+    rule, level = rules[tightest], levels[tightest]
+    decision = RateLimitDecision(
+        allowed=allowed,
+        limit=rule.amount,
+        remaining=max(0, math.floor(level)),
+        reset_after=(rule.amount - level) / rule.refill,
+        retry_after=retry_after,
+    )
+    return decision, [(level, now) for level in levels]
+
+
+def _refilled(bucket: Bucket | None, rule: RateLimitRule, now: float) -> float:
+    if bucket is None:
+        return float(rule.amount)
+    tokens, updated = bucket
+    return min(rule.amount, tokens + (now - updated) * rule.refill)
+
+
+def _full_at(tokens: float, rule: RateLimitRule, now: float) -> float:
+    return now + (rule.amount - tokens) / rule.refill
+
+
+class BucketStore(Protocol):
+    """Storage backend used by :class:`RateLimiter`.
+
+    ``blocking`` stores do I/O in ``take`` and are called off the event loop.
+    """
+
+    blocking: bool
+
+    def take(
+        self, keys: Sequence[str], rules: Sequence[RateLimitRule], cost: float
+    ) -> RateLimitDecision: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryBucketStore:
+    """Per-process buckets; each worker enforces the limit on its own.
+
+    Like :class:`SqliteBucketStore`, buckets are dropped once they are full
+    again, so one-off clients do not accumulate.
+    """
+
+    blocking = False
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, Bucket] = {}
+        self._full_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(
+        self, keys: Sequence[str], rules: Sequence[RateLimitRule], cost: float
+    ) -> RateLimitDecision:
+        with self._lock:
+            now = time.monotonic()
+            current = [self._buckets.get(key) for key in keys]
+            decision, updated = settle(current, rules, cost, now)
+            for key, bucket, rule in zip(keys, updated, rules, strict=True):
+                self._buckets[key] = bucket
+                self._full_at[key] = _full_at(bucket[0], rule, now)
+            self._writes += 1
+            if self._writes % _CLEANUP_INTERVAL == 0:
+                self._evict(now)
+            return decision
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._full_at.clear()
+
+    def _evict(self, now: float) -> None:
+        expired = [key for key, full_at in self._full_at.items() if full_at < now]
+        for key in expired:
+            del self._buckets[key], self._full_at[key]
+
+
+class SqliteBucketStore:
+    """Buckets in a SQLite file shared by every worker process on the host.
+
+    Each charge is one ``BEGIN IMMEDIATE`` transaction, so concurrent workers
+    serialize on the database lock and never over-admit. Rows record when the
+    bucket will be full again and are dropped once that time has passed.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._owner_pid = 0
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reconnect in each new process.
+        if self._connection is None or self._owner_pid != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path,
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, "
+                "full_at REAL NOT NULL)"
+            )
+            self._connection = connection
+            self._owner_pid = os.getpid()
+        return self._connection
+
+    def take(
+        self, keys: Sequence[str], rules: Sequence[RateLimitRule], cost: float
+    ) -> RateLimitDecision:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                current = [
+                    connection.execute(
+                        "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                    ).fetchone()
+                    for key in keys
+                ]
+                decision, updated = settle(current, rules, cost, now)
+                connection.executemany(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [
+                        (key, tokens, now, _full_at(tokens, rule, now))
+                        for key, (tokens, _), rule in zip(keys, updated, rules, strict=True)
+                    ],
+                )
+                self._writes += 1
+                if self._writes % _CLEANUP_INTERVAL == 0:
+                    connection.execute("DELETE FROM buckets WHERE full_at < ?", (now,))
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return decision
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM buckets")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._owner_pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+class RateLimiter:
+    """Charge weighted requests against the buckets of a rate string."""
+
+    def __init__(self, store: BucketStore, *, enabled: bool = True) -> None:
+        self._store = store
+        self.enabled = enabled
+
+    def hit(self, key: str, rate: str, *, cost: int = 1) -> RateLimitDecision:
+        """Charge ``cost`` tokens for ``key`` against every rule of ``rate``."""
+
+        rules = parse_rate(rate)
+        if not self.enabled:
+            limit = rules[0].amount
+            return RateLimitDecision(True, limit, limit, 0.0, 0.0)
+        return self._store.take([f"{key}:{rule.key}" for rule in rules], rules, cost)
+
+    async def acquire(self, key: str, rate: str, *, cost: int = 1) -> RateLimitDecision:
+        """Like :meth:`hit`, but runs a blocking store's transaction off the event loop."""
+
+        if self.enabled and self._store.blocking:
+            return await asyncio.to_thread(self.hit, key, rate, cost=cost)
+        return self.hit(key, rate, cost=cost)
+
+    def capacity(self, rate: str) -> int | None:
+        """Largest cost ``rate`` can ever admit at once, or ``None`` when disabled."""
+
+        if not self.enabled:
+            return None
+        return min(rule.amount for rule in parse_rate(rate))
+
+    def reset(self) -> None:
+        self._store.clear()
@@ -0,0 +1,69 @@
+"""Coalesce concurrent calls for the same key into one in-flight task."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Coroutine, Hashable
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class _Flight(Generic[T]):
+    task: asyncio.Task[T]
+    waiters: int = field(default=0)
+
+
+class SingleFlight(Generic[T]):
+    """Share one running task between every caller that asks for the same key.
+
+    The work runs in its own task, so a cancelled caller only stops waiting;
+    the task itself is cancelled once the last waiter has gone. Exceptions are
+    delivered to every waiter of the flight.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight[T]] = {}
+        self._started = 0
+        self._coalesced = 0
+
+    @property
+    def started(self) -> int:
+        """Number of flights that actually ran the underlying work."""
+
+        return self._started
+
+    @property
+    def coalesced(self) -> int:
+        """Number of calls that joined a flight instead of starting one."""
+
+        return self._coalesced
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: Hashable, factory: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(task=asyncio.create_task(factory()))
+            self._flights[key] = flight
+            self._started += 1
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self._coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                self._forget(key, flight)
+
+    def _forget(self, key: Hashable, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
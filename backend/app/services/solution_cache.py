@@ -0,0 +1,199 @@
+"""Pluggable storage for solved cube states.
+
+Entries are keyed by integers, normally a packed
+:class:`~app.services.cube_state.CubeState` code, instead of facelet strings.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Final, Protocol
+
+from .types import MoveSequence
+
+_EVICTION_CHECK_INTERVAL: Final[int] = 256
+_EVICTION_HEADROOM: Final[float] = 0.9
+# Stored in ``PRAGMA user_version``; 1 is the table keyed by packed states.
+_SCHEMA_VERSION: Final[int] = 1
+
+
+class SolutionCache(Protocol):
+    """Storage backend used by :class:`~app.services.solver_local.LocalSolver`.
+
+    ``blocking`` backends do I/O, so async callers must not use them on the
+    event loop.
+    """
+
+    blocking: bool
+
+    def get(self, key: int) -> MoveSequence | None: ...
+
+    def set(self, key: int, moves: MoveSequence) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class MemorySolutionCache:
+    """Per-process LRU cache."""
+
+    blocking = False
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[int, MoveSequence] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: int) -> MoveSequence | None:
+        with self._lock:
+            moves = self._entries.get(key)
+            if moves is not None:
+                self._entries.move_to_end(key)
+            return moves
+
+    def set(self, key: int, moves: MoveSequence) -> None:
+        with self._lock:
+            self._entries[key] = moves
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SqliteSolutionCache:
+    """SQLite cache shared by every process on the host and kept across restarts.
+
+    The database runs in WAL mode so readers in other workers never block on a
+    writer. Entries carry a ``last_used`` timestamp that is refreshed at most
+    once per ``touch_interval`` seconds; when the table grows past
+    ``max_entries`` the least recently used rows are evicted down to 90% of the
+    limit.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        max_entries: int,
+        touch_interval: float = 60.0,
+    ) -> None:
+        self._path = Path(path)
+        self._max_entries = max_entries
+        self._touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._owner_pid = 0
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so reconnect in each new process.
+        if self._connection is None or self._owner_pid != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path,
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+            if version < _SCHEMA_VERSION:
+                _migrate(connection)
+            self._connection = connection
+            self._owner_pid = os.getpid()
+        return self._connection
+
+    def get(self, key: int) -> MoveSequence | None:
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT moves, last_used FROM packed_solutions WHERE state = ?",
+                (_blob(key),),
+            ).fetchone()
+            if row is None:
+                return None
+            moves, last_used = row
+            now = time.time()
+            if now - last_used > self._touch_interval:
+                connection.execute(
+                    "UPDATE packed_solutions SET last_used = ? WHERE state = ?",
+                    (now, _blob(key)),
+                )
+            return tuple(moves.split())
+
+    def set(self, key: int, moves: MoveSequence) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO packed_solutions (state, moves, last_used) "
+                "VALUES (?, ?, ?)",
+                (_blob(key), " ".join(moves), time.time()),
+            )
+            self._writes += 1
+            if self._writes % _EVICTION_CHECK_INTERVAL == 0:
+                self._evict(connection)
+
+    def evict(self) -> None:
+        """Trim the table to the configured size immediately."""
+
+        with self._lock:
+            self._evict(self._connect())
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        (count,) = connection.execute("SELECT COUNT(*) FROM packed_solutions").fetchone()
+        if count <= self._max_entries:
+            return
+        excess = count - int(self._max_entries * _EVICTION_HEADROOM)
+        connection.execute(
+            "DELETE FROM packed_solutions WHERE state IN "
+            "(SELECT state FROM packed_solutions ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._owner_pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connect().execute("SELECT COUNT(*) FROM packed_solutions").fetchone()
+            return int(count)
+
+
+def _blob(key: int) -> bytes:
+    # Keys can exceed SQLite's 64-bit integers, so they are stored as big-endian bytes.
+    return key.to_bytes(max(1, (key.bit_length() + 7) // 8), "big")
+
+
+def _migrate(connection: sqlite3.Connection) -> None:
+    # Once per file: the lock makes concurrent workers wait, and the version is re-read under it.
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        (version,) = connection.execute("PRAGMA user_version").fetchone()
+        if version < _SCHEMA_VERSION:
+            # Version 0 was keyed by facelet strings, which packed keys never match.
+            connection.execute("DROP TABLE IF EXISTS solutions")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS packed_solutions ("
+                "state BLOB PRIMARY KEY, moves TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS packed_solutions_last_used "
+                "ON packed_solutions (last_used)"
+            )
+            connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
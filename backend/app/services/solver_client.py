@@ -4,19 +4,42 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+import math
+import random
 import time
-from collections.abc import Iterable, Mapping
+from collections import deque
+from collections.abc import Callable, Collection, Iterable, Mapping, Sequence
 from dataclasses import dataclass
 from http import HTTPStatus
-from typing import Any
+from typing import Any, TypeVar
 
 import httpx
 import structlog
 
+from .deadline import Deadline
+from .metrics import METRICS
+from .moves import simplify_moves, solves
 from .types import MoveSequence, NormalizedCubeState
 
 _LOGGER = structlog.get_logger(__name__)
 
+BREAKER_TRANSITIONS = METRICS.counter(
+    "krubik_circuit_breaker_transitions_total",
+    "Circuit breaker state changes by target state.",
+    ("state",),
+)
+BREAKER_REJECTIONS = METRICS.counter(
+    "krubik_circuit_breaker_rejections_total",
+    "External calls refused by an open or probing circuit breaker.",
+)
+EXTERNAL_ATTEMPT_SECONDS = METRICS.histogram(
+    "krubik_external_attempt_seconds",
+    "Duration of single external solver HTTP attempts by outcome.",
+    ("outcome",),
+)
+
+T = TypeVar("T")
+
 
 class CircuitBreakerOpenError(RuntimeError):
     """Raised when the circuit breaker is open."""
@@ -30,133 +53,466 @@ class ExternalSolverError(RuntimeError):
     context: Mapping[str, object] | None = None
 
 
+@dataclass(frozen=True, slots=True)
+class BreakerPolicy:
+    """Tuning knobs of the rolling-window :class:`CircuitBreaker`."""
+
+    window_seconds: float = 60.0
+    error_rate: float = 0.5
+    slow_call_seconds: float | None = None
+    latency_quantile: float = 0.95
+    half_open_max_calls: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class BreakerSnapshot:
+    """Point-in-time view of a breaker used for routing and diagnostics."""
+
+    state: str
+    calls: int
+    failures: int
+    error_rate: float
+    latency_quantile: float | None
+    probes_in_flight: int
+    available: bool
+
+
 class CircuitBreaker:
-    """Simple circuit breaker implementation for async workflows."""
+    """Rolling-window circuit breaker for async workflows.
+
+    Outcomes from the last ``window_seconds`` are kept. The breaker opens when
+    at least ``threshold`` calls failed and the failure ratio reaches
+    ``error_rate``, or when at least ``threshold`` calls were seen and their
+    latency quantile exceeds ``slow_call_seconds``. After ``reset_timeout`` it
+    turns half-open and lets at most ``half_open_max_calls`` probes through; a
+    successful probe closes it, a failed one reopens it.
+    """
 
-    def __init__(self, *, threshold: int, reset_timeout: float) -> None:
+    def __init__(
+        self,
+        *,
+        threshold: int,
+        reset_timeout: float,
+        policy: BreakerPolicy | None = None,
+    ) -> None:
         self._threshold = threshold
         self._reset_timeout = reset_timeout
-        self._failure_count = 0
+        self._policy = policy or BreakerPolicy()
+        self._outcomes: deque[tuple[float, bool, float | None]] = deque()
         self._state: str = "closed"
         self._opened_at: float = 0.0
+        self._probes = 0
         self._lock = asyncio.Lock()
 
+    @property
+    def state(self) -> str:
+        return self._state
+
     async def before_call(self) -> None:
         async with self._lock:
+            now = time.monotonic()
             if self._state == "open":
-                elapsed = time.monotonic() - self._opened_at
-                if elapsed < self._reset_timeout:
+                if now - self._opened_at < self._reset_timeout:
+                    BREAKER_REJECTIONS.inc()
                     raise CircuitBreakerOpenError("Circuit breaker open")
-                self._state = "half_open"
+                self._transition("half_open")
+                self._probes = 0
+            if self._state == "half_open":
+                if self._probes >= self._policy.half_open_max_calls:
+                    BREAKER_REJECTIONS.inc()
+                    raise CircuitBreakerOpenError("Circuit breaker probing")
+                self._probes += 1
 
-    async def record_success(self) -> None:
+    async def record_success(self, latency: float | None = None) -> None:
         async with self._lock:
-            self._failure_count = 0
-            self._state = "closed"
+            if self._state == "half_open":
+                self._outcomes.clear()
+                self._transition("closed")
+                self._probes = 0
+                return
+            self._record(success=True, latency=latency)
 
-    async def record_failure(self) -> None:
+    async def record_failure(self, latency: float | None = None) -> None:
         async with self._lock:
-            self._failure_count += 1
-            if self._failure_count >= self._threshold:
-                self._state = "open"
-                self._opened_at = time.monotonic()
+            if self._state == "half_open":
+                self._open()
+                return
+            self._record(success=False, latency=latency)
+
+    @property
+    def available(self) -> bool:
+        """Whether :meth:`before_call` would currently admit a request."""
+
+        return self._available(time.monotonic())
+
+    def release(self) -> None:
+        """Return a half-open probe slot for a call that was abandoned."""
+
+        if self._state == "half_open" and self._probes > 0:
+            self._probes -= 1
+
+    def snapshot(self) -> BreakerSnapshot:
+        now = time.monotonic()
+        self._prune(now)
+        calls = len(self._outcomes)
+        failures = sum(1 for _, success, _ in self._outcomes if not success)
+        return BreakerSnapshot(
+            state=self._state,
+            calls=calls,
+            failures=failures,
+            error_rate=failures / calls if calls else 0.0,
+            latency_quantile=self._latency_quantile(),
+            probes_in_flight=self._probes,
+            available=self._available(now),
+        )
+
+    def _available(self, now: float) -> bool:
+        if self._state == "open":
+            return now - self._opened_at >= self._reset_timeout
+        if self._state == "half_open":
+            return self._probes < self._policy.half_open_max_calls
+        return True
+
+    def _record(self, *, success: bool, latency: float | None) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, success, latency))
+        self._prune(now)
+        if self._state == "closed" and self._should_trip():
+            self._open()
+
+    def _should_trip(self) -> bool:
+        calls = len(self._outcomes)
+        failures = sum(1 for _, success, _ in self._outcomes if not success)
+        if failures >= self._threshold and failures / calls >= self._policy.error_rate:
+            return True
+        slow_limit = self._policy.slow_call_seconds
+        if slow_limit is None or calls < self._threshold:
+            return False
+        quantile = self._latency_quantile()
+        return quantile is not None and quantile > slow_limit
+
+    def _latency_quantile(self) -> float | None:
+        latencies = sorted(latency for _, _, latency in self._outcomes if latency is not None)
+        if not latencies:
+            return None
+        rank = max(math.ceil(self._policy.latency_quantile * len(latencies)) - 1, 0)
+        return latencies[rank]
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self._policy.window_seconds
+        while self._outcomes and self._outcomes[0][0] < horizon:
+            self._outcomes.popleft()
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        BREAKER_TRANSITIONS.labels(state).inc()
+
+    def _open(self) -> None:
+        self._transition("open")
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self._outcomes.clear()
+
+
+class CircuitBreakerRegistry:
+    """Keep an independent :class:`CircuitBreaker` per upstream endpoint."""
+
+    def __init__(self, factory: Callable[[], CircuitBreaker]) -> None:
+        self._factory = factory
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def for_endpoint(self, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = self._factory()
+        return breaker
+
+    def snapshot(self) -> dict[str, BreakerSnapshot]:
+        return {endpoint: breaker.snapshot() for endpoint, breaker in self._breakers.items()}
+
+
+@dataclass(slots=True)
+class SolverEndpoint:
+    """One solver replica with its breaker and smoothed latency."""
+
+    url: str
+    breaker: CircuitBreaker
+    ewma_latency: float | None = None
+    in_flight: int = 0
+
+    @property
+    def score(self) -> float:
+        # Unmeasured replicas score zero so that each one gets explored once.
+        return (self.ewma_latency or 0.0) * (1 + self.in_flight)
+
+
+class EndpointPool:
+    """Pick the fastest healthy solver replica.
+
+    Latency is tracked as an exponentially weighted moving average per
+    replica. ``least_latency`` always picks the lowest score, while ``p2c``
+    compares two random healthy replicas (power of two choices), which keeps
+    many processes from piling onto the same replica.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        breakers: CircuitBreakerRegistry,
+        *,
+        strategy: str = "least_latency",
+        smoothing: float = 0.3,
+    ) -> None:
+        self._endpoints = [
+            SolverEndpoint(url=url, breaker=breakers.for_endpoint(url))
+            for url in dict.fromkeys(urls)
+        ]
+        self._strategy = strategy
+        self._smoothing = smoothing
+        self._random = random.Random()  # noqa: S311 - load balancing, not security
+
+    @property
+    def endpoints(self) -> list[SolverEndpoint]:
+        return list(self._endpoints)
+
+    def choose(self, exclude: Collection[str] = ()) -> SolverEndpoint | None:
+        """Return a healthy replica outside ``exclude`` or ``None``."""
+
+        candidates = [
+            endpoint
+            for endpoint in self._endpoints
+            if endpoint.url not in exclude and endpoint.breaker.available
+        ]
+        if not candidates:
+            return None
+        if self._strategy == "p2c" and len(candidates) > 1:
+            candidates = self._random.sample(candidates, 2)
+        return min(candidates, key=lambda endpoint: endpoint.score)
+
+    def observe(self, endpoint: SolverEndpoint, latency: float) -> None:
+        if endpoint.ewma_latency is None:
+            endpoint.ewma_latency = latency
+        else:
+            endpoint.ewma_latency += self._smoothing * (latency - endpoint.ewma_latency)
 
 
 class ExternalSolverClient:
-    """Wrapper around an HTTPX client with retry and circuit breaker."""
+    """Wrapper around an HTTPX client with retries across replicas.
+
+    Each attempt goes to the best healthy replica that has not been tried for
+    this state yet, so a failure is retried on another replica right away.
+    The client only backs off once every healthy replica has failed.
+    """
 
     def __init__(
         self,
         *,
         client: httpx.AsyncClient,
-        endpoint: str | None,
+        endpoints: EndpointPool,
         timeout_seconds: float,
         max_retries: int,
-        circuit_breaker: CircuitBreaker,
     ) -> None:
         self._client = client
-        self._endpoint = endpoint
+        self._pool = endpoints
         self._timeout = timeout_seconds
         self._max_retries = max_retries
-        self._breaker = circuit_breaker
 
     @staticmethod
     def _hash_state(state: NormalizedCubeState) -> str:
         digest = hashlib.sha256(state.encode("utf-8")).hexdigest()
         return digest[:12]
 
-    async def solve(self, state: NormalizedCubeState) -> MoveSequence:
-        if not self._endpoint:
-            raise ExternalSolverError("external_disabled", None)
+    async def solve(
+        self, state: NormalizedCubeState, *, deadline: Deadline | None = None
+    ) -> MoveSequence:
+        """Return a verified and simplified solution of ``state``.
 
-        await self._breaker.before_call()
+        A solution that does not solve ``state`` counts as a failed attempt.
+        With a ``deadline``, attempts are cut short when it passes and retries
+        or backoffs that it cannot cover are skipped.
+        """
+
+        def parse(payload: Mapping[str, Any]) -> MoveSequence:
+            return self._accept(state, self._parse_moves(payload))
+
+        return await self._post({"state": state}, parse, self._hash_state(state), deadline)
+
+    async def solve_batch(
+        self, states: Sequence[NormalizedCubeState]
+    ) -> list[MoveSequence | ExternalSolverError]:
+        """Solve ``states`` with one ``{"states": [...]}`` request.
+
+        The solver answers with ``{"results": [...]}`` in request order, each
+        item holding either ``moves`` or an ``error``. Failed items are returned
+        as :class:`ExternalSolverError` instead of failing the whole batch, and
+        the circuit breaker sees the batch as a single call.
+        """
+
+        def parse(payload: Mapping[str, Any]) -> list[MoveSequence | ExternalSolverError]:
+            return self._parse_batch(payload, states)
+
+        return await self._post(
+            {"states": list(states)},
+            parse,
+            self._hash_state("".join(states)),
+        )
+
+    async def _post(
+        self,
+        body: Mapping[str, Any],
+        parse: Callable[[Mapping[str, Any]], T],
+        state_hash: str,
+        deadline: Deadline | None = None,
+    ) -> T:
+        if not self._pool.endpoints:
+            raise ExternalSolverError("external_disabled", None)
 
         attempt = 0
         delay = 0.2
+        tried: set[str] = set()
         last_error: Exception | None = None
         while attempt <= self._max_retries:
+            if deadline is not None and deadline.expired:
+                break
+            endpoint = self._pool.choose(exclude=tried)
+            if endpoint is None:
+                if not tried:
+                    raise CircuitBreakerOpenError("Circuit breaker open")
+                if deadline is not None and not deadline.covers(delay):
+                    break
+                # Every healthy replica failed once; back off before reusing them.
+                tried.clear()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 2.0)
+                continue
+            if attempt and deadline is not None and not deadline.covers(endpoint.score):
+                # A retry this replica is unlikely to answer in time only delays the fallback.
+                break
+            tried.add(endpoint.url)
             try:
-                response = await self._client.post(
-                    self._endpoint,
-                    json={"state": state},
-                    timeout=self._timeout,
-                )
-                if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
-                    raise ExternalSolverError(
-                        "external_unavailable",
-                        {"status_code": response.status_code},
-                    )
-                response.raise_for_status()
-                payload = response.json()
-                if not isinstance(payload, Mapping):
-                    raise ExternalSolverError("invalid_response", None)
-                moves = self._parse_moves(payload)
-                await self._breaker.record_success()
-                return moves
-            except CircuitBreakerOpenError:
+                await endpoint.breaker.before_call()
+                if deadline is None:
+                    return await self._attempt(endpoint, body, parse, state_hash)
+                # An attempt cut short by our own deadline is released, not held
+                # against the replica's breaker.
+                async with asyncio.timeout_at(deadline.expires_at):
+                    return await self._attempt(endpoint, body, parse, state_hash)
+            except asyncio.CancelledError:
                 raise
-            except httpx.TimeoutException as exc:
+            except Exception as exc:  # noqa: BLE001 - logged and retried in _attempt
                 last_error = exc
-                await self._breaker.record_failure()
-                _LOGGER.warning(
-                    "external_solver_timeout",
-                    state_hash=self._hash_state(state),
-                    attempt=attempt,
+            attempt += 1
+
+        error = str(last_error) if last_error else None
+        if deadline is not None and (attempt <= self._max_retries or deadline.expired):
+            raise ExternalSolverError("deadline_exceeded", {"error": error})
+        raise ExternalSolverError("external_unreachable", {"error": error})
+
+    async def _attempt(
+        self,
+        endpoint: SolverEndpoint,
+        body: Mapping[str, Any],
+        parse: Callable[[Mapping[str, Any]], T],
+        state_hash: str,
+    ) -> T:
+        breaker = endpoint.breaker
+        started = time.monotonic()
+        endpoint.in_flight += 1
+        try:
+            response = await self._client.post(
+                endpoint.url,
+                json=body,
+                timeout=self._timeout,
+            )
+            if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+                raise ExternalSolverError(
+                    "external_unavailable",
+                    {"status_code": response.status_code},
                 )
-            except httpx.HTTPError as exc:
-                last_error = exc
-                await self._breaker.record_failure()
-                _LOGGER.warning(
-                    "external_solver_http_error",
-                    state_hash=self._hash_state(state),
-                    attempt=attempt,
-                    detail=str(exc),
+            response.raise_for_status()
+            payload = response.json()
+            if not isinstance(payload, Mapping):
+                raise ExternalSolverError("invalid_response", None)
+            result = parse(payload)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except httpx.TimeoutException:
+            await self._record_failure(endpoint, started, "timeout")
+            _LOGGER.warning(
+                "external_solver_timeout",
+                state_hash=state_hash,
+                endpoint=endpoint.url,
+            )
+            raise
+        except httpx.HTTPError as exc:
+            await self._record_failure(endpoint, started, "http_error")
+            _LOGGER.warning(
+                "external_solver_http_error",
+                state_hash=state_hash,
+                endpoint=endpoint.url,
+                detail=str(exc),
+            )
+            raise
+        except ExternalSolverError as exc:
+            await self._record_failure(endpoint, started, "error_response")
+            _LOGGER.warning(
+                "external_solver_error_response",
+                state_hash=state_hash,
+                endpoint=endpoint.url,
+                status=exc.context,
+            )
+            raise
+        except Exception:  # pragma: no cover - defensive
+            await self._record_failure(endpoint, started, "unexpected")
+            _LOGGER.exception(
+                "external_solver_unexpected_error",
+                state_hash=state_hash,
+            )
+            raise
+        finally:
+            endpoint.in_flight -= 1
+
+        latency = time.monotonic() - started
+        EXTERNAL_ATTEMPT_SECONDS.labels("success").observe(latency)
+        await breaker.record_success(latency)
+        self._pool.observe(endpoint, latency)
+        return result
+
+    async def _record_failure(self, endpoint: SolverEndpoint, started: float, outcome: str) -> None:
+        latency = time.monotonic() - started
+        EXTERNAL_ATTEMPT_SECONDS.labels(outcome).observe(latency)
+        await endpoint.breaker.record_failure(latency)
+        self._pool.observe(endpoint, latency)
+
+    @classmethod
+    def _parse_batch(
+        cls, payload: Mapping[str, Any], states: Sequence[NormalizedCubeState]
+    ) -> list[MoveSequence | ExternalSolverError]:
+        items = payload.get("results")
+        if not isinstance(items, list) or len(items) != len(states):
+            raise ExternalSolverError("invalid_response", None)
+        results: list[MoveSequence | ExternalSolverError] = []
+        for state, item in zip(states, items, strict=True):
+            if not isinstance(item, Mapping):
+                raise ExternalSolverError("invalid_response", None)
+            if item.get("error") is not None:
+                results.append(
+                    ExternalSolverError("external_unavailable", {"error": str(item["error"])})
                 )
+                continue
+            try:
+                results.append(cls._accept(state, cls._parse_moves(item)))
             except ExternalSolverError as exc:
-                last_error = exc
-                await self._breaker.record_failure()
-                _LOGGER.warning(
-                    "external_solver_error_response",
-                    state_hash=self._hash_state(state),
-                    attempt=attempt,
-                    status=exc.context,
-                )
-            except Exception as exc:  # pragma: no cover - defensive
-                last_error = exc
-                await self._breaker.record_failure()
-                _LOGGER.exception(
-                    "external_solver_unexpected_error",
-                    state_hash=self._hash_state(state),
-                )
-
-            attempt += 1
-            await asyncio.sleep(delay)
-            delay = min(delay * 2, 2.0)
+                results.append(exc)
+        return results
 
-        raise ExternalSolverError(
-            "external_unreachable",
-            {"error": str(last_error) if last_error else None},
-        )
+    @staticmethod
+    def _accept(state: NormalizedCubeState, moves: MoveSequence) -> MoveSequence:
+        # Upstream output is never trusted: it must solve the submitted state.
+        if not solves(state, moves):
+            raise ExternalSolverError("invalid_solution", None)
+        return simplify_moves(moves)
 
     @staticmethod
     def _parse_moves(payload: Mapping[str, Any]) -> MoveSequence:
@@ -0,0 +1,88 @@
+"""Process pool engine that runs local Kociemba solves off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import structlog
+
+from .facelets import SOLVED_STATE
+from .solver_local import DEFAULT_MAX_DEPTH, LOCAL_SOLVE_SECONDS, solve_uncached
+from .types import MoveSequence, NormalizedCubeState
+
+_LOGGER = structlog.get_logger(__name__)
+
+__all__ = ["SOLVED_STATE", "SolverEngine"]
+
+
+def _init_worker() -> None:
+    """Load the Kociemba pruning tables before the worker accepts solves."""
+
+    solve_uncached(SOLVED_STATE)
+
+
+class SolverEngine:
+    """Dispatch local solves to a pool of warmed worker processes.
+
+    Every worker loads the Kociemba tables in the pool initializer, so user
+    requests never pay the table load. Solves are queued on the executor and
+    returned to the caller as awaitables, which lets a single event loop keep
+    every core busy. Workers only search; caching stays with the caller's
+    :class:`~app.services.solver_local.LocalSolver`.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int | None = None,
+        start_method: str = "spawn",
+    ) -> None:
+        self._workers = workers or os.cpu_count() or 1
+        self._start_method = start_method
+        self._executor: Executor | None = None
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> Executor:
+        """Create the worker pool if it is not running yet."""
+
+        if self._executor is None:
+            context = multiprocessing.get_context(self._start_method)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=context,
+                initializer=_init_worker,
+            )
+            _LOGGER.info("solver_engine_started", workers=self._workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the worker processes and drop queued solves."""
+
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            _LOGGER.info("solver_engine_stopped")
+
+    async def solve(
+        self, state: NormalizedCubeState, max_depth: int = DEFAULT_MAX_DEPTH
+    ) -> MoveSequence:
+        """Solve ``state`` in a worker process without blocking the loop."""
+
+        executor = self.start()
+        loop = asyncio.get_running_loop()
+        # Includes the time spent queued behind other solves.
+        started = time.perf_counter()
+        moves = await loop.run_in_executor(executor, solve_uncached, state, max_depth)
+        LOCAL_SOLVE_SECONDS.labels("engine").observe(time.perf_counter() - started)
+        return moves
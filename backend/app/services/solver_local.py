@@ -2,28 +2,151 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
-from functools import lru_cache
+import time
+from typing import Final
 
 import kociemba
 
+from .cube_state import BYTE_SIZE, CubeState
+from .metrics import METRICS
+from .near_solved import NearSolvedTable
+from .solution_cache import MemorySolutionCache, SolutionCache
+from .symmetry import IDENTITY, Symmetry, canonicalize
 from .types import MoveSequence, NormalizedCubeState
 
+CACHE_LOOKUPS = METRICS.counter(
+    "krubik_solution_cache_lookups_total",
+    "Solution cache lookups by result (hit or miss).",
+    ("result",),
+)
+NEAR_SOLVED_LOOKUPS = METRICS.counter(
+    "krubik_near_solved_lookups_total",
+    "Near-solved table lookups by result (hit or miss).",
+    ("result",),
+)
+LOCAL_SOLVE_SECONDS = METRICS.histogram(
+    "krubik_local_solve_seconds",
+    "Kociemba search time by runner (thread or engine).",
+    ("runner",),
+)
+
+
+# Kociemba's own bound: the first solution the two-phase search finds.
+DEFAULT_MAX_DEPTH: Final[int] = 24
+# The first solution found is already 20-22 moves long, so bounds of 21-24 cost
+# about the same. Only 20, the diameter of the cube group, searches markedly
+# longer (from a second to minutes on hard states), so the facade never runs it
+# without a time budget.
+MIN_MAX_DEPTH: Final[int] = 20
+_TIER_SHIFT: Final[int] = BYTE_SIZE * 8
+
+
+def solve_uncached(state: NormalizedCubeState, max_depth: int = DEFAULT_MAX_DEPTH) -> MoveSequence:
+    """Run the Kociemba search for ``state`` without consulting any cache.
+
+    A lower ``max_depth`` gives shorter solutions at the cost of a longer search.
+    """
+
+    solution = kociemba.solve(state, max_depth=max_depth)
+    return tuple(solution.split())
+
 
 class LocalSolver:
-    """Solve cube states locally with LRU caching."""
+    """Solve cube states locally with a pluggable solution cache.
+
+    With ``canonical_keys`` enabled, entries are stored under the symmetry
+    representative of a state, so rotated, mirrored and recoloured variants hit
+    the same entry and get the cached moves mapped back onto their own frame.
+
+    A :class:`~app.services.near_solved.NearSolvedTable` is consulted before
+    the cache: states within its depth get their optimal solution without a
+    search.
+
+    Solutions are cached per quality tier, the ``max_depth`` bound they were
+    searched with, so a tight request never gets a looser cached answer.
+    """
 
-    def __init__(self, cache_size: int = 256) -> None:
-        self._solve_cached: Callable[[NormalizedCubeState], MoveSequence] = lru_cache(
-            maxsize=cache_size,
-        )(self._solve_without_cache)
+    def __init__(
+        self,
+        cache_size: int = 256,
+        *,
+        cache: SolutionCache | None = None,
+        canonical_keys: bool = True,
+        near_solved: NearSolvedTable | None = None,
+    ) -> None:
+        self._cache: SolutionCache = cache if cache is not None else MemorySolutionCache(cache_size)
+        self._canonical_keys = canonical_keys
+        self._near_solved = near_solved
+
+    @property
+    def cache(self) -> SolutionCache:
+        return self._cache
 
     @staticmethod
-    def _solve_without_cache(state: NormalizedCubeState) -> MoveSequence:
-        solution = kociemba.solve(state)
-        return tuple(solution.split())
+    def _solve_without_cache(state: NormalizedCubeState, max_depth: int) -> MoveSequence:
+        return solve_uncached(state, max_depth)
+
+    def lookup_near_solved(self, state: NormalizedCubeState) -> MoveSequence | None:
+        """Return the optimal solution from the near-solved table, if ``state`` is in it."""
+
+        if self._near_solved is None:
+            return None
+        moves = self._near_solved.lookup(state)
+        NEAR_SOLVED_LOOKUPS.labels("miss" if moves is None else "hit").inc()
+        return moves
+
+    def lookup(
+        self, state: NormalizedCubeState, max_depth: int = DEFAULT_MAX_DEPTH
+    ) -> MoveSequence | None:
+        """Return a known solution for ``state`` without solving it."""
+
+        moves = self.lookup_near_solved(state)
+        if moves is not None:
+            return moves
+        key, symmetry = self._key(state, max_depth)
+        moves = None if key is None else self._cache.get(key)
+        if moves is not None:
+            moves = symmetry.unmap_moves(moves)
+        CACHE_LOOKUPS.labels("miss" if moves is None else "hit").inc()
+        return moves
+
+    def store(
+        self,
+        state: NormalizedCubeState,
+        moves: MoveSequence,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+    ) -> None:
+        """Remember a solution computed elsewhere, e.g. in a worker process."""
+
+        key, symmetry = self._key(state, max_depth)
+        if key is not None:
+            self._cache.set(key, symmetry.map_moves(moves))
+
+    def _key(self, state: NormalizedCubeState, max_depth: int) -> tuple[int | None, Symmetry]:
+        symmetry = IDENTITY
+        if self._canonical_keys:
+            state, symmetry = canonicalize(state)
+        return _cache_key(state, max_depth), symmetry
+
+    def solve(self, state: NormalizedCubeState, max_depth: int = DEFAULT_MAX_DEPTH) -> MoveSequence:
+        """Return a move sequence of at most ``max_depth`` turns for a normalized state."""
+
+        moves = self.lookup(state, max_depth)
+        if moves is None:
+            started = time.perf_counter()
+            moves = self._solve_without_cache(state, max_depth)
+            LOCAL_SOLVE_SECONDS.labels("thread").observe(time.perf_counter() - started)
+            self.store(state, moves, max_depth)
+        return moves
 
-    def solve(self, state: NormalizedCubeState) -> MoveSequence:
-        """Return the optimal move sequence for a normalized state."""
 
-        return self._solve_cached(state)
+def _cache_key(state: NormalizedCubeState, max_depth: int) -> int | None:
+    # Tight tiers put their bound above the packed state; the default tier is the bare code.
+    try:
+        code = CubeState.from_facelets(state).code
+    except ValueError:
+        # Only solvable states have solutions worth caching.
+        return None
+    if max_depth == DEFAULT_MAX_DEPTH:
+        return code
+    return max_depth << _TIER_SHIFT | code
@@ -0,0 +1,102 @@
+"""Canonical representatives of cube states under the 48 cube symmetries.
+
+Rotating or mirroring the whole cube and renaming the colours after the new
+centre positions yields another valid state that is solved by the mirrored
+move sequence. Because facelet letters are defined by the centres, this also
+covers every colour relabelling that still describes a real cube. Caching
+the lexicographically smallest image of a state lets all of its symmetric
+variants share a single entry.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import permutations, product
+from typing import Final
+
+from .cubie import FACE_ORDER
+from .facelets import Gather, Matrix, determinant, face_after, facelet_permutation, gatherer
+from .types import MoveSequence, NormalizedCubeState
+
+
+@dataclass(frozen=True, slots=True)
+class Symmetry:
+    """A whole-cube rotation or reflection acting on facelet strings."""
+
+    source: tuple[int, ...]
+    gather: Gather
+    colors: dict[int, int]
+    faces: dict[str, str]
+    inverse_faces: dict[str, str]
+    mirror: bool
+
+    def apply(self, state: NormalizedCubeState) -> NormalizedCubeState:
+        return "".join(self.gather(state)).translate(self.colors)
+
+    def map_moves(self, moves: MoveSequence) -> MoveSequence:
+        """Translate a solution of ``state`` into one of ``apply(state)``."""
+
+        return tuple(self._map_move(move, self.faces) for move in moves)
+
+    def unmap_moves(self, moves: MoveSequence) -> MoveSequence:
+        """Translate a solution of ``apply(state)`` back into one of ``state``."""
+
+        return tuple(self._map_move(move, self.inverse_faces) for move in moves)
+
+    def _map_move(self, move: str, faces: dict[str, str]) -> str:
+        face, suffix = faces[move[0]], move[1:]
+        if self.mirror and suffix != "2":
+            suffix = "" if suffix else "'"
+        return face + suffix
+
+
+def _build_symmetries() -> tuple[Symmetry, ...]:
+    symmetries: list[Symmetry] = []
+    for axes in permutations(range(3)):
+        for signs in product((1, -1), repeat=3):
+            rows = [[0, 0, 0] for _ in range(3)]
+            for row, (axis, sign) in enumerate(zip(axes, signs, strict=True)):
+                rows[row][axis] = sign
+            matrix: Matrix = (
+                (rows[0][0], rows[0][1], rows[0][2]),
+                (rows[1][0], rows[1][1], rows[1][2]),
+                (rows[2][0], rows[2][1], rows[2][2]),
+            )
+            faces = {face: face_after(matrix, face) for face in FACE_ORDER}
+            source = facelet_permutation(matrix)
+            symmetries.append(
+                Symmetry(
+                    source=source,
+                    gather=gatherer(source),
+                    colors=str.maketrans("".join(faces), "".join(faces.values())),
+                    faces=faces,
+                    inverse_faces={target: face for face, target in faces.items()},
+                    mirror=determinant(matrix) < 0,
+                )
+            )
+    return tuple(symmetries)
+
+
+SYMMETRIES: Final[tuple[Symmetry, ...]] = _build_symmetries()
+# The identity matrix is generated first (unpermuted axes, all signs positive).
+IDENTITY: Final[Symmetry] = SYMMETRIES[0]
+
+
+@lru_cache(maxsize=4096)
+def canonicalize(state: NormalizedCubeState) -> tuple[NormalizedCubeState, Symmetry]:
+    """Return the canonical representative of ``state`` and the symmetry used.
+
+    ``symmetry.apply(state)`` equals the representative, and
+    ``symmetry.unmap_moves`` converts a solution of the representative back
+    into a solution of ``state``.
+    """
+
+    best_state = state
+    best_symmetry = IDENTITY
+    for symmetry in SYMMETRIES:
+        candidate = symmetry.apply(state)
+        if candidate < best_state:
+            best_state = candidate
+            best_symmetry = symmetry
+    return best_state, best_symmetry
@@ -0,0 +1,66 @@
+"""Warm-up of the solving pipeline before a process takes traffic.
+
+The first Kociemba search in a process loads the pruning tables, and the first
+validations and canonicalizations populate their lookup caches. Doing this
+explicitly keeps that cost out of the first user requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+
+import structlog
+
+from .cube_validator import CubeValidator
+from .facelets import MOVE_PERMUTATIONS, SOLVED_STATE, apply_moves
+from .solver_engine import SolverEngine
+from .solver_local import solve_uncached
+from .symmetry import canonicalize
+from .types import NormalizedCubeState
+
+_LOGGER = structlog.get_logger(__name__)
+
+SAMPLE_SCRAMBLE_LENGTH = 20
+
+
+def sample_states(count: int) -> list[NormalizedCubeState]:
+    """Return ``count`` fixed scrambles; the same list in every process."""
+
+    rng = random.Random(0)  # noqa: S311 - deterministic sample data
+    moves = sorted(MOVE_PERMUTATIONS)
+    return [
+        apply_moves(SOLVED_STATE, rng.choices(moves, k=SAMPLE_SCRAMBLE_LENGTH))
+        for _ in range(count)
+    ]
+
+
+def warm_up_process(samples: int) -> None:
+    """Load the Kociemba tables and run sample states through every stage.
+
+    Blocking; call it before forking workers or from a thread.
+    """
+
+    validator = CubeValidator()
+    solve_uncached(SOLVED_STATE)
+    for state in sample_states(samples):
+        validator.validate(state)
+        canonicalize(state)
+        solve_uncached(state)
+
+
+async def warm_up(engine: SolverEngine | None, *, samples: int) -> float:
+    """Warm this process and every engine worker; return the elapsed seconds."""
+
+    started = time.perf_counter()
+    await asyncio.to_thread(warm_up_process, samples)
+    if engine is not None:
+        # One solve per worker makes the pool spawn (and warm) all of them.
+        states = sample_states(max(samples, 1))
+        await asyncio.gather(
+            *(engine.solve(states[index % len(states)]) for index in range(engine.workers))
+        )
+    elapsed = time.perf_counter() - started
+    _LOGGER.info("warmup_completed", seconds=round(elapsed, 3), samples=samples)
+    return elapsed
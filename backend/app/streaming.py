@@ -0,0 +1,135 @@
+"""Helpers for endpoints that stream results while the request is still arriving."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable
+from typing import Final
+
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+NDJSON_MEDIA_TYPE: Final[str] = "application/x-ndjson"
+SSE_MEDIA_TYPE: Final[str] = "text/event-stream"
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """Streaming response that also consumes the request body as a stream.
+
+    Starlette's :class:`StreamingResponse` reads ``receive`` only to notice
+    disconnects, and newer releases skip even that on ASGI spec 2.4 servers.
+    This response runs the whole ASGI exchange itself: request body chunks
+    reach ``produce`` through a small bounded buffer, so a slow producer stops
+    the server from reading more of the upload, and a disconnect still
+    cancels the whole response.
+    """
+
+    def __init__(
+        self,
+        produce: Callable[[AsyncIterator[bytes]], AsyncIterator[str]],
+        *,
+        media_type: str,
+        buffer: int = 16,
+    ) -> None:
+        self._chunks: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=buffer)
+        super().__init__(produce(self._body()), media_type=media_type)
+        self.headers["Cache-Control"] = "no-store"
+        self.headers["X-Accel-Buffering"] = "no"
+
+    async def _body(self) -> AsyncIterator[bytes]:
+        while (chunk := await self._chunks.get()) is not None:
+            yield chunk
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        listener = asyncio.create_task(self._listen(receive))
+        sender = asyncio.create_task(self._send(send))
+        try:
+            done, _ = await asyncio.wait({listener, sender}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # Whichever side ends first (body sent or client gone) stops the other.
+            listener.cancel()
+            sender.cancel()
+            await asyncio.gather(listener, sender, return_exceptions=True)
+        for task in done:
+            task.result()
+        if self.background is not None:
+            await self.background()
+
+    async def _listen(self, receive: Receive) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            if message["type"] == "http.request":
+                await self._chunks.put(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self._chunks.put(None)
+
+    async def _send(self, send: Send) -> None:
+        start = {"type": "http.response.start", "status": self.status_code}
+        await send({**start, "headers": self.raw_headers})
+        async for chunk in self.body_iterator:
+            body = chunk.encode(self.charset) if isinstance(chunk, str) else bytes(chunk)
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a chunked body into non-empty lines."""
+
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+
+def parse_state_line(line: bytes) -> str | None:
+    """Read one NDJSON item: a JSON string, ``{"state": ...}`` or a bare state.
+
+    Returns ``None`` for malformed items.
+    """
+
+    text = line.decode("utf-8", errors="replace").strip()
+    if not text.startswith(('"', "{")):
+        return text
+    try:
+        item = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(item, dict):
+        item = item.get("state")
+    return item if isinstance(item, str) else None
+
+
+async def iter_states(chunks: AsyncIterator[bytes], *, ndjson: bool) -> AsyncIterator[str | None]:
+    """Yield states from an NDJSON body as lines arrive, or from ``{"states": [...]}``."""
+
+    if ndjson:
+        async for line in iter_lines(chunks):
+            yield parse_state_line(line)
+        return
+    body = b"".join([chunk async for chunk in chunks])
+    try:
+        states = json.loads(body).get("states")
+    except (json.JSONDecodeError, AttributeError):
+        states = None
+    if not isinstance(states, list):
+        yield None
+        return
+    for state in states:
+        yield state if isinstance(state, str) else None
+
+
+def ndjson_line(item: BaseModel) -> str:
+    return item.model_dump_json(exclude_none=True) + "\n"
+
+
+def sse_event(event: str, item: BaseModel) -> str:
+    return f"event: {event}\ndata: {item.model_dump_json(exclude_none=True)}\n\n"
@@ -0,0 +1,4 @@
+"""Reproducible benchmarks and load tests for the ``/solve`` pipeline.
+
+Run ``python -m benchmarks --help`` from the ``backend`` directory.
+"""
@@ -0,0 +1,94 @@
+"""Command line entry point: ``python -m benchmarks``."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from .corpus import generate_corpus, read_corpus, write_corpus
+from .load import default_scenarios, run_scenario
+from .micro import run_micro
+from .stats import LatencySummary, compare
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--size", type=int, default=200, help="states in the corpus")
+    parser.add_argument("--corpus", type=Path, help="read or write the corpus at this path")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stand-in base latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="stand-in failure ratio")
+    parser.add_argument(
+        "--only",
+        choices=["micro", "local", "external", "fallback"],
+        action="append",
+        help="run only these benchmarks (repeatable)",
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def _corpus(args: argparse.Namespace) -> list[str]:
+    if args.corpus is not None and args.corpus.exists():
+        return read_corpus(args.corpus)
+    states = generate_corpus(args.size, seed=args.seed)
+    if args.corpus is not None:
+        write_corpus(args.corpus, states)
+    return states
+
+
+async def _run(args: argparse.Namespace, states: list[str]) -> dict[str, LatencySummary]:
+    selected = set(args.only or ["micro", "local", "external", "fallback"])
+    results: dict[str, LatencySummary] = {}
+    if "micro" in selected:
+        results.update(run_micro(states))
+    for scenario in default_scenarios(latency_ms=args.latency_ms, error_rate=args.error_rate):
+        if scenario.name in selected:
+            results.update(await run_scenario(scenario, states, concurrency=args.concurrency))
+    return results
+
+
+def _print_table(results: dict[str, LatencySummary]) -> None:
+    columns = ("count", "req/s", "p50 ms", "p95 ms", "p99 ms")
+    header = f"{'benchmark':<36} " + " ".join(f"{column:>9}" for column in columns)
+    print(header)
+    print("-" * len(header))
+    for name, summary in results.items():
+        print(
+            f"{name:<36} {summary.count:>9} {summary.throughput:>9.1f} "
+            f"{summary.p50:>9.2f} {summary.p95:>9.2f} {summary.p99:>9.2f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    results = asyncio.run(_run(args, _corpus(args)))
+    _print_table(results)
+    report = {name: summary.to_dict() for name, summary in results.items()}
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print("no baseline stored; run with --save-baseline to create one")
+        return 0
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = compare(report, baseline, tolerance=args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
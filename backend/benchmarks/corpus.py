@@ -0,0 +1,43 @@
+"""Seeded random-scramble corpus."""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+from app.services.facelets import MOVE_PERMUTATIONS, SOLVED_STATE, apply_moves
+from app.services.types import NormalizedCubeState
+
+SCRAMBLE_LENGTH = 25
+
+
+def random_scramble(rng: random.Random, length: int = SCRAMBLE_LENGTH) -> list[str]:
+    """Return ``length`` face turns without two consecutive turns of one face."""
+
+    moves = sorted(MOVE_PERMUTATIONS)
+    scramble: list[str] = []
+    while len(scramble) < length:
+        move = rng.choice(moves)
+        if scramble and scramble[-1][0] == move[0]:
+            continue
+        scramble.append(move)
+    return scramble
+
+
+def generate_corpus(size: int, *, seed: int) -> list[NormalizedCubeState]:
+    """Return ``size`` distinct scrambled states; equal seeds give equal corpora."""
+
+    rng = random.Random(seed)  # noqa: S311 - reproducible test data
+    states: dict[NormalizedCubeState, None] = {}
+    while len(states) < size:
+        states[apply_moves(SOLVED_STATE, random_scramble(rng))] = None
+    return list(states)
+
+
+def write_corpus(path: Path, states: list[NormalizedCubeState]) -> None:
+    path.write_text(json.dumps(states, indent=0) + "\n", encoding="utf-8")
+
+
+def read_corpus(path: Path) -> list[NormalizedCubeState]:
+    return list(json.loads(path.read_text(encoding="utf-8")))
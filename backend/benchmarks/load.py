@@ -0,0 +1,140 @@
+"""In-process ASGI load driver for ``app.main:app``.
+
+Each scenario configures the application through ``KRUBIK_*`` environment
+variables, exactly like a deployment, runs the real lifespan (so the solver
+engine is started and warmed) and then replays the corpus against ``/solve``
+with a fixed number of concurrent clients. The external solver is an
+in-process :mod:`benchmarks.stand_in` app, so no network is involved.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from uuid import uuid4
+
+import httpx
+from app.services.facelets import SOLVED_STATE
+from app.services.types import NormalizedCubeState
+
+from .stand_in import StandInConfig, create_stand_in_solver
+from .stats import LatencySummary, summarize
+
+STAND_IN_URL = "http://stand-in/solve"
+
+# Structured logs of every fallback would dominate the measurement.
+os.environ.setdefault("KRUBIK_LOG_LEVEL", "ERROR")
+# The whole corpus comes from one client address.
+os.environ.setdefault("KRUBIK_RATE_LIMIT_ENABLED", "false")
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    """Application settings and stand-in behaviour for one load run."""
+
+    name: str
+    env: dict[str, str] = field(default_factory=dict)
+    stand_in: StandInConfig | None = None
+
+
+def default_scenarios(*, latency_ms: float, error_rate: float) -> tuple[Scenario, ...]:
+    external = {"KRUBIK_EXTERNAL_SOLVER_ENABLED": "true", "KRUBIK_SOLVER_API_URL": STAND_IN_URL}
+    return (
+        Scenario("local", {"KRUBIK_EXTERNAL_SOLVER_ENABLED": "false"}),
+        Scenario(
+            "external",
+            external,
+            StandInConfig(latency_ms=latency_ms, error_rate=error_rate),
+        ),
+        Scenario("fallback", external, StandInConfig(latency_ms=latency_ms, error_rate=1.0)),
+    )
+
+
+def _configure(scenario: Scenario) -> None:
+    from app import dependencies
+
+    for name in ("KRUBIK_EXTERNAL_SOLVER_ENABLED", "KRUBIK_SOLVER_API_URL"):
+        os.environ.pop(name, None)
+    os.environ.update(scenario.env)
+    # The dependency singletons read the environment once; start from scratch.
+    for getter in (
+        dependencies.get_settings,
+        dependencies.get_local_solver,
+        dependencies.get_solver_engine,
+        dependencies.get_solve_coalescer,
+        dependencies.get_external_batcher,
+        dependencies.get_solver_runtime,
+        dependencies.get_cube_validator,
+        dependencies.get_circuit_breakers,
+        dependencies.get_endpoint_pool,
+    ):
+        getter.cache_clear()
+
+
+async def run_scenario(
+    scenario: Scenario,
+    states: Sequence[NormalizedCubeState],
+    *,
+    concurrency: int,
+) -> dict[str, LatencySummary]:
+    """Replay ``states`` against ``/solve`` and summarize latency per answer source.
+
+    Results are keyed ``load/<scenario>/<source>``; non-200 responses are
+    reported under the ``error`` source.
+    """
+
+    _configure(scenario)
+    from app.dependencies import get_solver_engine
+    from app.main import app
+
+    durations: dict[str, list[float]] = defaultdict(list)
+    queue: asyncio.Queue[NormalizedCubeState] = asyncio.Queue()
+    for state in states:
+        queue.put_nowait(state)
+
+    csrf_token = uuid4().hex
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(
+            transport=transport,
+            base_url="http://bench",
+            cookies={"csrf_token": csrf_token},
+            headers={"X-CSRF-Token": csrf_token},
+        ) as client,
+    ):
+        if scenario.stand_in is not None:
+            stand_in = create_stand_in_solver(scenario.stand_in)
+            app.state.http_client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=stand_in)  # type: ignore[arg-type]
+            )
+        engine = get_solver_engine()
+        if engine is not None:
+            # Spawn every worker (and load its tables) before the clock starts.
+            await asyncio.gather(*(engine.solve(SOLVED_STATE) for _ in range(engine.workers)))
+
+        async def worker() -> None:
+            while not queue.empty():
+                state = queue.get_nowait()
+                before = time.perf_counter()
+                response = await client.post("/solve", json={"state": state})
+                elapsed = time.perf_counter() - before
+                ok = response.status_code == HTTPStatus.OK
+                source = response.json()["source"] if ok else "error"
+                durations[source].append(elapsed)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        total = time.perf_counter() - started
+        if scenario.stand_in is not None:
+            await app.state.http_client.aclose()
+
+    return {
+        f"load/{scenario.name}/{source}": summarize(values, total)
+        for source, values in sorted(durations.items())
+    }
@@ -0,0 +1,42 @@
+"""Micro-benchmarks for validation and local solving."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Sequence
+
+from app.services.cube_validator import CubeValidator
+from app.services.facelets import SOLVED_STATE
+from app.services.solver_local import LocalSolver
+from app.services.types import NormalizedCubeState
+
+from .stats import LatencySummary, summarize
+
+
+def measure(call: Callable[[NormalizedCubeState], object], states: Sequence[str]) -> LatencySummary:
+    """Time ``call`` once per state, sequentially."""
+
+    durations: list[float] = []
+    started = time.perf_counter()
+    for state in states:
+        before = time.perf_counter()
+        call(state)
+        durations.append(time.perf_counter() - before)
+    return summarize(durations, time.perf_counter() - started)
+
+
+def run_micro(states: Sequence[NormalizedCubeState]) -> dict[str, LatencySummary]:
+    """Benchmark ``CubeValidator.validate`` and ``LocalSolver.solve`` (cold and warm).
+
+    The Kociemba tables are loaded before timing, so "cold" means an empty
+    solution cache, not a cold process.
+    """
+
+    validator = CubeValidator()
+    solver = LocalSolver(cache_size=len(states) + 1)
+    solver.solve(SOLVED_STATE)
+    return {
+        "micro/validate": measure(validator.validate, states),
+        "micro/local_solve_cold": measure(solver.solve, states),
+        "micro/local_solve_warm": measure(solver.solve, states),
+    }
@@ -0,0 +1,52 @@
+"""Local stand-in for the external solver API with latency and error injection."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Any
+
+from app.services.solver_local import solve_uncached
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+
+@dataclass(frozen=True, slots=True)
+class StandInConfig:
+    """Behaviour of the stand-in solver.
+
+    Every request waits ``latency_ms`` plus up to ``jitter_ms`` and then fails
+    with HTTP 503 with probability ``error_rate``.
+    """
+
+    latency_ms: float = 20.0
+    jitter_ms: float = 5.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+
+def create_stand_in_solver(config: StandInConfig) -> FastAPI:
+    """Return an ASGI app speaking both the single and the batched protocol."""
+
+    rng = random.Random(config.seed)  # noqa: S311 - reproducible fault injection
+    stand_in = FastAPI()
+
+    @stand_in.post("/solve")
+    async def solve(payload: dict[str, Any]) -> JSONResponse:
+        delay = config.latency_ms + rng.uniform(0.0, config.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+        if rng.random() < config.error_rate:
+            return JSONResponse({"error": "injected failure"}, status_code=503)
+        if "states" in payload:
+            results = []
+            for state in payload["states"]:
+                try:
+                    results.append({"moves": list(await asyncio.to_thread(solve_uncached, state))})
+                except ValueError as exc:
+                    results.append({"error": str(exc)})
+            return JSONResponse({"results": results})
+        moves = await asyncio.to_thread(solve_uncached, payload["state"])
+        return JSONResponse({"moves": list(moves)})
+
+    return stand_in
@@ -0,0 +1,80 @@
+"""Latency summaries and comparison against a stored baseline."""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Mapping, Sequence
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class LatencySummary:
+    """Throughput and latency quantiles (milliseconds) of one measured series."""
+
+    count: int
+    throughput: float
+    p50: float
+    p95: float
+    p99: float
+
+    def to_dict(self) -> dict[str, float]:
+        return {key: round(value, 4) for key, value in asdict(self).items()}
+
+
+@dataclass(frozen=True, slots=True)
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.metric} {self.baseline:.2f} -> {self.current:.2f}"
+
+
+def percentile(ordered: Sequence[float], quantile: float) -> float:
+    """Nearest-rank quantile of an already sorted sequence."""
+
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(quantile * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(durations: Sequence[float], elapsed: float) -> LatencySummary:
+    """Summarize per-call ``durations`` (seconds) measured over ``elapsed`` seconds."""
+
+    ordered = sorted(duration * 1000 for duration in durations)
+    return LatencySummary(
+        count=len(ordered),
+        throughput=len(ordered) / elapsed if elapsed > 0 else 0.0,
+        p50=percentile(ordered, 0.50),
+        p95=percentile(ordered, 0.95),
+        p99=percentile(ordered, 0.99),
+    )
+
+
+def compare(
+    current: Mapping[str, Mapping[str, float]],
+    baseline: Mapping[str, Mapping[str, float]],
+    *,
+    tolerance: float,
+) -> list[Regression]:
+    """Return series whose p95 grew or throughput dropped by more than ``tolerance``.
+
+    Series missing from either side are ignored, so adding a benchmark does
+    not fail the comparison until a new baseline is stored.
+    """
+
+    regressions: list[Regression] = []
+    for name, summary in current.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if summary["p95"] > reference["p95"] * (1 + tolerance):
+            regressions.append(Regression(name, "p95", reference["p95"], summary["p95"]))
+        if summary["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append(
+                Regression(name, "throughput", reference["throughput"], summary["throughput"])
+            )
+    return regressions
@@ -1,21 +1,43 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Iterator, MutableMapping
 from http import HTTPStatus
+from ipaddress import ip_network
+from pathlib import Path
 from typing import Any
 from uuid import uuid4
 
 import pytest
-from app.dependencies import SolverFacade, get_cube_validator, get_solver_facade
+from app import dependencies, main
+from app.codecs import CUBE_STATE_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, negotiate
+from app.dependencies import (
+    Settings,
+    SolveOptions,
+    SolveReport,
+    SolverFacade,
+    get_cube_validator,
+    get_limiter,
+    get_settings,
+    get_solver_facade,
+)
 from app.main import app
+from app.services.admission import OverloadedError
+from app.services.cube_state import CubeState
 from app.services.cube_validator import CubeValidationError, CubeValidator
+from app.services.deadline import DeadlineExceededError
+from app.services.facelets import SOLVED_STATE, apply_moves
+from app.services.solution_cache import SqliteSolutionCache
+from app.services.solver_local import DEFAULT_MAX_DEPTH, MIN_MAX_DEPTH, LocalSolver
+from app.streaming import NDJSON_MEDIA_TYPE, DuplexStreamingResponse, iter_lines
+from fastapi import WebSocketDisconnect, status
+from fastapi.requests import HTTPConnection
 from fastapi.testclient import TestClient
 
 
 class DummyValidator(CubeValidator):
-    def __init__(self) -> None:
-        super().__init__(local_solver=None)
-
     def validate(self, state: str) -> str:  # type: ignore[override]
         if state == 'bad':
             raise CubeValidationError('invalid_length', {'expected': 54, 'received': 3})
@@ -24,21 +46,34 @@ class DummyValidator(CubeValidator):
 
 class DummySolverFacade(SolverFacade):
     def __init__(self, moves: list[str], source: str) -> None:
+        super().__init__(
+            external_client=None,
+            local_solver=LocalSolver(cache_size=32, canonical_keys=False),
+        )
         self._moves = moves
         self._source = source
+        self.solved: list[str] = []
+        self.options: list[SolveOptions] = []
 
-    async def solve(self, state: str) -> tuple[list[str], str]:  # type: ignore[override]
-        return self._moves, self._source
+    async def solve_report(  # type: ignore[override]
+        self, state: str, options: SolveOptions | None = None
+    ) -> SolveReport:
+        options = options or SolveOptions()
+        self.solved.append(state)
+        self.options.append(options)
+        return SolveReport(self._moves, self._source, options.max_depth, False, 0.0)
 
 
 @pytest.fixture(autouse=True)
 def override_dependencies() -> Iterator[None]:
     get_cube_validator.cache_clear()
+    get_limiter().reset()
     app.dependency_overrides[get_cube_validator] = DummyValidator
     app.dependency_overrides[get_solver_facade] = lambda: DummySolverFacade(['R', 'U'], 'external')
     yield
     app.dependency_overrides.clear()
 
+
 @pytest.fixture
 def client() -> Iterator[TestClient]:
     with TestClient(app) as client:
@@ -54,6 +89,176 @@ def test_solve_success(client: TestClient) -> None:
     body: dict[str, Any] = response.json()
     assert body['moves'] == ['R', 'U']
     assert body['source'] == 'external'
+    assert body['length'] == len(body['moves'])
+    assert body['max_depth'] == DEFAULT_MAX_DEPTH
+    assert body['degraded'] is False
+
+
+def test_solve_passes_depth_and_time_budget(client: TestClient) -> None:
+    facade = DummySolverFacade(['F'], 'local')
+    app.dependency_overrides[get_solver_facade] = lambda: facade
+    payload = {'state': 'uuu', 'max_depth': MIN_MAX_DEPTH, 'time_budget_ms': 250}
+    response = client.post('/solve', json=payload)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['max_depth'] == MIN_MAX_DEPTH
+    assert facade.options == [SolveOptions(max_depth=MIN_MAX_DEPTH, time_budget=0.25)]
+
+
+def test_solve_threads_request_timeout_into_a_deadline(client: TestClient) -> None:
+    facade = DummySolverFacade(['F'], 'local')
+    app.dependency_overrides[get_solver_facade] = lambda: facade
+    started = time.monotonic()
+    response = client.post('/solve', json={'state': 'uuu'}, headers={'X-Request-Timeout-Ms': '500'})
+    assert response.status_code == HTTPStatus.OK
+    deadline = facade.options[0].deadline
+    assert deadline is not None
+    assert started < deadline.expires_at <= time.monotonic() + 0.5
+
+
+def test_solve_reports_exceeded_deadline(client: TestClient) -> None:
+    class SlowFacade(DummySolverFacade):
+        async def solve_report(  # type: ignore[override]
+            self, state: str, options: SolveOptions | None = None
+        ) -> SolveReport:
+            raise DeadlineExceededError('Solve deadline exceeded')
+
+    app.dependency_overrides[get_solver_facade] = lambda: SlowFacade(['F'], 'local')
+    response = client.post('/solve', json={'state': 'uuu'}, headers={'X-Request-Timeout-Ms': '1'})
+    assert response.status_code == HTTPStatus.GATEWAY_TIMEOUT
+    assert response.json()['detail']['code'] == 'deadline_exceeded'
+    response = client.get(f'/solve/{SOLVED_STATE}')
+    assert response.status_code == HTTPStatus.GATEWAY_TIMEOUT
+
+
+def test_batch_stream_and_session_report_exceeded_deadlines(client: TestClient) -> None:
+    class SlowFacade(DummySolverFacade):
+        async def solve_report(  # type: ignore[override]
+            self, state: str, options: SolveOptions | None = None
+        ) -> SolveReport:
+            assert options is not None
+            assert options.deadline is not None
+            raise DeadlineExceededError('Solve deadline exceeded')
+
+    app.dependency_overrides[get_solver_facade] = lambda: SlowFacade(['F'], 'local')
+    timeout = {'X-Request-Timeout-Ms': '1'}
+    response = client.post('/solve/batch', json={'states': ['uuu']}, headers=timeout)
+    assert response.json()['results'][0]['error']['code'] == 'deadline_exceeded'
+    response = client.post('/solve/stream', json={'states': ['uuu']}, headers=timeout)
+    assert json.loads(response.text.splitlines()[0])['error']['code'] == 'deadline_exceeded'
+
+    csrf_token = client.cookies['csrf_token']
+    session_url = f'/solve/session?csrf_token={csrf_token}'
+    with client.websocket_connect(session_url, headers=timeout) as websocket:
+        websocket.send_json({'type': 'set', 'index': 10, 'color': 'R'})
+        assert websocket.receive_json()['valid'] is True
+        websocket.send_json({'type': 'solve'})
+        assert websocket.receive_json()['code'] == 'deadline_exceeded'
+
+
+def test_solve_sheds_with_retry_after(client: TestClient) -> None:
+    class SaturatedFacade(DummySolverFacade):
+        async def solve_report(  # type: ignore[override]
+            self, state: str, options: SolveOptions | None = None
+        ) -> SolveReport:
+            raise OverloadedError(2.5)
+
+    app.dependency_overrides[get_solver_facade] = lambda: SaturatedFacade(['F'], 'local')
+    response = client.post('/solve', json={'state': 'uuu'})
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['retry-after'] == '3'
+    assert response.json()['detail']['code'] == 'overloaded'
+
+
+def test_solve_rejects_unbounded_depth(client: TestClient) -> None:
+    response = client.post('/solve', json={'state': 'uuu', 'max_depth': MIN_MAX_DEPTH - 1})
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_solve_speaks_msgpack_both_ways(client: TestClient) -> None:
+    msgpack = pytest.importorskip('msgpack')
+    response = client.post(
+        '/solve',
+        content=msgpack.packb({'state': 'uuu'}),
+        headers={'Content-Type': MSGPACK_MEDIA_TYPE, 'Accept': MSGPACK_MEDIA_TYPE},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == MSGPACK_MEDIA_TYPE
+    assert response.headers['vary'] == 'Accept'
+    assert msgpack.unpackb(response.content)['moves'] == ['R', 'U']
+
+
+def test_solve_accepts_packed_cube_state(client: TestClient) -> None:
+    facade = DummySolverFacade(['F'], 'local')
+    app.dependency_overrides[get_solver_facade] = lambda: facade
+    state = apply_moves(SOLVED_STATE, ["F'"])
+    response = client.post(
+        '/solve',
+        content=CubeState.from_facelets(state).to_bytes(),
+        headers={'Content-Type': CUBE_STATE_MEDIA_TYPE},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == JSON_MEDIA_TYPE
+    assert facade.solved == [state]
+
+
+def test_solve_rejects_undecodable_and_unsupported_bodies(client: TestClient) -> None:
+    response = client.post(
+        '/solve', content=b'\x01', headers={'Content-Type': CUBE_STATE_MEDIA_TYPE}
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json()['detail']['code'] == 'invalid_body'
+    response = client.post('/solve', content=b'uuu', headers={'Content-Type': 'text/plain'})
+    assert response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+    assert response.json()['detail']['code'] == 'unsupported_media_type'
+
+
+def test_solve_get_is_cacheable_and_revalidates() -> None:
+    facade = DummySolverFacade(['F'], 'local')
+    app.dependency_overrides[get_solver_facade] = lambda: facade
+    state = apply_moves(SOLVED_STATE, ["F'"])
+    with TestClient(app) as client:
+        response = client.get(f'/solve/{state}')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['moves'] == ['F']
+        assert 'immutable' in response.headers['cache-control']
+        assert 'x-ratelimit-remaining' not in response.headers
+        etag = response.headers['etag']
+        assert etag.startswith('W/"')
+
+        revalidated = client.get(f'/solve/{state.lower()}', headers={'If-None-Match': etag})
+        assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+        assert revalidated.headers['etag'] == etag
+        tighter = client.get(f'/solve/{state}?max_depth={MIN_MAX_DEPTH}')
+        assert tighter.headers['etag'] != etag
+    assert facade.solved == [state, state]
+
+
+def test_solve_get_does_not_cache_degraded_answers(client: TestClient) -> None:
+    class DegradedFacade(DummySolverFacade):
+        async def solve_report(  # type: ignore[override]
+            self, state: str, options: SolveOptions | None = None
+        ) -> SolveReport:
+            return SolveReport(['F'], 'local', DEFAULT_MAX_DEPTH, True, 0.0)
+
+    app.dependency_overrides[get_solver_facade] = lambda: DegradedFacade(['F'], 'local')
+    response = client.get(f'/solve/{SOLVED_STATE}?max_depth={MIN_MAX_DEPTH}')
+    assert response.headers['cache-control'] == 'no-store'
+    assert 'etag' not in response.headers
+
+
+def test_solve_get_rejects_invalid_states(client: TestClient) -> None:
+    response = client.get('/solve/' + 'U' * 54)
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json()['detail']['code'] == 'invalid_distribution'
+
+
+def test_negotiate_honours_quality_and_defaults_to_json() -> None:
+    offered = (JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE)
+    assert negotiate(None, offered) == JSON_MEDIA_TYPE
+    assert negotiate('text/html', offered) == JSON_MEDIA_TYPE
+    assert negotiate('*/*', offered) == JSON_MEDIA_TYPE
+    assert negotiate('application/json;q=0.5, application/msgpack', offered) == MSGPACK_MEDIA_TYPE
+    assert negotiate('application/msgpack;q=0.2, */*;q=0.9', offered) == JSON_MEDIA_TYPE
 
 
 def test_solve_validation_error_translated(client: TestClient) -> None:
@@ -70,3 +275,298 @@ def test_csrf_protection() -> None:
     assert response.status_code == HTTPStatus.FORBIDDEN
     detail = response.json()['detail']
     assert detail['code'] == 'invalid_csrf'
+
+
+def test_solve_batch_dedupes_and_reports_per_item_errors(client: TestClient) -> None:
+    facade = DummySolverFacade(['F'], 'local')
+    app.dependency_overrides[get_solver_facade] = lambda: facade
+    response = client.post('/solve/batch', json={'states': ['uuu', 'bad', 'UUU']})
+    assert response.status_code == HTTPStatus.OK
+    results = response.json()['results']
+    assert [item['index'] for item in results] == [0, 1, 2]
+    assert results[0]['moves'] == results[2]['moves'] == ['F']
+    assert results[1]['error']['code'] == 'invalid_length'
+    assert 'стикеров' in results[1]['error']['message']
+    assert facade.solved == ['UUU']
+
+
+def test_solve_batch_rejects_oversized_batch(client: TestClient) -> None:
+    app.dependency_overrides[get_settings] = lambda: Settings(solver_batch_max_size=1)
+    response = client.post('/solve/batch', json={'states': ['uuu', 'ddd']})
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json()['detail']['code'] == 'batch_too_large'
+
+
+def test_solve_batch_is_rate_limited_by_size(client: TestClient) -> None:
+    app.dependency_overrides[get_settings] = lambda: Settings(rate_limit_batch='3/minute')
+    assert client.post('/solve/batch', json={'states': ['uuu', 'ddd']}).status_code == HTTPStatus.OK
+    response = client.post('/solve/batch', json={'states': ['uuu', 'ddd']})
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.json()['detail']['code'] == 'rate_limited'
+    assert int(response.headers['Retry-After']) > 0
+
+
+def test_solve_batch_larger_than_its_bucket_drains_it(client: TestClient) -> None:
+    app.dependency_overrides[get_settings] = lambda: Settings(
+        rate_limit='1/minute', rate_limit_batch='2/minute'
+    )
+    response = client.post('/solve/batch', json={'states': ['uuu', 'ddd', 'fff']})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['X-RateLimit-Remaining'] == '0'
+    response = client.post('/solve/batch', json={'states': ['uuu']})
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_client_key_reads_forwarded_headers_only_from_trusted_proxies(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def connection(peer: str, **headers: str) -> HTTPConnection:
+        raw = [(name.replace('_', '-').encode(), value.encode()) for name, value in headers.items()]
+        return HTTPConnection({'type': 'http', 'client': (peer, 4321), 'headers': raw})
+
+    monkeypatch.setattr(main.settings, 'trusted_proxies', [ip_network('10.0.0.0/8')])
+    assert main.client_key(connection('10.0.0.2', x_forwarded_for='1.2.3.4, 10.0.0.9')) == '1.2.3.4'
+    assert main.client_key(connection('10.0.0.2', x_forwarded_for='6.6.6.6, 1.2.3.4')) == '1.2.3.4'
+    assert main.client_key(connection('10.0.0.2', x_real_ip='5.6.7.8')) == '5.6.7.8'
+    assert main.client_key(connection('8.8.8.8', x_forwarded_for='1.2.3.4')) == '8.8.8.8'
+
+
+def test_solve_reports_rate_limit_headers_once_per_request(client: TestClient) -> None:
+    app.dependency_overrides[get_settings] = lambda: Settings(rate_limit='2/minute')
+    first = client.post('/solve', json={'state': 'uuu'})
+    assert first.headers['X-RateLimit-Limit'] == '2'
+    assert first.headers['X-RateLimit-Remaining'] == '1'
+    assert client.post('/solve', json={'state': 'uuu'}).status_code == HTTPStatus.OK
+    response = client.post('/solve', json={'state': 'uuu'})
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.json()['detail']['code'] == 'rate_limited'
+
+
+def test_metrics_exposes_prometheus_text(client: TestClient) -> None:
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    assert '# TYPE krubik_solve_seconds histogram' in response.text
+    assert '# TYPE krubik_circuit_breaker_transitions_total counter' in response.text
+    assert 'krubik_solution_cache_entries ' in response.text
+
+
+def test_metrics_skip_counting_blocking_caches(
+    client: TestClient, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = SqliteSolutionCache(tmp_path / 'solutions.sqlite3', max_entries=10)
+    monkeypatch.setattr(dependencies, 'get_local_solver', lambda: LocalSolver(cache=cache))
+    response = client.get('/metrics')
+    lines = response.text.splitlines()
+    assert '# TYPE krubik_solution_cache_entries gauge' in lines
+    assert not any(line.startswith('krubik_solution_cache_entries ') for line in lines)
+    cache.close()
+
+
+def test_readiness_waits_for_warm_up() -> None:
+    app.state.ready = False
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 30
+        response = client.get('/ready')
+        while response.status_code != HTTPStatus.OK and time.monotonic() < deadline:
+            assert response.json() == {'status': 'warming_up'}
+            time.sleep(0.05)
+            response = client.get('/ready')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'status': 'ready'}
+
+
+@pytest.mark.asyncio
+async def test_readiness_reports_failed_warm_up_after_retries(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    attempts: list[int] = []
+
+    async def broken_warm_up(engine: object, *, samples: int) -> float:
+        attempts.append(samples)
+        raise RuntimeError('tables missing')
+
+    monkeypatch.setattr(main, 'warm_up', broken_warm_up)
+    monkeypatch.setattr(app.state, 'ready', False, raising=False)
+    monkeypatch.setattr(app.state, 'warm_up_failed', False, raising=False)
+    await main.run_warm_up(app, None, retry_delay=0)
+    assert len(attempts) == main.WARM_UP_ATTEMPTS
+    # Without the context manager the lifespan, and with it a new warm-up, does not run.
+    response = TestClient(app).get('/ready')
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json() == {'status': 'failed'}
+
+
+def test_solve_stream_reads_ndjson_and_reports_each_item(client: TestClient) -> None:
+    body = '"uuu"\nbad\n{"state": "ddd"}\n{"oops": 1}\n'
+    response = client.post(
+        '/solve/stream', content=body, headers={'Content-Type': 'application/x-ndjson'}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    items = {item['index']: item for item in map(json.loads, response.text.splitlines())}
+    assert sorted(items) == [0, 1, 2, 3]
+    assert items[0]['moves'] == items[2]['moves'] == ['R', 'U']
+    assert items[1]['error']['code'] == 'invalid_length'
+    assert 'стикеров' in items[1]['error']['message']
+    assert items[3]['error']['code'] == 'invalid_payload'
+
+
+def test_solve_stream_emits_server_sent_events(client: TestClient) -> None:
+    response = client.post(
+        '/solve/stream', json={'states': ['uuu']}, headers={'Accept': 'text/event-stream'}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/event-stream')
+    events = response.text.strip().split('\n\n')
+    assert events[0].startswith('event: result\ndata: ')
+    assert json.loads(events[0].split('data: ', 1)[1])['index'] == 0
+    assert events[-1] == 'event: end\ndata: {}'
+
+
+def test_solve_stream_stops_when_rate_limited(client: TestClient) -> None:
+    app.dependency_overrides[get_settings] = lambda: Settings(rate_limit='1/minute')
+    response = client.post('/solve/stream', json={'states': ['uuu', 'ddd', 'fff']})
+    items = sorted(map(json.loads, response.text.splitlines()), key=lambda item: item['index'])
+    assert [item.get('error', {}).get('code') for item in items] == [None, 'rate_limited']
+
+
+def test_solve_batch_reports_failed_items_and_keeps_going(client: TestClient) -> None:
+    class FlakyFacade(DummySolverFacade):
+        async def solve_report(  # type: ignore[override]
+            self, state: str, options: SolveOptions | None = None
+        ) -> SolveReport:
+            if state == 'DDD':
+                raise RuntimeError('worker died')
+            return await super().solve_report(state, options)
+
+    app.dependency_overrides[get_solver_facade] = lambda: FlakyFacade(['R'], 'local')
+    response = client.post('/solve/batch', json={'states': ['uuu', 'ddd']})
+    assert response.status_code == HTTPStatus.OK
+    results = response.json()['results']
+    assert results[0]['moves'] == ['R']
+    assert results[1]['error']['code'] == 'solver_failed'
+
+
+def test_solve_stream_reports_failed_items_and_keeps_going(client: TestClient) -> None:
+    class FlakyFacade(DummySolverFacade):
+        async def solve_report(  # type: ignore[override]
+            self, state: str, options: SolveOptions | None = None
+        ) -> SolveReport:
+            if state == 'DDD':
+                raise RuntimeError('worker died')
+            return await super().solve_report(state, options)
+
+    app.dependency_overrides[get_solver_facade] = lambda: FlakyFacade(['R'], 'local')
+    response = client.post(
+        '/solve/stream', json={'states': ['uuu', 'ddd']}, headers={'Accept': 'text/event-stream'}
+    )
+    events = response.text.strip().split('\n\n')
+    items = [json.loads(event.split('data: ', 1)[1]) for event in events[:-1]]
+    errors = {item['index']: item.get('error', {}).get('code') for item in items}
+    assert errors == {0: None, 1: 'solver_failed'}
+    assert events[-1] == 'event: end\ndata: {}'
+
+
+@pytest.mark.asyncio
+async def test_duplex_response_reads_the_body_itself() -> None:
+    # ASGI 2.4 servers make Starlette's StreamingResponse skip reading ``receive``.
+    messages: list[dict[str, Any]] = [
+        {'type': 'http.request', 'body': b'a\nb', 'more_body': True},
+        {'type': 'http.request', 'body': b'\nc\n', 'more_body': False},
+    ]
+    disconnected = asyncio.Event()
+
+    async def receive() -> dict[str, Any]:
+        if messages:
+            return messages.pop(0)
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    sent: list[MutableMapping[str, Any]] = []
+
+    async def send(message: MutableMapping[str, Any]) -> None:
+        sent.append(message)
+
+    async def produce(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        async for line in iter_lines(chunks):
+            yield line.decode().upper() + '\n'
+
+    response = DuplexStreamingResponse(produce, media_type=NDJSON_MEDIA_TYPE)
+    scope = {'type': 'http', 'asgi': {'version': '3.0', 'spec_version': '2.4'}}
+    await asyncio.wait_for(response(scope, receive, send), timeout=5)
+    assert sent[0]['type'] == 'http.response.start'
+    assert b''.join(message.get('body', b'') for message in sent[1:]) == b'A\nB\nC\n'
+    assert sent[-1] == {'type': 'http.response.body', 'body': b'', 'more_body': False}
+
+
+def test_solve_stream_requires_csrf() -> None:
+    with TestClient(app) as client:
+        response = client.post('/solve/stream', json={'states': ['uuu']})
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_solve_session_validates_edits_and_solves_speculatively(client: TestClient) -> None:
+    facade = DummySolverFacade(['F'], 'local')
+    app.dependency_overrides[get_solver_facade] = lambda: facade
+    csrf_token = client.cookies['csrf_token']
+    with client.websocket_connect(f'/solve/session?csrf_token={csrf_token}') as websocket:
+        websocket.send_json({'type': 'set', 'index': 10, 'color': 'D'})
+        validation = websocket.receive_json()
+        assert validation['valid'] is False
+        assert validation['issues'][-1]['facelets'] == [5, 10]
+        assert 'неразрешимо' in validation['issues'][-1]['message']
+
+        websocket.send_json({'type': 'set', 'index': 10, 'color': 'R'})
+        assert websocket.receive_json() == {'type': 'validation', 'valid': True, 'issues': []}
+        websocket.send_json({'type': 'solve'})
+        solution = websocket.receive_json()
+        assert solution == {
+            'type': 'solution',
+            'moves': ['F'],
+            'source': 'local',
+            'precomputed': True,
+        }
+
+        websocket.send_json({'type': 'rotate'})
+        assert websocket.receive_json()['code'] == 'invalid_message'
+    assert len(facade.solved) == 1
+
+
+def test_solve_session_reports_solver_failures_and_retries(client: TestClient) -> None:
+    class BrokenOnceFacade(DummySolverFacade):
+        async def solve_report(  # type: ignore[override]
+            self, state: str, options: SolveOptions | None = None
+        ) -> SolveReport:
+            if not self.solved:
+                self.solved.append(state)
+                raise RuntimeError('worker died')
+            return await super().solve_report(state, options)
+
+    facade = BrokenOnceFacade(['F'], 'local')
+    app.dependency_overrides[get_solver_facade] = lambda: facade
+    csrf_token = client.cookies['csrf_token']
+    with client.websocket_connect(f'/solve/session?csrf_token={csrf_token}') as websocket:
+        websocket.send_json({'type': 'set', 'index': 10, 'color': 'R'})
+        assert websocket.receive_json()['valid'] is True
+        websocket.send_json({'type': 'solve'})
+        assert websocket.receive_json()['code'] == 'solver_failed'
+        websocket.send_json({'type': 'solve'})
+        assert websocket.receive_json()['moves'] == ['F']
+    assert facade.solved[0] == facade.solved[1]
+
+
+def test_solve_session_rejects_binary_frames(client: TestClient) -> None:
+    app.dependency_overrides[get_solver_facade] = lambda: DummySolverFacade(['F'], 'local')
+    csrf_token = client.cookies['csrf_token']
+    with client.websocket_connect(f'/solve/session?csrf_token={csrf_token}') as websocket:
+        websocket.send_bytes(b'\x00')
+        assert websocket.receive_json()['code'] == 'invalid_message'
+        websocket.send_json({'type': 'set', 'index': 10, 'color': 'R'})
+        assert websocket.receive_json()['valid'] is True
+
+
+def test_solve_session_requires_csrf_token(client: TestClient) -> None:
+    with pytest.raises(WebSocketDisconnect) as exc, client.websocket_connect('/solve/session'):
+        pass
+    assert exc.value.code == status.WS_1008_POLICY_VIOLATION
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from app.services.cube_validator import CubeValidator
+from benchmarks.corpus import generate_corpus
+from benchmarks.stats import compare, summarize
+
+
+def test_corpus_is_reproducible_and_valid() -> None:
+    corpus = generate_corpus(5, seed=7)
+    assert corpus == generate_corpus(5, seed=7)
+    assert corpus != generate_corpus(5, seed=8)
+    assert len(set(corpus)) == len(corpus)
+    for state in corpus:
+        CubeValidator().validate(state)
+
+
+def test_compare_flags_latency_and_throughput_regressions() -> None:
+    summary = summarize([0.001 * n for n in range(1, 101)], elapsed=1.0)
+    assert (summary.count, summary.p50, summary.p95, summary.p99) == (100, 50.0, 95.0, 99.0)
+    baseline = {
+        'fast': {'p95': 50.0, 'throughput': 100.0},
+        'busy': {'p95': 95.0, 'throughput': 400.0},
+        'same': {'p95': 95.0, 'throughput': 100.0},
+    }
+    current = {name: summary.to_dict() for name in ('fast', 'busy', 'same', 'new')}
+    regressions = compare(current, baseline, tolerance=0.25)
+    assert [(item.name, item.metric) for item in regressions] == [
+        ('fast', 'p95'),
+        ('busy', 'throughput'),
+    ]
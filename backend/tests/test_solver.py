@@ -1,9 +1,67 @@
 from __future__ import annotations
 
+import asyncio
+import gc
+import math
+import pickle
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from contextlib import closing
+from pathlib import Path
+from typing import cast
+
+import httpx
 import pytest
-from app.dependencies import SolverFacade
+from app.dependencies import SolveOptions, SolverFacade, SolverRuntime
+from app.services import rate_limiter
+from app.services.admission import AdmissionController, OverloadedError
+from app.services.bulk_validator import ERROR_KEYS, validation_codes
+from app.services.cube_session import CubeSession
+from app.services.cube_state import CubeState
 from app.services.cube_validator import CubeValidationError, CubeValidator
-from app.services.solver_local import LocalSolver
+from app.services.cubie import InvalidCubieError
+from app.services.deadline import Deadline, DeadlineExceededError
+from app.services.facelets import apply_moves
+from app.services.latency import MIN_SAMPLES, LatencyTracker, SolverLatency
+from app.services.metrics import MetricsRegistry
+from app.services.micro_batch import MicroBatcher
+from app.services.moves import simplify_moves, solves
+from app.services.near_solved import NearSolvedTable, pack_state, write_table
+from app.services.rate_limiter import (
+    MemoryBucketStore,
+    RateLimitDecision,
+    RateLimiter,
+    RateLimitRule,
+    SqliteBucketStore,
+    parse_rate,
+    settle,
+)
+from app.services.single_flight import SingleFlight
+from app.services.solution_cache import MemorySolutionCache, SqliteSolutionCache
+from app.services.solver_client import (
+    BreakerPolicy,
+    BreakerSnapshot,
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+    CircuitBreakerRegistry,
+    EndpointPool,
+    ExternalSolverClient,
+    ExternalSolverError,
+)
+from app.services.solver_engine import SOLVED_STATE, SolverEngine
+from app.services.solver_local import (
+    DEFAULT_MAX_DEPTH,
+    MIN_MAX_DEPTH,
+    LocalSolver,
+    solve_uncached,
+)
+from app.services.symmetry import SYMMETRIES, canonicalize
+from app.services.warmup import sample_states, warm_up
+from fastapi import FastAPI
+
+SCRAMBLED_STATE = 'DRLUUBFBRBLURRLRUBLRDDFDLFUFUFFDBRDUBRUFLLFDDBFLUBLRBD'
 
 
 class StubSolver(LocalSolver):
@@ -11,33 +69,1140 @@ class StubSolver(LocalSolver):
         super().__init__(cache_size=32)
         self._should_fail = should_fail
 
-    def solve(self, state: str) -> tuple[str, ...]:  # type: ignore[override]
+    def solve(  # type: ignore[override]
+        self, state: str, max_depth: int = DEFAULT_MAX_DEPTH
+    ) -> tuple[str, ...]:
         if self._should_fail:
             raise ValueError('parity error')
         return tuple(state)
 
 
+def _with_facelets(state: str, replacements: dict[int, str]) -> str:
+    facelets = list(state)
+    for index, color in replacements.items():
+        facelets[index] = color
+    return ''.join(facelets)
+
+
 def test_validator_length_error() -> None:
-    validator = CubeValidator(local_solver=StubSolver())
+    validator = CubeValidator()
     with pytest.raises(CubeValidationError) as exc:
         validator.validate('U' * 10)
     assert exc.value.message_key == 'invalid_length'
 
 
 def test_validator_unsolvable() -> None:
-    validator = CubeValidator(local_solver=StubSolver(should_fail=True))
+    validator = CubeValidator()
     with pytest.raises(CubeValidationError) as exc:
         validator.validate('UDLRFB' * 9)
     assert exc.value.message_key == 'unsolvable'
+    assert exc.value.context == {'invariant': 'centers'}
+
+
+def test_validator_accepts_scrambled_state() -> None:
+    assert CubeValidator().validate(SCRAMBLED_STATE.lower()) == SCRAMBLED_STATE
+
+
+@pytest.mark.parametrize(
+    ('replacements', 'invariant'),
+    [
+        ({8: 'F', 9: 'U', 20: 'R'}, 'corner_twist'),
+        ({7: 'F', 19: 'U'}, 'edge_flip'),
+        ({10: 'F', 19: 'R'}, 'permutation_parity'),
+        ({8: 'R', 9: 'U', 20: 'F'}, 'corner_cubies'),
+        ({10: 'D', 28: 'R'}, 'edge_cubies'),
+    ],
+)
+def test_validator_reports_broken_invariant(replacements: dict[int, str], invariant: str) -> None:
+    state = _with_facelets(SOLVED_STATE, replacements)
+    with pytest.raises(CubeValidationError) as exc:
+        CubeValidator().validate(state)
+    assert exc.value.message_key == 'unsolvable'
+    assert exc.value.context == {'invariant': invariant}
+
+
+def test_validate_many_matches_scalar_validator() -> None:
+    states = [
+        SCRAMBLED_STATE,
+        SCRAMBLED_STATE.lower(),
+        'UUU',
+        SOLVED_STATE[:-1] + 'X',
+        SOLVED_STATE[:-1] + 'Ж',
+        SOLVED_STATE[:-1] + 'U',
+        _with_facelets(SOLVED_STATE, {4: 'R', 13: 'U'}),
+        _with_facelets(SOLVED_STATE, {8: 'F', 9: 'U', 20: 'R'}),
+        _with_facelets(SOLVED_STATE, {7: 'F', 19: 'U'}),
+        _with_facelets(SOLVED_STATE, {10: 'F', 19: 'R'}),
+        _with_facelets(SOLVED_STATE, {8: 'R', 9: 'U', 20: 'F'}),
+        _with_facelets(SOLVED_STATE, {10: 'D', 28: 'R'}),
+    ]
+    validator = CubeValidator()
+    result = validator.validate_many(states)
+    expected = [validator.error_for(state) for state in states]
+    assert [result.error_key(index) for index in range(len(states))] == [
+        None if error is None else error.message_key for error in expected
+    ]
+    assert result.states[1] == SCRAMBLED_STATE
+    assert result.is_valid(1)
+
+
+def test_bulk_validation_codes_are_vectorized() -> None:
+    pytest.importorskip('numpy')
+    codes = validation_codes([SCRAMBLED_STATE, 'UUU', SOLVED_STATE[:-1] + 'X'])
+    assert codes.dtype.name == 'uint8'
+    assert [ERROR_KEYS[code] for code in codes] == [None, 'invalid_length', 'invalid_colors']
+
+
+def test_cube_session_tracks_edits_incrementally() -> None:
+    session = CubeSession()
+    validator = CubeValidator()
+    target = apply_moves(SOLVED_STATE, ['R', "U'"])
+    assert session.issues() == []
+    for index, color in enumerate(target):
+        if session.set_facelet(index, color.lower()):
+            expected = validator.error_for(session.state)
+            assert (expected is None) == (not session.issues())
+    assert session.state == target
+    assert session.issues() == []
+    assert not session.set_facelet(0, target[0])
+
+    session.load(SOLVED_STATE)
+    session.set_facelet(10, 'D')
+    issues = [
+        (issue.message_key, (issue.context or {}).get('facelets')) for issue in session.issues()
+    ]
+    assert issues == [
+        ('invalid_distribution', None),
+        ('invalid_distribution', None),
+        ('unsolvable', [5, 10]),
+    ]
+    session.set_facelet(10, 'R')
+    assert session.issues() == []
+
+
+def test_cube_session_rejects_bad_edits() -> None:
+    session = CubeSession()
+    with pytest.raises(CubeValidationError) as exc:
+        session.set_facelet(54, 'U')
+    assert exc.value.message_key == 'invalid_facelet'
+    with pytest.raises(CubeValidationError) as exc:
+        session.set_facelet(0, 'X')
+    assert exc.value.message_key == 'invalid_colors'
+    with pytest.raises(CubeValidationError) as exc:
+        session.load('UUU')
+    assert exc.value.message_key == 'invalid_length'
+    assert session.state == SOLVED_STATE
 
 
 @pytest.mark.asyncio
 async def test_solver_facade_fallback() -> None:
     class FailingExternal:
-        async def solve(self, state: str) -> tuple[str, ...]:
+        async def solve(self, state: str, deadline: Deadline | None = None) -> tuple[str, ...]:
             raise RuntimeError('boom')
 
     facade = SolverFacade(external_client=FailingExternal(), local_solver=StubSolver())
     moves, source = await facade.solve('UU')
     assert source == 'local'
     assert moves == ['U', 'U']
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_uses_engine_for_local_solves() -> None:
+    class RecordingEngine(SolverEngine):
+        def __init__(self) -> None:
+            super().__init__(workers=1)
+            self.states: list[str] = []
+
+        async def solve(  # type: ignore[override]
+            self, state: str, max_depth: int = DEFAULT_MAX_DEPTH
+        ) -> tuple[str, ...]:
+            self.states.append(state)
+            return ('R',)
+
+    engine = RecordingEngine()
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=StubSolver(),
+        runtime=SolverRuntime(engine=engine),
+    )
+    moves, source = await facade.solve(SCRAMBLED_STATE)
+    assert (moves, source) == (['R'], 'local')
+    assert engine.states == [SCRAMBLED_STATE]
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_engine_path_reads_and_fills_cache() -> None:
+    class CountingEngine(SolverEngine):
+        def __init__(self) -> None:
+            super().__init__(workers=1)
+            self.calls = 0
+
+        async def solve(  # type: ignore[override]
+            self, state: str, max_depth: int = DEFAULT_MAX_DEPTH
+        ) -> tuple[str, ...]:
+            self.calls += 1
+            return ('F',)
+
+    engine = CountingEngine()
+    local_solver = LocalSolver(cache_size=32)
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=local_solver,
+        runtime=SolverRuntime(engine=engine),
+    )
+    assert await facade.solve(SCRAMBLED_STATE) == (['F'], 'local')
+    assert await facade.solve(SCRAMBLED_STATE) == (['F'], 'local')
+    assert engine.calls == 1
+    assert local_solver.lookup(SCRAMBLED_STATE) == ('F',)
+
+
+class TieredEngine(SolverEngine):
+    def __init__(self, tight_delay: float = 0.0) -> None:
+        super().__init__(workers=1)
+        self.tight_delay = tight_delay
+        self.depths: list[int] = []
+
+    async def solve(  # type: ignore[override]
+        self, state: str, max_depth: int = DEFAULT_MAX_DEPTH
+    ) -> tuple[str, ...]:
+        self.depths.append(max_depth)
+        if max_depth < DEFAULT_MAX_DEPTH:
+            await asyncio.sleep(self.tight_delay)
+            return ('F',)
+        return ('F', 'R')
+
+
+def test_local_solver_caches_each_depth_tier_separately() -> None:
+    solver = LocalSolver(cache_size=32, canonical_keys=False)
+    solver.store(SCRAMBLED_STATE, ('R',), MIN_MAX_DEPTH)
+    assert solver.lookup(SCRAMBLED_STATE) is None
+    assert solver.lookup(SCRAMBLED_STATE, MIN_MAX_DEPTH) == ('R',)
+    assert len(solver.solve(SCRAMBLED_STATE, MIN_MAX_DEPTH + 1)) <= MIN_MAX_DEPTH + 1
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_searches_tight_tiers_locally() -> None:
+    class UnusedExternal:
+        async def solve(self, state: str, deadline: Deadline | None = None) -> tuple[str, ...]:
+            raise AssertionError('external solver called')
+
+    engine = TieredEngine()
+    facade = SolverFacade(
+        external_client=cast(ExternalSolverClient, UnusedExternal()),
+        local_solver=LocalSolver(cache_size=32),
+        runtime=SolverRuntime(engine=engine),
+    )
+    report = await facade.solve_report(SCRAMBLED_STATE, SolveOptions(max_depth=MIN_MAX_DEPTH))
+    assert (report.moves, report.source) == (['F'], 'local')
+    assert (report.max_depth, report.degraded) == (MIN_MAX_DEPTH, False)
+    assert engine.depths == [MIN_MAX_DEPTH]
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_relaxes_depth_when_budget_runs_out() -> None:
+    engine = TieredEngine(tight_delay=0.05)
+    local_solver = LocalSolver(cache_size=32)
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=local_solver,
+        runtime=SolverRuntime(engine=engine),
+    )
+    options = SolveOptions(max_depth=MIN_MAX_DEPTH, time_budget=0.001)
+    report = await facade.solve_report(SCRAMBLED_STATE, options)
+    assert report.moves == ['F', 'R']
+    assert (report.max_depth, report.degraded) == (DEFAULT_MAX_DEPTH, True)
+
+    # The tight search keeps running and fills its tier for the next request.
+    await asyncio.sleep(0.1)
+    assert local_solver.lookup(SCRAMBLED_STATE, MIN_MAX_DEPTH) == ('F',)
+    report = await facade.solve_report(SCRAMBLED_STATE, options)
+    assert (report.moves, report.degraded) == (['F'], False)
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_bounds_tight_searches_by_the_runtime_budget() -> None:
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=LocalSolver(cache_size=32),
+        runtime=SolverRuntime(engine=TieredEngine(tight_delay=0.05), tight_budget=0.001),
+    )
+    report = await facade.solve_report(SCRAMBLED_STATE, SolveOptions(max_depth=MIN_MAX_DEPTH))
+    assert (report.moves, report.max_depth, report.degraded) == (
+        ['F', 'R'],
+        DEFAULT_MAX_DEPTH,
+        True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_retrieves_abandoned_tight_search_failures() -> None:
+    class FailingTightEngine(TieredEngine):
+        async def solve(self, state: str, max_depth: int = DEFAULT_MAX_DEPTH) -> tuple[str, ...]:
+            await asyncio.sleep(0.05)
+            raise RuntimeError('worker died')
+
+    unretrieved: list[dict[str, object]] = []
+    asyncio.get_running_loop().set_exception_handler(lambda _, context: unretrieved.append(context))
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=LocalSolver(cache_size=32),
+        runtime=SolverRuntime(engine=FailingTightEngine()),
+    )
+    options = SolveOptions(max_depth=MIN_MAX_DEPTH, time_budget=1.0)
+    request = asyncio.create_task(facade.solve_report(SCRAMBLED_STATE, options))
+    await asyncio.sleep(0.01)
+    request.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await request
+    await asyncio.sleep(0.1)
+    gc.collect()
+    assert unretrieved == []
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_relaxes_depth_under_load() -> None:
+    engine = TieredEngine()
+    latency = SolverLatency()
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=LocalSolver(cache_size=32),
+        runtime=SolverRuntime(engine=engine, latency=latency, degrade_in_flight=1),
+    )
+    latency.local.in_flight = 1
+    report = await facade.solve_report(SCRAMBLED_STATE, SolveOptions(max_depth=MIN_MAX_DEPTH))
+    assert (report.moves, report.max_depth, report.degraded) == (
+        ['F', 'R'],
+        DEFAULT_MAX_DEPTH,
+        True,
+    )
+    assert engine.depths == [DEFAULT_MAX_DEPTH]
+
+
+@pytest.mark.asyncio
+async def test_solver_engine_solves_in_worker_process() -> None:
+    engine = SolverEngine(workers=1)
+    try:
+        moves = await engine.solve(SOLVED_STATE)
+    finally:
+        engine.shutdown()
+    assert moves == LocalSolver(cache_size=32).solve(SOLVED_STATE)
+    assert not engine.running
+
+
+def test_cube_state_round_trips_facelets_and_bytes() -> None:
+    for state in (SOLVED_STATE, SCRAMBLED_STATE, *sample_states(4)):
+        packed = CubeState.from_facelets(state)
+        assert packed.to_facelets() == state
+        assert CubeState.from_bytes(packed.to_bytes()) == packed
+        assert pickle.loads(pickle.dumps(packed)) == packed  # noqa: S301
+    solved = CubeState.from_facelets(SOLVED_STATE)
+    assert solved == CubeState(0)
+    assert hash(solved) == hash(CubeState(0))
+
+
+def test_cube_state_is_immutable_and_rejects_unsolvable_states() -> None:
+    packed = CubeState.from_facelets(SCRAMBLED_STATE)
+    with pytest.raises(AttributeError):
+        packed._code = 0  # type: ignore[misc]
+    assert packed.digest == CubeState(packed.code).digest != CubeState(0).digest
+    twisted = _with_facelets(SOLVED_STATE, {8: 'R', 9: 'F', 20: 'U'})
+    with pytest.raises(InvalidCubieError):
+        CubeState.from_facelets(twisted)
+    # Swapped last two edges with corners in place: in range, but odd edge parity.
+    swapped_edges = 2**11
+    with pytest.raises(ValueError, match='parity'):
+        CubeState(swapped_edges)
+    with pytest.raises(ValueError, match='parity'):
+        CubeState.from_bytes(swapped_edges.to_bytes(9, 'big'))
+
+
+def test_validator_returns_packed_state() -> None:
+    assert CubeValidator().validate_packed(SCRAMBLED_STATE.lower()) == CubeState.from_facelets(
+        SCRAMBLED_STATE
+    )
+
+
+def test_memory_cache_evicts_least_recently_used() -> None:
+    cache = MemorySolutionCache(max_entries=2)
+    cache.set(1, ('R',))
+    cache.set(2, ('U',))
+    assert cache.get(1) == ('R',)
+    cache.set(3, ('F',))
+    assert [cache.get(key) for key in (1, 2, 3)] == [('R',), None, ('F',)]
+
+
+def test_sqlite_cache_drops_the_legacy_table_only_once(tmp_path: Path) -> None:
+    path = tmp_path / 'solutions.sqlite3'
+    with closing(sqlite3.connect(path)) as legacy:
+        legacy.execute('CREATE TABLE solutions (state TEXT PRIMARY KEY, moves TEXT)')
+        legacy.commit()
+    cache = SqliteSolutionCache(path, max_entries=10)
+    assert len(cache) == 0
+    cache.close()
+    with closing(sqlite3.connect(path)) as migrated:
+        tables = {row[0] for row in migrated.execute("SELECT name FROM sqlite_master")}
+        assert 'solutions' not in tables
+        migrated.execute('CREATE TABLE solutions (state TEXT PRIMARY KEY, moves TEXT)')
+        migrated.commit()
+    cache = SqliteSolutionCache(path, max_entries=10)
+    assert len(cache) == 0
+    cache.close()
+    with closing(sqlite3.connect(path)) as reopened:
+        tables = {row[0] for row in reopened.execute("SELECT name FROM sqlite_master")}
+        assert 'solutions' in tables
+
+
+def test_sqlite_cache_survives_restart_and_evicts(tmp_path: Path) -> None:
+    path = tmp_path / 'solutions.sqlite3'
+    limit = 10
+    cache = SqliteSolutionCache(path, max_entries=limit)
+    # Packed codes exceed 64 bits, which SQLite integers cannot hold.
+    scrambled = CubeState.from_facelets(SCRAMBLED_STATE).code
+    keys = [scrambled - index for index in reversed(range(limit * 2))]
+    for key in keys:
+        cache.set(key, ('R', "U'"))
+    cache.evict()
+    cache.close()
+
+    reopened = SqliteSolutionCache(path, max_entries=limit)
+    assert len(reopened) == limit - 1
+    assert reopened.get(scrambled) == ('R', "U'")
+    assert reopened.get(keys[0]) is None
+
+    solver = LocalSolver(cache=reopened, canonical_keys=False)
+    assert solver.solve(SCRAMBLED_STATE) == ('R', "U'")
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_keeps_blocking_cache_io_off_the_loop(tmp_path: Path) -> None:
+    threads: set[int] = set()
+
+    class ThreadRecordingCache(SqliteSolutionCache):
+        def get(self, key: int) -> tuple[str, ...] | None:
+            threads.add(threading.get_ident())
+            return super().get(key)
+
+    cache = ThreadRecordingCache(tmp_path / 'solutions.sqlite3', max_entries=10)
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=LocalSolver(cache=cache),
+        runtime=SolverRuntime(engine=TieredEngine()),
+    )
+    assert await facade.solve(SCRAMBLED_STATE) == (['F', 'R'], 'local')
+    await facade.solve_many([SCRAMBLED_STATE], concurrency=1)
+    assert threads
+    assert threading.get_ident() not in threads
+    cache.close()
+
+
+def test_symmetric_states_share_canonical_representative() -> None:
+    canonical, symmetry = canonicalize(SCRAMBLED_STATE)
+    assert symmetry.apply(SCRAMBLED_STATE) == canonical
+    variants = {variant.apply(SCRAMBLED_STATE) for variant in SYMMETRIES}
+    assert {canonicalize(variant)[0] for variant in variants} == {canonical}
+
+
+def test_local_solver_maps_cached_moves_onto_symmetric_states() -> None:
+    solver = LocalSolver(cache_size=32)
+    solver.solve(SCRAMBLED_STATE)
+    for symmetry in SYMMETRIES:
+        variant = symmetry.apply(SCRAMBLED_STATE)
+        moves = solver.lookup(variant)
+        assert moves is not None
+        assert apply_moves(variant, moves) == SOLVED_STATE
+    assert len(solver.cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_task_between_callers() -> None:
+    flights: SingleFlight[int] = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def work() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 42
+
+    waiters = [asyncio.create_task(flights.run('key', work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == [42] * 5
+    assert (calls, flights.started, flights.coalesced, flights.in_flight) == (1, 1, 4, 0)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_cancels_work_only_after_last_waiter_leaves() -> None:
+    flights: SingleFlight[int] = SingleFlight()
+    release = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work() -> int:
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return 7
+
+    first = asyncio.create_task(flights.run('key', work))
+    second = asyncio.create_task(flights.run('key', work))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    assert not cancelled.is_set()
+    second.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert flights.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_coalesces_symmetric_in_flight_solves() -> None:
+    class SlowEngine(SolverEngine):
+        def __init__(self) -> None:
+            super().__init__(workers=1)
+            self.states: list[str] = []
+
+        async def solve(  # type: ignore[override]
+            self, state: str, max_depth: int = DEFAULT_MAX_DEPTH
+        ) -> tuple[str, ...]:
+            self.states.append(state)
+            await asyncio.sleep(0.01)
+            return solve_uncached(state)
+
+    engine = SlowEngine()
+    coalescer: SingleFlight[tuple[list[str], str]] = SingleFlight()
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=LocalSolver(cache_size=32),
+        runtime=SolverRuntime(engine=engine, coalescer=coalescer),
+    )
+    variants = [symmetry.apply(SCRAMBLED_STATE) for symmetry in SYMMETRIES[:3]]
+    results = await asyncio.gather(*(facade.solve(variant) for variant in variants))
+    assert len(engine.states) == 1
+    assert coalescer.coalesced == len(variants) - 1
+    for variant, (moves, source) in zip(variants, results, strict=True):
+        assert source == 'local'
+        assert apply_moves(variant, moves) == SOLVED_STATE
+
+
+class DelayedExternal:
+    def __init__(self, delay: float, *, fail: bool = False) -> None:
+        self._delay = delay
+        self._fail = fail
+        self.cancelled = False
+
+    async def solve(self, state: str, deadline: Deadline | None = None) -> tuple[str, ...]:
+        try:
+            await asyncio.sleep(self._delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self._fail:
+            raise RuntimeError('boom')
+        return ('B',)
+
+
+def _hedged_facade(external: DelayedExternal, latency: SolverLatency | None = None) -> SolverFacade:
+    runtime = SolverRuntime(latency=latency or SolverLatency(), hedge_delay=0.05)
+    return SolverFacade(external_client=external, local_solver=StubSolver(), runtime=runtime)  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_hedged_solve_returns_fast_external_result() -> None:
+    assert await _hedged_facade(DelayedExternal(0)).solve('UU') == (['B'], 'external')
+
+
+@pytest.mark.asyncio
+async def test_hedged_solve_races_local_and_cancels_slow_external() -> None:
+    external = DelayedExternal(5)
+    assert await _hedged_facade(external).solve('UU') == (['U', 'U'], 'local')
+    await asyncio.sleep(0)
+    assert external.cancelled
+
+
+@pytest.mark.asyncio
+async def test_hedged_solve_falls_back_when_external_fails_early() -> None:
+    external = DelayedExternal(0, fail=True)
+    assert await _hedged_facade(external).solve('UU') == (['U', 'U'], 'local')
+
+
+@pytest.mark.asyncio
+async def test_hedged_solve_skips_delay_when_external_p95_is_slower() -> None:
+    latency = SolverLatency()
+    for _ in range(MIN_SAMPLES):
+        latency.external.record(2.0)
+        latency.local.record(0.001)
+    runtime = SolverRuntime(latency=latency, hedge_delay=5.0)
+    external = DelayedExternal(5)
+    facade = SolverFacade(external_client=external, local_solver=StubSolver(), runtime=runtime)  # type: ignore[arg-type]
+    result = await asyncio.wait_for(facade.solve('UU'), timeout=1)
+    assert result == (['U', 'U'], 'local')
+
+
+@pytest.mark.asyncio
+async def test_deadline_leaves_time_for_local_fallback() -> None:
+    external = DelayedExternal(5)
+    facade = SolverFacade(external_client=external, local_solver=StubSolver())  # type: ignore[arg-type]
+    options = SolveOptions(deadline=Deadline.after(0.5))
+    report = await asyncio.wait_for(facade.solve_report('UU', options), timeout=1)
+    assert (report.moves, report.source) == (['U', 'U'], 'local')
+    assert external.cancelled
+
+
+@pytest.mark.asyncio
+async def test_deadline_abandons_solve_once_passed() -> None:
+    engine = TieredEngine(tight_delay=5)
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=LocalSolver(cache_size=32),
+        runtime=SolverRuntime(engine=engine),
+    )
+    options = SolveOptions(max_depth=MIN_MAX_DEPTH, deadline=Deadline.after(0.05))
+    with pytest.raises(DeadlineExceededError):
+        await asyncio.wait_for(facade.solve_report(SCRAMBLED_STATE, options), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_abandoned_search_still_fills_the_cache() -> None:
+    local_solver = LocalSolver(cache_size=32)
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=local_solver,
+        runtime=SolverRuntime(engine=TieredEngine(tight_delay=0.05)),
+    )
+    options = SolveOptions(max_depth=MIN_MAX_DEPTH, deadline=Deadline.after(0.01))
+    with pytest.raises(DeadlineExceededError):
+        await facade.solve_report(SCRAMBLED_STATE, options)
+    results = await facade.solve_many([SOLVED_STATE], concurrency=1, deadline=Deadline.after(0.0))
+    assert isinstance(results[SOLVED_STATE], DeadlineExceededError)
+    await asyncio.sleep(0.1)
+    assert local_solver.lookup(SCRAMBLED_STATE, MIN_MAX_DEPTH) == ('F',)
+
+
+@pytest.mark.asyncio
+async def test_admission_queues_then_sheds() -> None:
+    admission = AdmissionController(limit=1, queue_limit=1)
+    order: list[str] = []
+
+    async def hold(name: str, release: asyncio.Event) -> None:
+        async with admission.admit():
+            order.append(name)
+            await release.wait()
+
+    first, second = asyncio.Event(), asyncio.Event()
+    tasks = [asyncio.create_task(hold('first', first)), asyncio.create_task(hold('second', second))]
+    await asyncio.sleep(0)
+    assert (admission.in_flight, admission.queued) == (1, 1)
+    with pytest.raises(OverloadedError) as excinfo:
+        async with admission.admit():
+            pass
+    assert excinfo.value.retry_after >= 1
+    assert admission.shed == 1
+
+    first.set()
+    second.set()
+    await asyncio.gather(*tasks)
+    assert order == ['first', 'second']
+    assert (admission.in_flight, admission.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_admission_drops_cancelled_waiters() -> None:
+    admission = AdmissionController(limit=1, queue_limit=4)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with admission.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert admission.queued == 0
+    release.set()
+    await holder
+    assert admission.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_solver_facade_serves_cache_hits_while_shedding() -> None:
+    admission = AdmissionController(limit=1, queue_limit=0)
+    local_solver = LocalSolver(cache_size=32)
+    local_solver.store(SCRAMBLED_STATE, ('F',))
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=local_solver,
+        runtime=SolverRuntime(engine=TieredEngine(), admission=admission),
+    )
+    async with admission.admit():
+        assert await facade.solve(SCRAMBLED_STATE) == (['F'], 'local')
+        with pytest.raises(OverloadedError):
+            await facade.solve(apply_moves(SOLVED_STATE, ['R', 'U', 'F']))
+        results = await facade.solve_many(
+            [SCRAMBLED_STATE, apply_moves(SOLVED_STATE, ['R', 'U', 'F'])], concurrency=2
+        )
+    assert results[SCRAMBLED_STATE] == (['F'], 'local')
+    assert isinstance(results[apply_moves(SOLVED_STATE, ['R', 'U', 'F'])], OverloadedError)
+
+
+@pytest.mark.asyncio
+async def test_admission_holds_the_slot_until_an_abandoned_search_ends() -> None:
+    admission = AdmissionController(limit=1, queue_limit=0)
+    facade = SolverFacade(
+        external_client=None,
+        local_solver=LocalSolver(cache_size=32),
+        runtime=SolverRuntime(engine=TieredEngine(tight_delay=0.05), admission=admission),
+    )
+    options = SolveOptions(max_depth=MIN_MAX_DEPTH, deadline=Deadline.after(0.01))
+    with pytest.raises(DeadlineExceededError):
+        await facade.solve_report(SCRAMBLED_STATE, options)
+    assert admission.in_flight == 1
+    await asyncio.sleep(0.1)
+    assert admission.in_flight == 0
+
+
+def test_latency_tracker_reports_nearest_rank_percentile() -> None:
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(0.95) is None
+    for value in range(1, 101):
+        tracker.record(value / 1000)
+    assert tracker.percentile(0.95) == pytest.approx(0.095)
+
+
+@pytest.mark.asyncio
+async def test_hedged_solve_raises_local_error_when_both_paths_fail() -> None:
+    runtime = SolverRuntime(hedge_delay=0)
+    facade = SolverFacade(
+        external_client=DelayedExternal(0.01, fail=True),  # type: ignore[arg-type]
+        local_solver=StubSolver(should_fail=True),
+        runtime=runtime,
+    )
+    with pytest.raises(ValueError, match='parity error'):
+        await facade.solve('UU')
+
+
+async def _record(breaker: CircuitBreaker, outcomes: str, latency: float = 0.01) -> None:
+    for outcome in outcomes:
+        if outcome == 'x':
+            await breaker.record_failure(latency)
+        else:
+            await breaker.record_success(latency)
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_trips_on_error_rate_not_consecutive_failures() -> None:
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30)
+    await _record(breaker, 'ox' * 10)
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitBreakerOpenError):
+        await breaker.before_call()
+
+    healthy = CircuitBreaker(threshold=3, reset_timeout=30)
+    await _record(healthy, 'ooooxoooxooox')
+    assert healthy.snapshot().state == 'closed'
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_trips_on_slow_successes() -> None:
+    policy = BreakerPolicy(slow_call_seconds=0.1)
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30, policy=policy)
+    await _record(breaker, 'ooo', latency=0.5)
+    assert breaker.state == 'open'
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_half_open_admits_limited_probes() -> None:
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.01)
+    await breaker.record_failure()
+    await asyncio.sleep(0.02)
+    assert breaker.snapshot().available
+    await breaker.before_call()
+    assert breaker.state == 'half_open'
+    with pytest.raises(CircuitBreakerOpenError):
+        await breaker.before_call()
+    breaker.release()
+    await breaker.before_call()
+    await breaker.record_success()
+    assert breaker.snapshot() == BreakerSnapshot(
+        state='closed',
+        calls=0,
+        failures=0,
+        error_rate=0.0,
+        latency_quantile=None,
+        probes_in_flight=0,
+        available=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_registry_isolates_endpoints() -> None:
+    registry = CircuitBreakerRegistry(lambda: CircuitBreaker(threshold=1, reset_timeout=30))
+    await registry.for_endpoint('http://a').record_failure()
+    assert registry.for_endpoint('http://a') is registry.for_endpoint('http://a')
+    assert {name: snap.state for name, snap in registry.snapshot().items()} == {
+        'http://a': 'open',
+    }
+    await registry.for_endpoint('http://b').before_call()
+
+
+def _registry() -> CircuitBreakerRegistry:
+    return CircuitBreakerRegistry(lambda: CircuitBreaker(threshold=1, reset_timeout=30))
+
+
+def test_endpoint_pool_prefers_lowest_latency() -> None:
+    pool = EndpointPool(['http://a', 'http://b', 'http://a'], _registry())
+    first, second = pool.endpoints
+    assert [endpoint.url for endpoint in pool.endpoints] == ['http://a', 'http://b']
+    pool.observe(first, 0.5)
+    pool.observe(second, 0.1)
+    assert pool.choose() is second
+    assert pool.choose(exclude={'http://b'}) is first
+    assert pool.choose(exclude={'http://a', 'http://b'}) is None
+
+
+@pytest.mark.asyncio
+async def test_endpoint_pool_skips_open_breakers() -> None:
+    registry = _registry()
+    pool = EndpointPool(['http://a', 'http://b'], registry, strategy='p2c')
+    await registry.for_endpoint('http://a').record_failure()
+    assert {pool.choose().url for _ in range(10)} == {'http://b'}  # type: ignore[union-attr]
+
+
+@pytest.mark.asyncio
+async def test_external_client_retries_on_another_replica() -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        if request.url.host == 'a':
+            return httpx.Response(503)
+        return httpx.Response(200, json={'moves': list(solve_uncached(SCRAMBLED_STATE))})
+
+    pool = EndpointPool(['http://a/solve', 'http://b/solve'], _registry())
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        external = ExternalSolverClient(
+            client=client, endpoints=pool, timeout_seconds=1, max_retries=1
+        )
+        assert await external.solve(SCRAMBLED_STATE) == solve_uncached(SCRAMBLED_STATE)
+        assert calls == ['http://a/solve', 'http://b/solve']
+        # The failed replica's breaker is open, so the next call goes straight to b.
+        assert await external.solve(SCRAMBLED_STATE) == solve_uncached(SCRAMBLED_STATE)
+    assert calls[-1] == 'http://b/solve'
+
+
+@pytest.mark.asyncio
+async def test_external_client_rejects_wrong_and_simplifies_redundant_solutions() -> None:
+    solution = list(solve_uncached(SCRAMBLED_STATE))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == 'a':
+            return httpx.Response(200, json={'moves': solution[:-1]})
+        return httpx.Response(200, json={'moves': ['U', "U'", *solution, 'F', 'F', 'F2']})
+
+    registry = _registry()
+    pool = EndpointPool(['http://a/solve', 'http://b/solve'], registry)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        external = ExternalSolverClient(
+            client=client, endpoints=pool, timeout_seconds=1, max_retries=1
+        )
+        assert await external.solve(SCRAMBLED_STATE) == tuple(solution)
+    assert registry.snapshot()['http://a/solve'].state == 'open'
+
+
+@pytest.mark.asyncio
+async def test_external_client_skips_retries_the_deadline_cannot_cover() -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return httpx.Response(503)
+
+    pool = EndpointPool(['http://a/solve', 'http://b/solve'], _registry())
+    pool.endpoints[1].ewma_latency = 10.0
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        external = ExternalSolverClient(
+            client=client, endpoints=pool, timeout_seconds=1, max_retries=3
+        )
+        with pytest.raises(ExternalSolverError) as excinfo:
+            await external.solve(SCRAMBLED_STATE, deadline=Deadline.after(1))
+    assert excinfo.value.message_key == 'deadline_exceeded'
+    assert calls == ['http://a/solve']
+
+
+def test_simplify_moves_merges_and_cancels_commuting_turns() -> None:
+    assert simplify_moves(['R', "R'", 'U', 'U', 'L', 'R', "L'", 'B', 'F', 'B']) == (
+        'U2',
+        'R',
+        'B2',
+        'F',
+    )
+    assert simplify_moves(['R', 'U', "U'", 'R']) == ('R2',)
+    assert simplify_moves(['R', 'L', "R'"]) == ('L',)
+    assert solves(SCRAMBLED_STATE, solve_uncached(SCRAMBLED_STATE))
+    assert not solves(SCRAMBLED_STATE, ['R'])
+    assert not solves(SCRAMBLED_STATE, ['X'])
+    with pytest.raises(KeyError):
+        simplify_moves(['X'])
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_flushes_on_size_and_delay() -> None:
+    batches: list[list[str]] = []
+
+    async def flush(items: list[str]) -> list[str | Exception]:
+        batches.append(items)
+        return [ValueError(item) if item == 'bad' else item.upper() for item in items]
+
+    batcher: MicroBatcher[str, str] = MicroBatcher(max_size=3, max_delay=0.01)
+    results = await asyncio.gather(
+        *(batcher.submit(item, flush) for item in ['a', 'b', 'bad', 'c']),
+        return_exceptions=True,
+    )
+    assert results[:2] == ['A', 'B']
+    assert isinstance(results[2], ValueError)
+    assert results[3] == 'C'
+    assert batches == [['a', 'b', 'bad'], ['c']]
+    assert batcher.batches == len(batches)
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_fails_every_caller_on_missing_results() -> None:
+    async def flush(items: list[str]) -> list[str | Exception]:
+        return [item.upper() for item in items[1:]]
+
+    batcher: MicroBatcher[str, str] = MicroBatcher(max_size=3, max_delay=0.01)
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(item, flush) for item in 'abc'), return_exceptions=True),
+        timeout=1,
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def _stand_in_solver(requests: list[Mapping[str, object]]) -> FastAPI:
+    # Mimics the batched solver API: one result per state, errors per item.
+    stand_in = FastAPI()
+
+    @stand_in.post('/solve')
+    async def solve(payload: dict[str, list[str]]) -> dict[str, object]:
+        requests.append(payload)
+        return {
+            'results': [
+                (
+                    {'error': 'no solution'}
+                    if state == SCRAMBLED_STATE
+                    else {'moves': list(solve_uncached(state))}
+                )
+                for state in payload['states']
+            ]
+        }
+
+    return stand_in
+
+
+@pytest.mark.asyncio
+async def test_facade_micro_batches_external_calls() -> None:
+    requests: list[Mapping[str, object]] = []
+    registry = _registry()
+    pool = EndpointPool(['http://solver/solve'], registry)
+    transport = httpx.ASGITransport(app=_stand_in_solver(requests))
+    other = apply_moves(SOLVED_STATE, ['R'])
+    async with httpx.AsyncClient(transport=transport) as client:
+        external = ExternalSolverClient(
+            client=client, endpoints=pool, timeout_seconds=1, max_retries=0
+        )
+        runtime = SolverRuntime(batcher=MicroBatcher(max_size=8, max_delay=0.01))
+
+        def facade() -> SolverFacade:
+            return SolverFacade(
+                external_client=external,
+                local_solver=LocalSolver(canonical_keys=False),
+                runtime=runtime,
+            )
+
+        results = await asyncio.gather(
+            facade().solve(other), facade().solve(SCRAMBLED_STATE), facade().solve(SOLVED_STATE)
+        )
+
+    assert requests == [{'states': [other, SCRAMBLED_STATE, SOLVED_STATE]}]
+    assert results[0] == (["R'"], 'external')
+    assert results[2] == (list(simplify_moves(solve_uncached(SOLVED_STATE))), 'external')
+    moves, source = results[1]
+    assert source == 'local'
+    assert apply_moves(SCRAMBLED_STATE, moves) == SOLVED_STATE
+    # A partially failed batch is still one successful call for the breaker.
+    snapshot = registry.snapshot()['http://solver/solve']
+    assert (snapshot.calls, snapshot.failures) == (1, 0)
+
+
+def test_metrics_registry_renders_text_exposition() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter('solves_total', 'Solves.', ('source',))
+    histogram = registry.histogram('solve_seconds', 'Solve time.', buckets=(0.1, 1.0))
+    registry.register_callback('cache_entries', 'Entries.', lambda: [({}, 3)])
+    counter.labels('local').inc()
+    counter.labels('local').inc()
+    histogram.observe(0.05)
+    histogram.observe(5.0)
+    assert registry.render().splitlines() == [
+        '# HELP solves_total Solves.',
+        '# TYPE solves_total counter',
+        'solves_total{source="local"} 2.0',
+        '# HELP solve_seconds Solve time.',
+        '# TYPE solve_seconds histogram',
+        'solve_seconds_bucket{le="0.1"} 1',
+        'solve_seconds_bucket{le="1.0"} 1',
+        'solve_seconds_bucket{le="+Inf"} 2',
+        'solve_seconds_sum 5.05',
+        'solve_seconds_count 2',
+        '# HELP cache_entries Entries.',
+        '# TYPE cache_entries gauge',
+        'cache_entries 3.0',
+    ]
+    with pytest.raises(ValueError):
+        registry.counter('solves_total', 'Again.')
+
+
+@pytest.mark.asyncio
+async def test_warm_up_spawns_every_engine_worker() -> None:
+    states = sample_states(4)
+    assert states == sample_states(4)
+    assert all(CubeValidator().validate(state) == state for state in states)
+    engine = SolverEngine(workers=2)
+    try:
+        await warm_up(engine, samples=2)
+        assert len(engine.start()._processes) == engine.workers  # type: ignore[attr-defined]
+    finally:
+        engine.shutdown()
+
+
+def test_parse_rate_supports_lists_and_multipliers() -> None:
+    assert parse_rate('10/minute; 100 per hour') == (
+        RateLimitRule(amount=10, period=60.0),
+        RateLimitRule(amount=100, period=3600.0),
+    )
+    assert parse_rate('5 per 10 seconds') == (RateLimitRule(amount=5, period=10.0),)
+    with pytest.raises(ValueError, match='Invalid rate limit'):
+        parse_rate('often')
+
+
+def test_token_bucket_refills_and_charges_every_rule() -> None:
+    rules = parse_rate('2/second; 3/minute')
+    decision, buckets = settle([None, None], rules, 2, now=0.0)
+    assert decision.allowed
+    assert decision.remaining == 0
+    decision, buckets = settle(buckets, rules, 1, now=0.25)
+    assert not decision.allowed
+    assert decision.retry_after == pytest.approx(0.25)
+    decision, buckets = settle(buckets, rules, 1, now=1.0)
+    assert decision.allowed
+    assert (decision.limit, decision.remaining) == (3, 0)
+    decision, _ = settle(buckets, rules, 1, now=2.0)
+    assert not decision.allowed
+
+
+def test_token_bucket_never_admits_a_cost_above_its_capacity() -> None:
+    decision, _ = settle([None], parse_rate('3/minute'), 4, now=0.0)
+    assert not decision.allowed
+    assert decision.retry_after == math.inf
+    limiter = RateLimiter(MemoryBucketStore())
+    assert limiter.capacity('10/minute; 3/second') == parse_rate('3/second')[0].amount
+    assert RateLimiter(MemoryBucketStore(), enabled=False).capacity('3/minute') is None
+
+
+def test_memory_bucket_store_drops_full_buckets(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(rate_limiter, '_CLEANUP_INTERVAL', 2)
+    store = MemoryBucketStore()
+    limiter = RateLimiter(store)
+    limiter.hit('first', '1000/second')
+    time.sleep(0.01)
+    limiter.hit('second', '1000/second')
+    assert len(store) == 1
+
+
+def test_rate_limiter_weights_cost_and_can_be_disabled() -> None:
+    limiter = RateLimiter(MemoryBucketStore())
+    assert limiter.hit('client', '3/minute', cost=2).allowed
+    assert not limiter.hit('client', '3/minute', cost=2).allowed
+    assert limiter.hit('other', '3/minute', cost=3).allowed
+    limiter.reset()
+    assert limiter.hit('client', '3/minute', cost=3).allowed
+    assert RateLimiter(MemoryBucketStore(), enabled=False).hit('client', '1/minute', cost=5).allowed
+
+
+def test_sqlite_bucket_store_is_shared_between_instances(tmp_path: Path) -> None:
+    path = tmp_path / 'limits.sqlite3'
+    first = RateLimiter(SqliteBucketStore(path))
+    second = RateLimiter(SqliteBucketStore(path))
+    assert first.hit('client', '2/minute').allowed
+    assert second.hit('client', '2/minute').allowed
+    decision = first.hit('client', '2/minute')
+    assert not decision.allowed
+    assert decision.retry_after > 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_charges_sqlite_buckets_off_the_loop(tmp_path: Path) -> None:
+    threads: set[int] = set()
+
+    class ThreadRecordingStore(SqliteBucketStore):
+        def take(
+            self, keys: Sequence[str], rules: Sequence[RateLimitRule], cost: float
+        ) -> RateLimitDecision:
+            threads.add(threading.get_ident())
+            return super().take(keys, rules, cost)
+
+    limiter = RateLimiter(ThreadRecordingStore(tmp_path / 'limits.sqlite3'))
+    assert (await limiter.acquire('client', '2/minute')).allowed
+    assert threads
+    assert threading.get_ident() not in threads
+
+
+@pytest.fixture(scope='module')
+def near_solved_table(tmp_path_factory: pytest.TempPathFactory) -> NearSolvedTable:
+    path = tmp_path_factory.mktemp('near_solved') / 'table.bin'
+    write_table(path, 3)
+    return NearSolvedTable(path)
+
+
+def test_near_solved_table_returns_optimal_solutions(near_solved_table: NearSolvedTable) -> None:
+    assert len(near_solved_table) == 1 + 18 + 243 + 3240
+    assert near_solved_table.lookup(SOLVED_STATE) == ()
+    for scramble in (['R'], ['U2', "F'"], ['R', 'L', "U'"], ['F', 'F']):
+        state = apply_moves(SOLVED_STATE, scramble)
+        moves = near_solved_table.lookup(state)
+        assert moves is not None
+        assert solves(state, moves)
+        assert len(moves) == len(simplify_moves(scramble))
+    assert near_solved_table.lookup(SCRAMBLED_STATE) is None
+    assert pack_state(_with_facelets(SOLVED_STATE, {4: 'R', 13: 'U'})) is None
+
+
+def test_near_solved_table_rejects_foreign_files(tmp_path: Path) -> None:
+    path = tmp_path / 'table.bin'
+    path.write_bytes(b'not a table at all')
+    with pytest.raises(ValueError, match='near-solved table'):
+        NearSolvedTable(path)
+
+
+@pytest.mark.asyncio
+async def test_near_solved_states_skip_external_and_search(
+    near_solved_table: NearSolvedTable,
+) -> None:
+    class UnusedExternal:
+        async def solve(self, state: str, deadline: Deadline | None = None) -> tuple[str, ...]:
+            raise AssertionError('external solver called')
+
+    local_solver = LocalSolver(cache_size=32, near_solved=near_solved_table)
+    facade = SolverFacade(
+        external_client=cast(ExternalSolverClient, UnusedExternal()), local_solver=local_solver
+    )
+    state = apply_moves(SOLVED_STATE, ['R', 'U'])
+    assert await facade.solve(state) == (["U'", "R'"], 'local')
+    assert local_solver.solve(SOLVED_STATE) == ()
+    assert len(local_solver.cache) == 0